@@ -239,6 +239,7 @@ class RestaurantDetailSerializer(serializers.ModelSerializer):
             'is_disabled', 'average_rating', 'rating_count', 'restaurant_services', 'restaurants_timings', 'restaurant_images', 'restaurant_payment_modes', 'business_instagram', 'average_bill',
             'business_capacity', 'business_email', 'business_website',
         ]
+        read_only_fields = ['average_rating', 'rating_count']
 
 
 class RestaurantDetailUpdateSerializer(serializers.ModelSerializer):
@@ -256,6 +257,7 @@ class RestaurantDetailUpdateSerializer(serializers.ModelSerializer):
             'city', 'state', 'zipcode', 'is_approved', 'profile_image', 'business_description', 'type', 'known_for', 'must_order', 'year_of_established',
             'is_disabled', 'average_rating', 'rating_count', 'business_instagram', 'average_bill', 'business_capacity', 'business_email', 'business_website'
         ]
+        read_only_fields = ['average_rating', 'rating_count']
 
 
 class AdsSerializer(serializers.ModelSerializer):
@@ -317,14 +319,8 @@ class AllServiceSerializer(serializers.ModelSerializer):
     is_already_added = SerializerMethodField('get_is_already_added', read_only=True)
 
     def get_is_already_added(self, data):
-        restaurant = self.context['restaurant']
-        if restaurant:
-            try:
-                RestaurantService.objects.get(service=data, restaurant=restaurant)
-                return True
-            except RestaurantService.DoesNotExist:
-                return False
-        return False
+        # Ids the restaurant already has, fetched once by the view
+        return data.id in self.context['added_ids']
 
     class Meta:
         model = Service
@@ -1,3 +1,17 @@
 from django.test import TestCase
 
-# Create your tests here.
+from core.testing import CatalogueDropdownTestMixin
+from users.models import User
+
+
+class CatalogueDropdownTest(CatalogueDropdownTestMixin, TestCase):
+    namespace = 'Admin V1'
+    dropdowns = {
+        'All services': 'is_already_added',
+        'all cuisines': 'is_added',
+        'all payment modes': 'is_added',
+    }
+
+    @classmethod
+    def create_user(cls):
+        return User.objects.create(username='admin', email='admin@example.com', is_staff=True)
@@ -17,7 +17,7 @@ from core.models import Category, SubCategory, ClamRequest, Restaurant, AdsBanne
 from owner_dashboard.models import RestaurantNotification
 from owner_dashboard.serializers import AllCuisinesListSerializer, PaymentModeSerializer, RestaurantCuisineSerializer, RestaurantPaymentMethodSerializer, AddCuisinesSerializer, \
     AddPaymentModeSerializer
-from owner_dashboard.views import CustomPagination, create_restaurant_times, RestaurantMenuItemList, UploadMenuCsvApi, MenuItemDetail, CreateMenuItem, UpdateMenuItem, DeleteIngredients, \
+from owner_dashboard.views import CustomPagination, create_restaurant_times, get_added_ids, RestaurantMenuItemList, UploadMenuCsvApi, MenuItemDetail, CreateMenuItem, UpdateMenuItem, DeleteIngredients, \
     RemoveMenuItem, RestaurantSubCategoryList
 from users.email_and_sms import send_email, send_message
 from users.models import TwoFactorVerificationOTP, Collaborator, User
@@ -586,12 +586,7 @@ class AllServices(ListAPIView):
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(id=restaurant_id)
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantService, 'service_id', self.kwargs.get('restaurant_id'))})
         return context
 
 
@@ -602,13 +597,7 @@ class AllCuisinesList(ListAPIView):
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        # context.update({"request": self.request})
-        try:
-            restaurant = Restaurant.objects.get(id=restaurant_id)
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantCuisines, 'cuisine_id', self.kwargs.get('restaurant_id'))})
         return context
 
 
@@ -619,13 +608,7 @@ class AllPaymentModes(ListAPIView):
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        # context.update({"request": self.request})
-        try:
-            restaurant = Restaurant.objects.get(id=restaurant_id)
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantAcceptedPayment, 'payment_id', self.kwargs.get('restaurant_id'))})
         return context
 
 
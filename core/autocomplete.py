@@ -0,0 +1,185 @@
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from django.core.cache import cache
+
+from core.models import Category, Cuisines, Restaurant, SubCategory
+
+VERSION_CACHE_KEY = 'autocomplete:version'
+# Seconds between checks of the shared version, so lookups almost never leave the process.
+VERSION_CHECK_INTERVAL = 5
+# Each change is logged under its version, a worker further behind than the log reaches rebuilds.
+CHANGE_CACHE_PREFIX = 'autocomplete:change:'
+CHANGE_LOG_TIMEOUT = 60 * 60
+MAX_REPLAYED_CHANGES = 500
+# Ties are listed in this order.
+TYPE_ORDER = {'restaurant': 0, 'category': 1, 'sub_category': 2, 'cuisine': 3}
+
+
+def normalize_words(value):
+    return re.findall(r'\w+', (value or '').casefold().replace('ё', 'е'))
+
+
+def restaurant_entry(restaurant):
+    return {'type': 'restaurant', 'id': restaurant.id, 'name': restaurant.name, 'name_ru': None}
+
+
+def category_entry(category):
+    return {'type': 'category', 'id': category.id, 'name': category.name, 'name_ru': category.name_ru}
+
+
+def sub_category_entry(sub_category):
+    return {'type': 'sub_category', 'id': sub_category.id, 'name': sub_category.name, 'name_ru': sub_category.name_ru, 'category_id': sub_category.category_id}
+
+
+def cuisine_entry(cuisine):
+    return {'type': 'cuisine', 'id': cuisine.id, 'name': cuisine.cuisines, 'name_ru': cuisine.cuisines_ru}
+
+
+def load_entries():
+    entries = [restaurant_entry(restaurant) for restaurant in Restaurant.objects.filter(is_approved=True, is_disabled=False).only('id', 'name')]
+    entries += [category_entry(category) for category in Category.objects.only('id', 'name', 'name_ru')]
+    entries += [sub_category_entry(sub_category) for sub_category in SubCategory.objects.only('id', 'name', 'name_ru', 'category_id')]
+    entries += [cuisine_entry(cuisine) for cuisine in Cuisines.objects.only('id', 'cuisines', 'cuisines_ru')]
+    return entries
+
+
+class PrefixIndex:
+    """
+    Sorted array of search keys with binary search prefix lookups. Every word suffix of the
+    english and russian name is a key, so "coffee house" is found by "cof" and by "hou".
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.keys = []
+        self.refs = []
+        self.entries = {}
+        self.version = None
+        self.checked_at = 0
+
+    @staticmethod
+    def entry_keys(entry):
+        keys = set()
+        for name in (entry['name'], entry['name_ru']):
+            words = normalize_words(name)
+            for position in range(len(words)):
+                keys.add((' '.join(words[position:]), position))
+        return keys
+
+    def build(self):
+        # The version is read first, changes made while the entries load are replayed by the next catch_up().
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        entries = load_entries()
+        items = []
+        for entry in entries:
+            for key, position in self.entry_keys(entry):
+                items.append((key, position, entry['type'], entry['id']))
+        items.sort()
+        with self.lock:
+            self.keys = [item[0] for item in items]
+            self.refs = [item[1:] for item in items]
+            self.entries = {(entry['type'], entry['id']): entry for entry in entries}
+            self.version = version
+            self.checked_at = time.monotonic()
+
+    def _remove(self, ref):
+        entry = self.entries.pop(ref, None)
+        if entry is None:
+            return
+        for key, position in self.entry_keys(entry):
+            index = bisect_left(self.keys, key)
+            while index < len(self.keys) and self.keys[index] == key:
+                if self.refs[index] == (position,) + ref:
+                    del self.keys[index]
+                    del self.refs[index]
+                    break
+                index += 1
+
+    def _add(self, entry):
+        ref = (entry['type'], entry['id'])
+        self.entries[ref] = entry
+        for key, position in self.entry_keys(entry):
+            index = bisect_right(self.keys, key)
+            self.keys.insert(index, key)
+            self.refs.insert(index, (position,) + ref)
+
+    def _replace(self, entry_type, entry_id, entry):
+        self._remove((entry_type, entry_id))
+        if entry is not None:
+            self._add(entry)
+
+    def update(self, entry_type, entry_id, entry=None):
+        """
+        Replace (or with entry=None remove) one entry and log the change for the other workers.
+        """
+        with self.lock:
+            if self.version is not None:
+                self._replace(entry_type, entry_id, entry)
+        try:
+            cache.add(VERSION_CACHE_KEY, 0, timeout=None)
+            version = cache.incr(VERSION_CACHE_KEY)
+            cache.set(f'{CHANGE_CACHE_PREFIX}{version}', (entry_type, entry_id, entry), CHANGE_LOG_TIMEOUT)
+        except Exception as e:
+            print(e)
+            return
+        with self.lock:
+            # Only skip replaying our own change when no other worker changed the index in between.
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def catch_up(self):
+        """
+        Replay the changes other workers logged since our version, rebuild when some of them are gone.
+        """
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        if version == self.version:
+            return
+        if version < self.version or version - self.version > MAX_REPLAYED_CHANGES:
+            self.build()
+            return
+        keys = [f'{CHANGE_CACHE_PREFIX}{number}' for number in range(self.version + 1, version + 1)]
+        changes = cache.get_many(keys)
+        if len(changes) != len(keys):
+            self.build()
+            return
+        with self.lock:
+            for key in keys:
+                self._replace(*changes[key])
+            self.version = max(self.version, version)
+
+    def ensure_fresh(self):
+        if self.version is not None and time.monotonic() - self.checked_at <= VERSION_CHECK_INTERVAL:
+            return
+        # One thread refreshes, the others wait for it instead of loading the index again.
+        with self.refresh_lock:
+            if self.version is None:
+                self.build()
+            elif time.monotonic() - self.checked_at > VERSION_CHECK_INTERVAL:
+                self.checked_at = time.monotonic()
+                self.catch_up()
+
+    def lookup(self, query, limit=10, max_candidates=200):
+        words = normalize_words(query)
+        if not words:
+            return []
+        self.ensure_fresh()
+        prefix = ' '.join(words)
+        matches = {}
+        with self.lock:
+            index = bisect_left(self.keys, prefix)
+            while index < len(self.keys) and len(matches) < max_candidates and self.keys[index].startswith(prefix):
+                position, entry_type, entry_id = self.refs[index]
+                ref = (entry_type, entry_id)
+                matches[ref] = min(position, matches.get(ref, position))
+                index += 1
+            entries = [(position, self.entries[ref]) for ref, position in matches.items()]
+        # Names starting with the query first, then by type and the shortest name.
+        entries.sort(key=lambda item: (item[0] > 0, TYPE_ORDER[item[1]['type']], len(item[1]['name'] or ''), item[1]['id']))
+        return [entry for position, entry in entries[:limit]]
+
+
+autocomplete_index = PrefixIndex()
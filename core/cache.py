@@ -0,0 +1,233 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.db.models import F, Func, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified, QueryDict
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework.response import Response
+
+CACHE_VERSION_PREFIX = 'cache_version:'
+RESPONSE_CACHE_PREFIX = 'response:'
+PUBLIC_CACHE_PREFIX = 'public_response:'
+
+
+def _version_key(model):
+    return CACHE_VERSION_PREFIX + model._meta.label_lower
+
+
+def get_cache_version(*models):
+    """
+    Combined version of the given models, changes whenever one of them is saved or deleted.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    return '.'.join(str(versions.get(key, 0)) for key in keys)
+
+
+def _incr_version(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def bump_cache_version(model):
+    _incr_version(_version_key(model))
+
+
+def _object_version_key(model, pk):
+    return f'{_version_key(model)}:{pk}'
+
+
+def get_object_cache_version(model, pk):
+    """
+    Version of a single object, e.g. a restaurant together with its images, timings and services.
+    """
+    return cache.get(_object_version_key(model, pk), 0)
+
+
+def bump_object_cache_version(model, pk):
+    _incr_version(_object_version_key(model, pk))
+
+
+def _bump_sender_version(sender, **kwargs):
+    bump_cache_version(sender)
+
+
+def track_cache_version(*models):
+    for model in models:
+        post_save.connect(_bump_sender_version, sender=model, dispatch_uid=f'cache_version_save_{model._meta.label_lower}')
+        post_delete.connect(_bump_sender_version, sender=model, dispatch_uid=f'cache_version_delete_{model._meta.label_lower}')
+
+
+class CachedResponseMixin:
+    """
+    Caches the rendered body of list responses until one of `cache_models` changes, and answers
+    If-None-Match with 304. The models must be registered with track_cache_version().
+    Requires a cache shared by all workers (CACHE_LOCATION) in production.
+    """
+    cache_models = []
+    cache_timeout = 60 * 60 * 24
+
+    def get_cache_key_parts(self):
+        # Everything besides the url the response depends on, e.g. the restaurant of the user.
+        return []
+
+    def get_response_cache_key(self, request):
+        parts = [
+            f'{self.__class__.__module__}.{self.__class__.__name__}', request.get_full_path(), request.accepted_renderer.format,
+            get_cache_version(*self.cache_models),
+        ] + [str(part) for part in self.get_cache_key_parts()]
+        return RESPONSE_CACHE_PREFIX + hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            response = self.finalize_response(request, response, *args, **kwargs)
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            }
+            cache.set(key, cached, self.cache_timeout)
+
+        # Weak comparison, the compression middleware marks the ETag of compressed responses as weak.
+        etags = [etag.removeprefix('W/') for etag in parse_etags(request.headers.get('If-None-Match', ''))]
+        if cached['etag'] in etags:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        return response
+
+
+def normalize_query_params(query_params):
+    """
+    The query params sorted by name, so requests that only differ in the order of their params share a cache entry.
+    """
+    params = QueryDict(mutable=True)
+    for key in sorted(query_params):
+        params.setlist(key, query_params.getlist(key))
+    return params
+
+
+class PublicResponseCacheMixin:
+    """
+    Caches the data of public list responses, shared by all users, under the normalized query params.
+    Requests with one of `uncached_params` are not cached: the user's coordinates are nearly unique and
+    the distance order and distance_m have to come from the exact point.
+    Entries are dropped when one of `cache_models` changes (see track_cache_version) and expire after
+    `cache_timeout` for changes made without signals, e.g. QuerySet.update().
+    Per user fields must be left out of the cached data and filled in by personalize_data().
+    """
+    cache_models = []
+    cache_timeout = settings.PUBLIC_CACHE_TIMEOUT
+    uncached_params = ('lat', 'long')
+
+    def get_cache_key_parts(self):
+        # Everything besides the query params the response depends on, e.g. the current time slot.
+        return []
+
+    def personalize_data(self, data):
+        return data
+
+    def is_public_cacheable(self, request):
+        return not any(param in request.query_params for param in self.uncached_params)
+
+    def get_public_cache_key(self, request):
+        parts = [
+            f'{self.__class__.__module__}.{self.__class__.__name__}', request.get_host(), request.path,
+            normalize_query_params(request.query_params).urlencode(), get_cache_version(*self.cache_models),
+        ] + [str(part) for part in self.get_cache_key_parts()]
+        return PUBLIC_CACHE_PREFIX + hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_public_cacheable(request):
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.data = self.personalize_data(response.data)
+            return response
+        key = self.get_public_cache_key(request)
+        data = cache.get(key)
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            data = response.data
+            cache.set(key, data, self.cache_timeout)
+        return Response(self.personalize_data(data))
+
+
+def child_validators(name, children, field='modified_at', count=True):
+    """
+    Subquery annotations with the latest `field` and the number of rows of `children`, a queryset
+    filtered by OuterRef('pk'). The count catches deleted rows which leave the latest value unchanged.
+    """
+    children = children.order_by()
+    validators = {f'{name}_modified': Subquery(children.annotate(value=Func(F(field), function='MAX')).values('value')[:1])}
+    if count:
+        validators[f'{name}_count'] = Subquery(children.annotate(value=Func(F('pk'), function='COUNT')).values('value')[:1])
+    return validators
+
+
+class ConditionalGetMixin:
+    """
+    Sends ETag and Last-Modified with GET responses and answers If-None-Match / If-Modified-Since
+    with 304 before anything is serialized.
+
+    get_validator_queryset() returns the resource as a one row queryset annotated with the
+    modified_at of everything the response shows (see child_validators), so the check is a single query.
+    `validator_models` are rows without a usable modified_at on the page, e.g. catalog names, they are
+    checked by cache version and must be registered with track_cache_version().
+    """
+    validator_models = []
+
+    def get_validator_queryset(self):
+        """
+        The object of a detail view, checked by its own modified_at. List views, and views showing
+        related rows, override it.
+        """
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            raise ImproperlyConfigured(f'{self.__class__.__name__} has no {lookup_url_kwarg} url kwarg, override get_validator_queryset()')
+        return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+    def get_validators(self):
+        queryset = self.get_validator_queryset()
+        row = queryset.values('modified_at', *queryset.query.annotations).first()
+        if row is None:
+            return None, None
+        user = self.request.user
+        parts = [
+            self.request.get_full_path(), self.request.accepted_renderer.format, str(user.pk if user.is_authenticated else ''),
+            get_cache_version(*self.validator_models),
+        ] + [f'{key}={row[key]}' for key in sorted(row)]
+        modified = [value for value in row.values() if hasattr(value, 'timestamp')]
+        last_modified = int(max(modified).timestamp()) if modified else None
+        return quote_etag(hashlib.md5(':'.join(parts).encode()).hexdigest()), last_modified
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        # The body depends on the user.
+        patch_vary_headers(response, ('Authorization',))
+        return response
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Point
+from django.db.models import BooleanField, FloatField, Func, Q, Value
+from django.db.models.functions import Cast
+
+
+def geography(expression):
+    """
+    Cast a 4326 geometry column to geography, so distances are in metres.
+    Matches the expression of the GiST index on Restaurant.location_point.
+    """
+    return Cast(expression, PointField(geography=True))
+
+
+def get_point(lat, long):
+    try:
+        return Point(float(long), float(lat), srid=4326)
+    except Exception as e:
+        print(e)
+        return None
+
+
+def get_radius_km(radius=None):
+    if radius is None:
+        return settings.NEARBY_RADIUS_KM
+    try:
+        return min(max(float(radius), 0), settings.NEARBY_MAX_RADIUS_KM)
+    except Exception as e:
+        print(e)
+        return settings.NEARBY_RADIUS_KM
+
+
+class DWithin(Func):
+    """
+    ST_DWithin on geography (sphere, metres). Unlike distance_lte it expands to an
+    index bounding box check, so the geography GiST index is used.
+    """
+    function = 'ST_DWithin'
+    output_field = BooleanField()
+
+    def __init__(self, expression, point, distance_m, **extra):
+        super().__init__(
+            geography(expression), Value(point, output_field=PointField(geography=True)), Value(float(distance_m)), Value(False), **extra
+        )
+
+
+def filter_within_radius(queryset, point, radius_km=None, field='location_point'):
+    return queryset.filter(DWithin(field, point, get_radius_km(radius_km) * 1000))
+
+
+class KNNDistance(Func):
+    """
+    PostGIS `<->` distance in metres. Ordering by it lets the GiST index return rows nearest first.
+    """
+    arg_joiner = ' <-> '
+    template = '%(expressions)s'
+    output_field = FloatField()
+
+    def __init__(self, expression, point, **extra):
+        super().__init__(geography(expression), Value(point, output_field=PointField(geography=True)), **extra)
+
+
+def order_by_distance(queryset, point, after_distance=None, after_id=None, field='location_point'):
+    """
+    Annotate `distance_m` and order nearest first. `after_distance`/`after_id` of the last
+    row already shown continue the list from there (keyset paging).
+    """
+    queryset = queryset.annotate(distance_m=KNNDistance(field, point))
+    if after_distance is not None and after_id is not None:
+        try:
+            after_distance, after_id = float(after_distance), int(after_id)
+            queryset = queryset.filter(Q(distance_m__gt=after_distance) | Q(distance_m=after_distance, id__gt=after_id))
+        except Exception as e:
+            print(e)
+    return queryset.order_by('distance_m', 'id')
+
+
+class SnapToGrid(Func):
+    function = 'ST_SnapToGrid'
+    output_field = PointField()
+
+
+def grid_cell(expression, size):
+    """
+    x and y of the grid cell (size in degrees) the point falls in, to group points for map clusters.
+    """
+    snapped = SnapToGrid(expression, Value(float(size)))
+    return Func(snapped, function='ST_X', output_field=FloatField()), Func(snapped, function='ST_Y', output_field=FloatField())
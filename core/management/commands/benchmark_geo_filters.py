@@ -0,0 +1,61 @@
+import random
+import statistics
+import time
+
+from django.contrib.gis.measure import D
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.geo import filter_within_radius, get_point, order_by_distance
+from core.models import Restaurant
+
+
+class Command(BaseCommand):
+    help = 'Compare query plans and latency of the legacy distance_lte radius filter and the geography dwithin filter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lat', type=float, default=43.238949)
+        parser.add_argument('--long', type=float, default=76.889709)
+        parser.add_argument('--radius', type=float, default=10, help='Radius in km.')
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0, help='Insert this many synthetic restaurants first, rolled back afterwards.')
+        parser.add_argument('--spread', type=float, default=0.5, help='Synthetic restaurants are spread this many degrees around the point.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'], options['lat'], options['long'], options['spread'])
+            self.benchmark(options)
+            # Never keep synthetic rows.
+            transaction.set_rollback(True)
+
+    def seed(self, count, lat, long, spread):
+        restaurants = []
+        for i in range(count):
+            latitude = lat + random.uniform(-spread, spread)
+            longitude = long + random.uniform(-spread, spread)
+            restaurants.append(Restaurant(
+                name=f'Benchmark {i}', latitude=latitude, longitude=longitude, location_point=get_point(latitude, longitude), is_approved=True,
+            ))
+        Restaurant.objects.bulk_create(restaurants, batch_size=5000)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Restaurant._meta.db_table}')
+        self.stdout.write(f'Seeded {count} restaurants.')
+
+    def benchmark(self, options):
+        point = get_point(options['lat'], options['long'])
+        radius = options['radius']
+        restaurants = Restaurant.objects.filter(is_approved=True, is_disabled=False).only('id')
+        queries = {
+            'distance_lte': restaurants.filter(location_point__distance_lte=(point, D(km=radius))),
+            'dwithin': filter_within_radius(restaurants, point, radius),
+            'dwithin + nearest 10': order_by_distance(filter_within_radius(restaurants, point, radius), point)[:10],
+        }
+        for label, queryset in queries.items():
+            timings = []
+            for _ in range(options['runs']):
+                start = time.perf_counter()
+                rows = len(list(queryset.all()))
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{label}: {rows} rows, median {statistics.median(timings):.2f} ms, min {min(timings):.2f} ms'))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
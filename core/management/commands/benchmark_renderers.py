@@ -0,0 +1,83 @@
+import gzip
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.urls import resolve
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.middleware import brotli
+from core.models import Restaurant
+from core.renderers import ORJSONRenderer
+from users.models import User
+
+DEFAULT_PATHS = [
+    '/api/v1/core/restaurants/',
+    '/api/v1/core/restaurant/{restaurant_id}/',
+    '/api/v1/core/menu/{restaurant_id}/',
+    '/api/v1/core/menu/{restaurant_id}/full/',
+    '/api/v1/core/reviews/{restaurant_id}/',
+    '/api/v1/social/all-updates/',
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare the render time of the stdlib JSONRenderer and ORJSONRenderer per endpoint, and the compressed response sizes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Endpoints to render, {restaurant_id} is replaced. Defaults to the menu, detail, list and feed endpoints.')
+        parser.add_argument('--restaurant', type=int, help='Restaurant id for the paths, defaults to the one with the most menu items.')
+        parser.add_argument('--user', help='Email of the user the requests are made as.')
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        restaurant_id = options['restaurant']
+        if restaurant_id is None:
+            restaurant = Restaurant.objects.annotate(item_count=Count('menu_items')).order_by('-item_count').first()
+            restaurant_id = restaurant.id if restaurant else 0
+        user = None
+        if options['user']:
+            user = User.objects.filter(email=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist")
+
+        for path in options['paths'] or DEFAULT_PATHS:
+            path = path.format(restaurant_id=restaurant_id)
+            data = self.get_data(path, user)
+            if data is None:
+                continue
+            self.benchmark(path, data, options['runs'])
+
+    def get_data(self, path, user):
+        request = APIRequestFactory().get(path)
+        if user is not None:
+            force_authenticate(request, user=user)
+        match = resolve(path)
+        response = match.func(request, *match.args, **match.kwargs)
+        if response.status_code != 200 or not hasattr(response, 'data'):
+            self.stdout.write(self.style.WARNING(f'{path}: skipped, status {response.status_code}'))
+            return None
+        return response.data
+
+    def benchmark(self, path, data, runs):
+        results = {}
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                content = renderer.render(data)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[renderer.__class__.__name__] = (statistics.median(timings), content)
+
+        before, content = results['JSONRenderer']
+        after, orjson_content = results['ORJSONRenderer']
+        if orjson_content != content:
+            self.stdout.write(self.style.WARNING(f'{path}: the renderers disagree'))
+        sizes = f'{len(content)} bytes, gzip {len(gzip.compress(content))}'
+        if brotli is not None:
+            sizes += f', br {len(brotli.compress(content, quality=settings.BROTLI_QUALITY))}'
+        self.stdout.write(self.style.MIGRATE_HEADING(path))
+        self.stdout.write(f'  JSONRenderer {before:.3f} ms, ORJSONRenderer {after:.3f} ms ({before / max(after, 1e-6):.1f}x), {sizes}')
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, FloatField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from core.models import RATING_STARS, Restaurant, Review
+
+
+def review_aggregate(aggregate):
+    reviews = Review.objects.filter(restaurant=OuterRef('pk')).order_by().values('restaurant')
+    return Coalesce(Subquery(reviews.annotate(value=aggregate).values('value'), output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored rating aggregates of every restaurant from its reviews.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--check', action='store_true', help='Only report restaurants whose aggregates are out of sync.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        check = options['check']
+        expected = {
+            'rating_sum': review_aggregate(Sum('rating')),
+            'rating_count': review_aggregate(Count('id')),
+        }
+        for star in RATING_STARS:
+            expected[f'rating_{star}_count'] = review_aggregate(Count('id', filter=Q(rating=star)))
+        annotations = {f'expected_{field}': expression for field, expression in expected.items()}
+
+        last_id = 0
+        mismatched = 0
+        while True:
+            restaurants = list(Restaurant.objects.filter(id__gt=last_id).order_by('id').annotate(**annotations)[:chunk_size])
+            if not restaurants:
+                break
+            out_of_sync = []
+            for restaurant in restaurants:
+                expected_count = restaurant.expected_rating_count
+                expected_average = restaurant.expected_rating_sum / expected_count if expected_count else 0
+                if abs(restaurant.average_rating - expected_average) > 1e-9 or any(
+                        getattr(restaurant, field) != getattr(restaurant, f'expected_{field}') for field in expected):
+                    out_of_sync.append(restaurant.id)
+                    if check:
+                        self.stdout.write(f'Restaurant {restaurant.id}: out of sync')
+            if out_of_sync and not check:
+                # Recompute in the UPDATE itself so reviews written since the read above are not lost.
+                Restaurant.objects.filter(id__in=out_of_sync).update(
+                    **expected,
+                    average_rating=Coalesce(Cast(expected['rating_sum'], FloatField()) / NullIf(expected['rating_count'], 0), Value(0.0)),
+                )
+            mismatched += len(out_of_sync)
+            last_id = restaurants[-1].id
+
+        if check:
+            self.stdout.write(f'{mismatched} restaurant(s) out of sync.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Updated {mismatched} restaurant(s).'))
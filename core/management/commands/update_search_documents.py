@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.models import MenuItem, Restaurant
+from core.search import update_menu_item_search_documents, update_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of every restaurant and menu item.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        for model, update in [(Restaurant, update_search_documents), (MenuItem, update_menu_item_search_documents)]:
+            ids = list(model.objects.order_by('id').values_list('id', flat=True))
+            for start in range(0, len(ids), chunk_size):
+                update(ids[start:start + chunk_size])
+            self.stdout.write(self.style.SUCCESS(f'Updated {len(ids)} {model._meta.verbose_name_plural}.'))
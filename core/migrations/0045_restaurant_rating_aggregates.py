@@ -0,0 +1,69 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:39
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    Restaurant = apps.get_model('core', 'Restaurant')
+    aggregates = {'review_sum': Sum('restaurant_reviews__rating'), 'review_count': Count('restaurant_reviews')}
+    for star in range(1, 6):
+        aggregates[f'review_{star}_count'] = Count('restaurant_reviews', filter=Q(restaurant_reviews__rating=star))
+    for restaurant in Restaurant.objects.annotate(**aggregates).filter(review_count__gt=0).iterator():
+        Restaurant.objects.filter(id=restaurant.id).update(
+            rating_sum=restaurant.review_sum,
+            rating_count=restaurant.review_count,
+            average_rating=restaurant.review_sum / restaurant.review_count,
+            **{f'rating_{star}_count': getattr(restaurant, f'review_{star}_count') for star in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0044_adsbanner_restaurant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='average_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:41
+
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0046_restaurant_rating_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('location_point', django.contrib.gis.db.models.fields.PointField(geography=True, srid=4326)), name='core_restaurant_geog_gist'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:48
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+from core.opening_hours import compute_open_slots
+
+
+def populate_open_slots(apps, schema_editor):
+    Restaurant = apps.get_model('core', 'Restaurant')
+    RestaurantTimings = apps.get_model('core', 'RestaurantTimings')
+    timings = {}
+    for restaurant_id, weekday, from_hour, to_hour in RestaurantTimings.objects.values_list('restaurant_id', 'weekday', 'from_hour', 'to_hour').iterator():
+        timings.setdefault(restaurant_id, []).append((weekday, from_hour, to_hour))
+    for restaurant_id, restaurant_timings in timings.items():
+        Restaurant.objects.filter(id=restaurant_id).update(open_slots=compute_open_slots(restaurant_timings))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0049_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='open_slots',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.SmallIntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='restaurant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['open_slots'], name='core_restaurant_open_slots_gin'),
+        ),
+        migrations.RunPython(populate_open_slots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def populate_review_monthly_stats(apps, schema_editor):
+    Review = apps.get_model('core', 'Review')
+    ReviewMonthlyStats = apps.get_model('core', 'ReviewMonthlyStats')
+    rows = Review.objects.annotate(month=TruncMonth('created_at')).values('restaurant_id', 'month').annotate(rating_sum=Sum('rating'), rating_count=Count('id')).order_by()
+    ReviewMonthlyStats.objects.bulk_create(
+        (ReviewMonthlyStats(restaurant_id=row['restaurant_id'], month=row['month'].date(), rating_sum=row['rating_sum'], rating_count=row['rating_count']) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0051_menuitem_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewMonthlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['restaurant', 'created_at'], name='core_review_restaur_c0562d_idx'),
+        ),
+        migrations.AddField(
+            model_name='reviewmonthlystats',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_monthly_stats', to='core.restaurant'),
+        ),
+        migrations.AddConstraint(
+            model_name='reviewmonthlystats',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'month'), name='unique_review_monthly_stats'),
+        ),
+        migrations.RunPython(populate_review_monthly_stats, migrations.RunPython.noop),
+    ]
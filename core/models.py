@@ -1,8 +1,18 @@
 import requests
+from dirtyfields import DirtyFieldsMixin
 from django.core.files import File
 from io import BytesIO
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
+from core.geo import geography
+from core.opening_hours import compute_open_slots
 from users.models import TimeStampedModel, User
 from django.utils.translation import gettext as _
 from django.core.exceptions import ValidationError
@@ -68,6 +78,12 @@ class State(TimeStampedModel):
     state_ru = models.TextField()
 
 
+RATING_STARS = range(1, 6)
+RATING_FIELDS = ['rating_sum', 'rating_count', 'average_rating'] + [f'rating_{star}_count' for star in RATING_STARS]
+# Columns written only with UPDATE statements, see Restaurant.save()
+COMPUTED_FIELDS = RATING_FIELDS + ['search_document', 'open_slots']
+
+
 class Restaurant(TimeStampedModel):
     name = models.CharField(max_length=100, blank=True, null=True)
     owner = models.ForeignKey(User, blank=True, null=True, related_name='restaurants', on_delete=models.SET_NULL)
@@ -99,40 +115,47 @@ class Restaurant(TimeStampedModel):
     business_email = models.EmailField(blank=True, null=True)
     business_website = models.TextField(blank=True, null=True)
     is_disabled = models.BooleanField(default=False)
+    # Rating aggregates, maintained by Review.save() and the review post_delete signal.
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    average_rating = models.FloatField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    # Maintained by core.search.update_search_documents()
+    search_document = SearchVectorField(blank=True, null=True, editable=False)
+    # Quarter hours of the week the restaurant is open, see core.opening_hours. Maintained by update_open_slots()
+    open_slots = ArrayField(models.SmallIntegerField(), blank=True, default=list, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=['owner']),
             models.Index(fields=['name']),
             models.Index(fields=['type']),
+            models.Index(fields=['name', 'id']),
+            models.Index(fields=['average_rating']),
+            models.Index(fields=['rating_count']),
+            GistIndex(geography('location_point'), name='core_restaurant_geog_gist'),
+            GinIndex(fields=['search_document'], name='core_restaurant_search_gin'),
+            GinIndex(fields=['name'], name='core_restaurant_name_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['open_slots'], name='core_restaurant_open_slots_gin'),
         ]
 
     def save(self, *args, **kwargs):
         self.location_point = Point(self.longitude, self.latitude)
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            # Never write back rating aggregates or the search document loaded earlier, they are updated in place.
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields if not field.primary_key and field.name not in COMPUTED_FIELDS]
         super(Restaurant, self).save(*args, **kwargs)
 
     def __str__(self):
         return self.name if self.name else " "
 
     @property
-    def average_rating(self):
-        ratings = self.restaurant_reviews.all()
-        if not ratings:
-            return 0
-        total_ratings = sum([rating.rating for rating in ratings])
-        return total_ratings / len(ratings)
-
-    @property
-    def rating_count(self):
-        return self.restaurant_reviews.all().count()
-
-    @property
-    def category_count(self):
-        return self.restaurant_categories.all().count()
-
-    @property
-    def menu_item_count(self):
-        return self.menu_items.all().count()
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in RATING_STARS}
 
 
 class RestaurantCuisines(TimeStampedModel):
@@ -212,6 +235,7 @@ class Favorite(TimeStampedModel):
         indexes = [
             models.Index(fields=['restaurant']),
             models.Index(fields=['user']),
+            models.Index(fields=['created_at']),
         ]
 
 
@@ -247,10 +271,15 @@ class MenuItem(TimeStampedModel):
     price = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True)
     is_veg = models.BooleanField(blank=True, null=True)
     menu_type = models.ForeignKey(MenuType, blank=True, null=True, on_delete=models.SET_NULL, related_name='items')
+    # Maintained by core.search.update_menu_item_search_documents()
+    search_document = SearchVectorField(blank=True, null=True, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=['restaurant']),
+            models.Index(fields=['restaurant', 'Item_name', 'id']),
+            GinIndex(fields=['search_document'], name='core_menuitem_search_gin'),
+            GinIndex(fields=['Item_name'], name='core_menuitem_name_trgm', opclasses=['gin_trgm_ops']),
         ]
 
     def __str__(self):
@@ -323,7 +352,45 @@ class AdsBanner(TimeStampedModel):
     is_active = models.BooleanField(default=False)
 
 
-class Review(TimeStampedModel):
+def update_restaurant_rating(restaurant_id, added=None, removed=None):
+    """
+    Apply one review rating change to the restaurant's stored aggregates in a single UPDATE.
+    """
+    sum_delta = (added or 0) - (removed or 0)
+    count_delta = (added is not None) - (removed is not None)
+    changes = {
+        'rating_sum': F('rating_sum') + sum_delta,
+        'rating_count': F('rating_count') + count_delta,
+        # The right hand side sees the row before this UPDATE, so apply the deltas here as well.
+        'average_rating': Coalesce(Cast(F('rating_sum') + sum_delta, FloatField()) / NullIf(F('rating_count') + count_delta, 0), Value(0.0)),
+    }
+    for star in RATING_STARS:
+        star_delta = (added == star) - (removed == star)
+        if star_delta:
+            changes[f'rating_{star}_count'] = F(f'rating_{star}_count') + star_delta
+    Restaurant.objects.filter(id=restaurant_id).update(**changes)
+
+
+def review_stats_month(created_at):
+    # Same month as TruncMonth('created_at') in the current time zone
+    return timezone.localdate(created_at).replace(day=1)
+
+
+def update_review_monthly_stats(restaurant_id, created_at, added=None, removed=None):
+    """
+    Apply one review rating change to the restaurant's ReviewMonthlyStats row of the review's month.
+    """
+    month = review_stats_month(created_at)
+    if added is not None:
+        # Only an added rating creates the row, a removal can come from the restaurant's own cascade delete.
+        ReviewMonthlyStats.objects.get_or_create(restaurant_id=restaurant_id, month=month)
+    ReviewMonthlyStats.objects.filter(restaurant_id=restaurant_id, month=month).update(
+        rating_sum=F('rating_sum') + (added or 0) - (removed or 0),
+        rating_count=F('rating_count') + (added is not None) - (removed is not None),
+    )
+
+
+class Review(TimeStampedModel, DirtyFieldsMixin):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='restaurant_reviews')
     rating = models.PositiveIntegerField()
     comment = models.TextField(blank=True, null=True)
@@ -334,6 +401,41 @@ class Review(TimeStampedModel):
     class Meta:
         indexes = [
             models.Index(fields=['restaurant']),
+            models.Index(fields=['restaurant', '-id']),
+            models.Index(fields=['restaurant', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        dirty_fields = self.get_dirty_fields(check_relationship=True)
+        with transaction.atomic():
+            super(Review, self).save(*args, **kwargs)
+            if created:
+                update_restaurant_rating(self.restaurant_id, added=self.rating)
+                update_review_monthly_stats(self.restaurant_id, self.created_at, added=self.rating)
+            elif 'restaurant' in dirty_fields:
+                update_restaurant_rating(dirty_fields['restaurant'], removed=dirty_fields.get('rating', self.rating))
+                update_restaurant_rating(self.restaurant_id, added=self.rating)
+                update_review_monthly_stats(dirty_fields['restaurant'], self.created_at, removed=dirty_fields.get('rating', self.rating))
+                update_review_monthly_stats(self.restaurant_id, self.created_at, added=self.rating)
+            elif 'rating' in dirty_fields:
+                update_restaurant_rating(self.restaurant_id, added=self.rating, removed=dirty_fields['rating'])
+                update_review_monthly_stats(self.restaurant_id, self.created_at, added=self.rating, removed=dirty_fields['rating'])
+
+
+class ReviewMonthlyStats(models.Model):
+    """
+    Ratings per restaurant and month, kept up to date by Review.save() and the review delete signal.
+    """
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='review_monthly_stats')
+    month = models.DateField()
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'month'], name='unique_review_monthly_stats'),
         ]
 
 
@@ -353,6 +455,11 @@ WEEKDAYS = [
 ]
 
 
+def update_open_slots(restaurant_id):
+    timings = RestaurantTimings.objects.filter(restaurant_id=restaurant_id).values_list('weekday', 'from_hour', 'to_hour')
+    Restaurant.objects.filter(id=restaurant_id).update(open_slots=compute_open_slots(timings))
+
+
 class RestaurantTimings(TimeStampedModel):
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name='restaurants_timings')
     weekday = models.CharField(
@@ -0,0 +1,77 @@
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Week slots are quarter hours counted from Monday 00:00, so a restaurant's opening hours are
+# a set of integers in [0, WEEK_SLOTS) and "open at t" is one array containment check.
+SLOT_MINUTES = 15
+DAY_SLOTS = 24 * 60 // SLOT_MINUTES
+WEEK_SLOTS = 7 * DAY_SLOTS
+WEEKDAY_INDEX = {'Monday': 0, 'Tuesday': 1, 'Wednesday': 2, 'Thursday': 3, 'Friday': 4, 'Saturday': 5, 'Sunday': 6}
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def compute_open_slots(timings):
+    """
+    timings: iterable of (weekday, from_hour, to_hour). A day without hours is closed, equal hours
+    mean open all day and a to_hour before from_hour continues past midnight into the next day.
+    """
+    slots = set()
+    for weekday, from_hour, to_hour in timings:
+        if weekday not in WEEKDAY_INDEX or from_hour is None or to_hour is None:
+            continue
+        day_start = WEEKDAY_INDEX[weekday] * DAY_SLOTS
+        start = _minutes(from_hour) // SLOT_MINUTES
+        end = -(-_minutes(to_hour) // SLOT_MINUTES)
+        if start == end:
+            end = start + DAY_SLOTS
+        elif end < start:
+            end += DAY_SLOTS
+        slots.update((day_start + slot) % WEEK_SLOTS for slot in range(start, end))
+    return sorted(slots)
+
+
+def restaurant_time_zone():
+    return ZoneInfo(settings.RESTAURANT_TIME_ZONE)
+
+
+def week_slot(moment=None):
+    """
+    Week slot of an aware datetime (now by default) in the restaurants' local time.
+    """
+    moment = timezone.localtime(moment or timezone.now(), restaurant_time_zone())
+    return moment.weekday() * DAY_SLOTS + _minutes(moment) // SLOT_MINUTES
+
+
+def parse_open_at(value):
+    """
+    ISO datetime from a query param, naive values are restaurant local time. None when invalid.
+    """
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, restaurant_time_zone())
+    return moment
+
+
+def filter_open(queryset, query_params):
+    """
+    Applies ?open_now=true or ?open_at=<datetime> with the GIN indexed open_slots column.
+    """
+    if query_params.get('open_now') in ['true', 'True']:
+        return queryset.filter(open_slots__contains=[week_slot()])
+    open_at = query_params.get('open_at')
+    if open_at:
+        moment = parse_open_at(open_at)
+        if moment is not None:
+            return queryset.filter(open_slots__contains=[week_slot(moment)])
+    return queryset
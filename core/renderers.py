@@ -0,0 +1,55 @@
+import json
+
+import orjson
+from django.contrib.gis.geos import GEOSGeometry
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+_encoder = JSONEncoder()
+
+
+def default(obj):
+    """
+    Types orjson does not know. Datetimes are passed through as well so they keep DRF's format
+    (milliseconds, Z for UTC); Decimal, lazy strings, timedelta, UUID, sets and querysets follow DRF's encoder.
+    """
+    if isinstance(obj, GEOSGeometry):
+        return json.loads(obj.geojson)
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement of JSONRenderer on top of orjson. It renders the same JSON values, but not always
+    the same bytes: orjson writes floats its own way (1e16 instead of 1e+16), renders NaN and infinity as
+    null where JSONRenderer refuses them, and only indents with two spaces. Data orjson cannot encode,
+    e.g. integers beyond 64 bits, is rendered by JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = ORJSON_OPTIONS
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        try:
+            ret = orjson.dumps(data, default=default, option=options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Like JSONRenderer, escape the line separators that are valid JSON but not valid javascript.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,110 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+from core.models import BusinessType, ItemIngredient, MenuItem, Restaurant, RestaurantCategory, RestaurantCuisines
+
+SEARCH_CONFIGS = ['english', 'russian']
+
+
+def _text(expression):
+    return Coalesce(expression, Value(''), output_field=TextField())
+
+
+def _related_names(model, field, parent='restaurant'):
+    names = model.objects.filter(**{parent: OuterRef('pk')}).order_by().values(parent).annotate(names=StringAgg(field, ' ')).values('names')
+    return _text(Subquery(names, output_field=TextField()))
+
+
+def _type_name(field):
+    return _text(Subquery(BusinessType.objects.filter(pk=OuterRef('type_id')).values(field)[:1], output_field=TextField()))
+
+
+def search_document():
+    """
+    tsvector of a restaurant: name (A), type, categories and cuisines (B), address (C),
+    indexed with both the english and russian configurations.
+    """
+    document = None
+    for config in SEARCH_CONFIGS:
+        suffix = '_ru' if config == 'russian' else ''
+        vector = (
+            SearchVector(_text(F('name')), config=config, weight='A') +
+            SearchVector(
+                _type_name(f'type{suffix}'),
+                _related_names(RestaurantCategory, f'category__name{suffix}'),
+                _related_names(RestaurantCuisines, f'cuisine__cuisines{suffix}'),
+                config=config, weight='B'
+            ) +
+            SearchVector(_text(F(f'address{suffix}')), config=config, weight='C')
+        )
+        document = vector if document is None else document + vector
+    return document
+
+
+def update_search_documents(restaurant_ids=None):
+    restaurants = Restaurant.objects.all()
+    if restaurant_ids is not None:
+        restaurants = restaurants.filter(id__in=restaurant_ids)
+    return restaurants.update(search_document=search_document())
+
+
+def menu_item_search_document():
+    """
+    tsvector of a menu item: name (A), ingredients (B) and description (C) in both configurations.
+    """
+    document = None
+    for config in SEARCH_CONFIGS:
+        vector = (
+            SearchVector(_text(F('Item_name')), config=config, weight='A') +
+            SearchVector(_related_names(ItemIngredient, 'ingredients', parent='item'), config=config, weight='B') +
+            SearchVector(_text(F('description')), config=config, weight='C')
+        )
+        document = vector if document is None else document + vector
+    return document
+
+
+def update_menu_item_search_documents(item_ids=None):
+    items = MenuItem.objects.all()
+    if item_ids is not None:
+        items = items.filter(id__in=item_ids)
+    return items.update(search_document=menu_item_search_document())
+
+
+def prefix_search_query(search):
+    """
+    tsquery where every word may be a prefix (search as you type), in both configurations, and the normalized text.
+    """
+    words = re.findall(r'\w+', search)
+    if not words:
+        return None, ''
+    raw_query = ' & '.join(f'{word}:*' for word in words)
+    query = None
+    for config in SEARCH_CONFIGS:
+        config_query = SearchQuery(raw_query, config=config, search_type='raw')
+        query = config_query if query is None else query | config_query
+    return query, ' '.join(words)
+
+
+def ranked_search(queryset, search, name_field):
+    """
+    Full-text match on the search document or a trigram match on the name for typos. Annotates `rank`.
+    A document that is not filled in yet or a missing name counts as 0, a NULL rank would sort first in DESC order.
+    """
+    query, search = prefix_search_query(search)
+    if query is None:
+        return queryset.none()
+    return queryset.filter(Q(search_document=query) | Q(**{f'{name_field}__trigram_word_similar': search})).annotate(
+        rank=Coalesce(SearchRank(F('search_document'), query), Value(0.0)) + Coalesce(TrigramWordSimilarity(search, name_field), Value(0.0))
+    )
+
+
+def search_restaurants(queryset, search):
+    return ranked_search(queryset, search, 'name')
+
+
+def search_menu_items(queryset, search):
+    return ranked_search(queryset, search, 'Item_name')
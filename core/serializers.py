@@ -1,38 +1,39 @@
-from rest_framework.fields import SerializerMethodField
+from rest_framework.fields import FloatField, SerializerMethodField
 from rest_framework.relations import StringRelatedField
-from rest_framework.serializers import ModelSerializer
+from rest_framework.serializers import ListSerializer, ModelSerializer
 from admin_dashboard.models import UserDisputeResolution
-from core.models import Restaurant, Category, SubCategory, Review, AdsBanner, Favorite, RestaurantTimings, RestaurantService, RestaurantImages, Cuisines, Service, MenuItem, ItemIngredient, \
+from core.models import Restaurant, Category, SubCategory, Review, AdsBanner, Favorite, RestaurantTimings, RestaurantService, RestaurantImages, Cuisines, Service, MenuItem, ItemIngredient, MenuItemImages, \
     ReviewReply, QA, BusinessType, City, State, ModeOfPayment, RestaurantAcceptedPayment, RestaurantCuisines, MenuType
+from core.sparse_fields import SparseFieldsMixin
 from owner_dashboard.models import PublicQuery
 from users.models import User
 
 
-class AllBusinessTypesSerializer(ModelSerializer):
+class AllBusinessTypesSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = BusinessType
         fields = '__all__'
 
 
-class CitySerializer(ModelSerializer):
+class CitySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = City
         fields = '__all__'
 
 
-class StateSerializer(ModelSerializer):
+class StateSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = State
         fields = '__all__'
 
 
-class SubCategorySerializer(ModelSerializer):
+class SubCategorySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = SubCategory
         fields = '__all__'
 
 
-class HomeCategoriesSerializer(ModelSerializer):
+class HomeCategoriesSerializer(SparseFieldsMixin, ModelSerializer):
     sub_categories = SubCategorySerializer(many=True)
 
     class Meta:
@@ -40,19 +41,19 @@ class HomeCategoriesSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class ReviewUserSerializer(ModelSerializer):
+class ReviewUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id','username', 'email', 'profile_image']
 
 
-class ReviewRestaurantSerializer(ModelSerializer):
+class ReviewRestaurantSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Restaurant
         fields = ['id', 'name', 'profile_image']
 
 
-class HomeRecentReviewSerializer(ModelSerializer):
+class HomeRecentReviewSerializer(SparseFieldsMixin, ModelSerializer):
     restaurant = ReviewRestaurantSerializer(read_only=True)
     user = ReviewUserSerializer(read_only=True)
 
@@ -61,57 +62,80 @@ class HomeRecentReviewSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class SearchRestaurantUserSerializer(ModelSerializer):
+class SearchRestaurantUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['first_name', 'last_name', 'email']
 
 
-class RestaurantSearchSerializer(ModelSerializer):
+class RestaurantSearchSerializer(SparseFieldsMixin, ModelSerializer):
     owner = SearchRestaurantUserSerializer(read_only=True)
     manager = SearchRestaurantUserSerializer(read_only=True)
+    distance_m = FloatField(read_only=True)
 
     class Meta:
         model = Restaurant
         fields = [
-            'id', 'name', 'profile_image', 'business_description', 'average_rating', 'owner', 'manager'
+            'id', 'name', 'profile_image', 'business_description', 'average_rating', 'owner', 'manager', 'distance_m'
         ]
 
 
-class AdsBannerSerializer(ModelSerializer):
+class AdsBannerSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = AdsBanner
         fields = '__all__'
 
 
-class NearByRestaurantSerializer(ModelSerializer):
+class NearByRestaurantSerializer(SparseFieldsMixin, ModelSerializer):
+    distance_m = FloatField(read_only=True)
+
     class Meta:
         model = Restaurant
         fields = [
-            'name', 'id', 'profile_image', 'business_description', 'average_rating',
+            'name', 'id', 'profile_image', 'business_description', 'average_rating', 'distance_m',
         ]
 
 
-class RestaurantListSerializer(ModelSerializer):
+class FavoriteIdsListSerializer(ListSerializer):
+    """
+    Loads the user's favorites among the whole page in one query into context['favorite_ids'],
+    so each row only checks set membership.
+    """
+
+    def get_favorite_ids(self, items):
+        user = self.context.get('user')
+        if user is None:
+            return set()
+        return set(Favorite.objects.filter(user=user, restaurant__in=items).values_list('restaurant_id', flat=True))
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self.context['favorite_ids'] = self.get_favorite_ids(items)
+        return super().to_representation(items)
+
+
+class RestaurantListSerializer(SparseFieldsMixin, ModelSerializer):
     city = CitySerializer(read_only=True)
     state = StateSerializer(read_only=True)
     is_favorite = SerializerMethodField('get_is_favorite', read_only=True)
+    distance_m = FloatField(read_only=True)
 
     def get_is_favorite(self, data):
         user = self.context['user']
         if user is None:
             return False
-        else:
-            if Favorite.objects.filter(user=user, restaurant=data).exists():
-                return True
-            else:
-                return False
+        favorite_ids = self.context.get('favorite_ids')
+        if favorite_ids is not None:
+            return data.id in favorite_ids
+        return Favorite.objects.filter(user=user, restaurant=data).exists()
 
     class Meta:
         model = Restaurant
         fields = [
-            'id', 'name', 'profile_image', 'average_rating', 'rating_count', 'business_description', 'is_disabled', 'phone_number', 'address', 'address_ru', 'latitude', 'longitude', 'city', 'state', 'is_favorite'
+            'id', 'name', 'profile_image', 'average_rating', 'rating_count', 'business_description', 'is_disabled', 'phone_number', 'address', 'address_ru', 'latitude', 'longitude', 'city', 'state', 'is_favorite',
+            'distance_m'
         ]
+        list_serializer_class = FavoriteIdsListSerializer
 
 
 class FavoriteSerializer(ModelSerializer):
@@ -121,7 +145,7 @@ class FavoriteSerializer(ModelSerializer):
         read_only_fields = ['id', 'user', 'restaurant', 'created_at', 'updated_at', 'user', ]
 
 
-class RestaurantUserSerializer(ModelSerializer):
+class RestaurantUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -129,19 +153,19 @@ class RestaurantUserSerializer(ModelSerializer):
         ]
 
 
-class RestaurantImagesSerializer(ModelSerializer):
+class RestaurantImagesSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = RestaurantImages
         fields = ['image', 'id']
 
 
-class ServiceSerializer(ModelSerializer):
+class ServiceSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Service
         fields = ['id', 'service_name', 'service_name_ru']
 
 
-class RestaurantDetailsServiceSerializer(ModelSerializer):
+class RestaurantDetailsServiceSerializer(SparseFieldsMixin, ModelSerializer):
     service = ServiceSerializer(read_only=True)
 
     class Meta:
@@ -149,7 +173,7 @@ class RestaurantDetailsServiceSerializer(ModelSerializer):
         fields = ['service', ]
 
 
-class RestaurantTimeSerializer(ModelSerializer):
+class RestaurantTimeSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = RestaurantTimings
         fields = [
@@ -164,13 +188,13 @@ class CuisinesDropdownSerializer(ModelSerializer):
         fields = '__all__'
 
 
-class CuisinesSerializer(ModelSerializer):
+class CuisinesSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Cuisines
         fields = '__all__'
 
 
-class RestaurantCuisinesSerializer(ModelSerializer):
+class RestaurantCuisinesSerializer(SparseFieldsMixin, ModelSerializer):
     cuisine = CuisinesSerializer(read_only=True)
 
     class Meta:
@@ -186,13 +210,13 @@ class ReviewPartialSerializer(ModelSerializer):
         fields = ['id', 'rating', 'comment']
 
 
-class PaymentModeDetailSerializer(ModelSerializer):
+class PaymentModeDetailSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ModeOfPayment
         fields = '__all__'
 
 
-class RestaurantPaymentMethodSerializer(ModelSerializer):
+class RestaurantPaymentMethodSerializer(SparseFieldsMixin, ModelSerializer):
     payment = PaymentModeDetailSerializer()
 
     class Meta:
@@ -200,59 +224,38 @@ class RestaurantPaymentMethodSerializer(ModelSerializer):
         fields = ['payment', 'id']
 
 
-class RestaurantDetailSerializer(ModelSerializer):
+class RestaurantDetailSerializer(SparseFieldsMixin, ModelSerializer):
+    """
+    The part of the restaurant page that is the same for every user, is_favorite and your_review are added by the view.
+    """
     owner = RestaurantUserSerializer(read_only=True)
     manager = RestaurantUserSerializer(read_only=True)
     restaurant_images = RestaurantImagesSerializer(many=True, read_only=True)
     restaurant_services = RestaurantDetailsServiceSerializer(many=True, read_only=True)
     restaurants_timings = RestaurantTimeSerializer(many=True, read_only=True)
     cuisines = RestaurantCuisinesSerializer(read_only=True, many=True)
-    is_favorite = SerializerMethodField('get_is_favorite', read_only=True)
-    your_review = SerializerMethodField('get_your_review', read_only=True)
     city = CitySerializer(read_only=True)
     state = StateSerializer(read_only=True)
     type = AllBusinessTypesSerializer(read_only=True)
     restaurant_payment_modes = RestaurantPaymentMethodSerializer(read_only=True, many=True)
 
-    def get_is_favorite(self, data):
-
-        user = self.context['user']
-        if user is None:
-            return False
-        else:
-            if Favorite.objects.filter(user=user, restaurant=data).exists():
-                return True
-            else:
-                return False
-
-    def get_your_review(self, data):
-        user = self.context['user']
-        restaurant = self.context['restaurant']
-        if user is not None and restaurant is not None:
-            try:
-                review = Review.objects.get(user=user, restaurant=restaurant)
-                review = ReviewPartialSerializer(instance=review).data
-            except Exception as e:
-                review = None
-            return review
-
     class Meta:
         model = Restaurant
         fields = [
             'id', 'name', 'owner', 'manager', 'phone_number', 'phone_number_2', 'business_whatsapp', 'business_instagram', 'business_2gis', 'address', 'address_ru', 'location', 'latitude',
             'longitude', 'location_point', 'city', 'state', 'zipcode', 'is_approved', 'profile_image', 'business_description', 'cuisines', 'type', 'known_for', 'must_order', 'year_of_established',
-            'average_bill', 'business_capacity', 'business_email', 'is_disabled', 'average_rating', 'rating_count', 'restaurant_services', 'restaurants_timings', 'restaurant_images', 'is_favorite',
-            'your_review', 'business_website', 'restaurant_payment_modes'
+            'average_bill', 'business_capacity', 'business_email', 'is_disabled', 'average_rating', 'rating_count', 'rating_histogram', 'restaurant_services', 'restaurants_timings', 'restaurant_images',
+            'business_website', 'restaurant_payment_modes'
         ]
 
 
-class MenuTypeSerializer(ModelSerializer):
+class MenuTypeSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = MenuType
         fields = '__all__'
 
 
-class IngredientSerializer(ModelSerializer):
+class IngredientSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ItemIngredient
         fields = [
@@ -260,7 +263,7 @@ class IngredientSerializer(ModelSerializer):
         ]
 
 
-class RestaurantMenuSerializer(ModelSerializer):
+class RestaurantMenuSerializer(SparseFieldsMixin, ModelSerializer):
     item_ingredients = IngredientSerializer(many=True, read_only=True)
 
     class Meta:
@@ -270,7 +273,32 @@ class RestaurantMenuSerializer(ModelSerializer):
         ]
 
 
-class MenuItemDetailsSerializer(ModelSerializer):
+class DishSearchItemSerializer(SparseFieldsMixin, ModelSerializer):
+    class Meta:
+        model = MenuItem
+        fields = [
+            'id', 'Item_name', 'description', 'cover_image', 'price', 'is_veg',
+        ]
+
+
+class MenuItemImageSerializer(SparseFieldsMixin, ModelSerializer):
+    class Meta:
+        model = MenuItemImages
+        fields = ['id', 'image']
+
+
+class FullMenuItemSerializer(SparseFieldsMixin, ModelSerializer):
+    item_ingredients = IngredientSerializer(many=True, read_only=True)
+    menu_item_images = MenuItemImageSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = MenuItem
+        fields = [
+            'id', 'Item_name', 'description', 'cover_image', 'price', 'is_veg', 'item_ingredients', 'menu_item_images',
+        ]
+
+
+class MenuItemDetailsSerializer(SparseFieldsMixin, ModelSerializer):
     sub_category = SubCategorySerializer(read_only=True)
     item_ingredients = IngredientSerializer(many=True, read_only=True)
     menu_type = MenuTypeSerializer(read_only=True)
@@ -282,13 +310,13 @@ class MenuItemDetailsSerializer(ModelSerializer):
         ]
 
 
-class ReviewReplaySerializer(ModelSerializer):
+class ReviewReplaySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ReviewReply
         fields = ['replay', ]
 
 
-class RestaurantReviewSerializer(ModelSerializer):
+class RestaurantReviewSerializer(SparseFieldsMixin, ModelSerializer):
     review_replays = ReviewReplaySerializer(read_only=True, many=True)
     user = ReviewUserSerializer(read_only=True)
 
@@ -302,7 +330,13 @@ class RestaurantReviewSerializer(ModelSerializer):
         ]
 
 
-class FavoriteListSerializer(ModelSerializer):
+class FavoritePageListSerializer(FavoriteIdsListSerializer):
+    def get_favorite_ids(self, items):
+        # Every listed restaurant is a favorite of the user.
+        return {item.restaurant_id for item in items}
+
+
+class FavoriteListSerializer(SparseFieldsMixin, ModelSerializer):
     restaurant = RestaurantListSerializer(read_only=True)
 
     class Meta:
@@ -310,9 +344,10 @@ class FavoriteListSerializer(ModelSerializer):
         fields = [
             'restaurant'
         ]
+        list_serializer_class = FavoritePageListSerializer
 
 
-class RestaurantQASerializer(ModelSerializer):
+class RestaurantQASerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = QA
         fields = ['id', 'question', 'answer']
@@ -0,0 +1,189 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from core.autocomplete import autocomplete_index, category_entry, cuisine_entry, restaurant_entry, sub_category_entry
+from core.cache import bump_cache_version, bump_object_cache_version, track_cache_version
+from core.models import AdsBanner, BusinessType, Category, City, Cuisines, ItemIngredient, MenuItem, MenuItemImages, MenuType, ModeOfPayment, Restaurant, RestaurantAcceptedPayment, RestaurantCategory, \
+    RestaurantCuisines, RestaurantImages, RestaurantService, RestaurantTimings, Review, Service, State, SubCategory, update_open_slots, update_restaurant_rating, \
+    update_review_monthly_stats
+from core.search import update_menu_item_search_documents, update_search_documents
+from core.serializers import RestaurantUserSerializer, ReviewUserSerializer
+from core.tasks import refresh_search_documents
+from users.models import User
+
+# Reference data behind the cached list endpoints (core.cache.CachedResponseMixin)
+track_cache_version(Category, SubCategory, Service, Cuisines, City, State, BusinessType, MenuType, ModeOfPayment, RestaurantAcceptedPayment)
+# Data behind the public restaurant lists (core.cache.PublicResponseCacheMixin)
+track_cache_version(Restaurant, Review, RestaurantCategory, RestaurantCuisines, RestaurantService, RestaurantTimings, AdsBanner)
+
+RESTAURANT_USER_FIELDS = set(RestaurantUserSerializer.Meta.fields)
+REVIEW_USER_FIELDS = set(ReviewUserSerializer.Meta.fields)
+
+AUTOCOMPLETE_ENTRIES = {Category: category_entry, SubCategory: sub_category_entry, Cuisines: cuisine_entry}
+AUTOCOMPLETE_TYPES = {Restaurant: 'restaurant', Category: 'category', SubCategory: 'sub_category', Cuisines: 'cuisine'}
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    # Also runs for reviews removed by a cascade, e.g. when their user is deleted.
+    update_restaurant_rating(instance.restaurant_id, removed=instance.rating)
+    update_review_monthly_stats(instance.restaurant_id, instance.created_at, removed=instance.rating)
+
+
+@receiver(post_save, sender=Restaurant)
+def update_restaurant_search_document(sender, instance, **kwargs):
+    update_search_documents([instance.pk])
+
+
+@receiver(post_save, sender=RestaurantCategory)
+@receiver(post_delete, sender=RestaurantCategory)
+@receiver(post_save, sender=RestaurantCuisines)
+@receiver(post_delete, sender=RestaurantCuisines)
+def update_related_search_document(sender, instance, **kwargs):
+    update_search_documents([instance.restaurant_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Cuisines)
+@receiver(post_save, sender=BusinessType)
+def refresh_renamed_search_documents(sender, instance, created, **kwargs):
+    # A rename can touch many restaurants, so re-index them in the background.
+    if created:
+        return
+    if sender is Category:
+        restaurant_ids = RestaurantCategory.objects.filter(category=instance).values_list('restaurant_id', flat=True)
+    elif sender is Cuisines:
+        restaurant_ids = RestaurantCuisines.objects.filter(cuisine=instance).values_list('restaurant_id', flat=True)
+    else:
+        restaurant_ids = Restaurant.objects.filter(type=instance).values_list('id', flat=True)
+    restaurant_ids = list(restaurant_ids.distinct())
+    if restaurant_ids:
+        transaction.on_commit(lambda: refresh_search_documents.delay(restaurant_ids))
+
+
+def update_autocomplete(entry_type, entry_id, entry=None):
+    transaction.on_commit(lambda: autocomplete_index.update(entry_type, entry_id, entry))
+
+
+def _autocomplete_fields(instance):
+    # Read from __dict__ so deferred fields are not loaded.
+    return tuple(instance.__dict__.get(field) for field in ('name', 'is_approved', 'is_disabled'))
+
+
+@receiver(post_init, sender=Restaurant)
+def remember_restaurant_autocomplete(sender, instance, **kwargs):
+    instance._original_autocomplete_fields = _autocomplete_fields(instance)
+
+
+@receiver(post_save, sender=Restaurant)
+def update_restaurant_autocomplete(sender, instance, created, **kwargs):
+    # Only a new name or a change of visibility reaches the index.
+    fields = _autocomplete_fields(instance)
+    if not created and fields == instance._original_autocomplete_fields:
+        return
+    instance._original_autocomplete_fields = fields
+    visible = instance.is_approved and not instance.is_disabled
+    update_autocomplete('restaurant', instance.pk, restaurant_entry(instance) if visible else None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_save, sender=Cuisines)
+def update_catalog_autocomplete(sender, instance, **kwargs):
+    entry = AUTOCOMPLETE_ENTRIES[sender](instance)
+    update_autocomplete(entry['type'], instance.pk, entry)
+
+
+@receiver(post_delete, sender=Restaurant)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=SubCategory)
+@receiver(post_delete, sender=Cuisines)
+def remove_autocomplete(sender, instance, **kwargs):
+    update_autocomplete(AUTOCOMPLETE_TYPES[sender], instance.pk)
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def bump_restaurant_cache_version(sender, instance, **kwargs):
+    bump_object_cache_version(Restaurant, instance.pk)
+
+
+@receiver(post_save, sender=RestaurantImages)
+@receiver(post_delete, sender=RestaurantImages)
+@receiver(post_save, sender=RestaurantService)
+@receiver(post_delete, sender=RestaurantService)
+@receiver(post_save, sender=RestaurantTimings)
+@receiver(post_delete, sender=RestaurantTimings)
+@receiver(post_save, sender=RestaurantCuisines)
+@receiver(post_delete, sender=RestaurantCuisines)
+@receiver(post_save, sender=RestaurantAcceptedPayment)
+@receiver(post_delete, sender=RestaurantAcceptedPayment)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_related_restaurant_cache_version(sender, instance, **kwargs):
+    bump_object_cache_version(Restaurant, instance.restaurant_id)
+
+
+@receiver(pre_save, sender=User)
+def bump_staff_restaurant_cache_version(sender, instance, **kwargs):
+    # Owners and managers are shown on the restaurant page.
+    if instance.pk is None or not set(instance.get_dirty_fields()) & RESTAURANT_USER_FIELDS:
+        return
+    restaurant_ids = list(Restaurant.objects.filter(Q(owner=instance) | Q(manager=instance)).values_list('id', flat=True))
+    transaction.on_commit(lambda: [bump_object_cache_version(Restaurant, restaurant_id) for restaurant_id in restaurant_ids])
+    if restaurant_ids:
+        # Restaurant search shows them too.
+        transaction.on_commit(lambda: bump_cache_version(Restaurant))
+
+
+@receiver(pre_save, sender=User)
+def bump_reviewer_cache_version(sender, instance, **kwargs):
+    # Reviewers are shown with the recent reviews.
+    if instance.pk is None or not set(instance.get_dirty_fields()) & REVIEW_USER_FIELDS:
+        return
+    if Review.objects.filter(user=instance).exists():
+        transaction.on_commit(lambda: bump_cache_version(Review))
+
+
+@receiver(post_save, sender=RestaurantTimings)
+@receiver(post_delete, sender=RestaurantTimings)
+def update_restaurant_open_slots(sender, instance, **kwargs):
+    update_open_slots(instance.restaurant_id)
+
+
+@receiver(post_save, sender=MenuItem)
+def update_menu_item_search_document(sender, instance, **kwargs):
+    update_menu_item_search_documents([instance.pk])
+
+
+@receiver(post_save, sender=ItemIngredient)
+@receiver(post_delete, sender=ItemIngredient)
+def update_ingredient_search_document(sender, instance, **kwargs):
+    update_menu_item_search_documents([instance.item_id])
+
+
+def bump_menu_cache_version(restaurant_id):
+    # The full menu is versioned per restaurant under the MenuItem model.
+    if restaurant_id is not None:
+        bump_object_cache_version(MenuItem, restaurant_id)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def bump_item_menu_cache_version(sender, instance, **kwargs):
+    bump_menu_cache_version(instance.restaurant_id)
+
+
+@receiver(post_save, sender=ItemIngredient)
+@receiver(post_delete, sender=ItemIngredient)
+@receiver(post_save, sender=MenuItemImages)
+@receiver(post_delete, sender=MenuItemImages)
+def bump_item_detail_menu_cache_version(sender, instance, **kwargs):
+    field = sender._meta.get_field('item' if sender is ItemIngredient else 'menu_item')
+    if field.is_cached(instance):
+        restaurant_id = getattr(instance, field.name).restaurant_id
+    else:
+        restaurant_id = MenuItem.objects.filter(id=getattr(instance, field.attname)).values_list('restaurant_id', flat=True).first()
+    bump_menu_cache_version(restaurant_id)
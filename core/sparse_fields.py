@@ -0,0 +1,146 @@
+import hashlib
+
+from django.db.models import Prefetch
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.serializers import ListSerializer, ModelSerializer
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_field_paths(value):
+    """
+    'id,name,city.city' -> {('id',), ('name',), ('city', 'city')}, None when the param is not given.
+    """
+    if value is None:
+        return None
+    paths = set()
+    for item in value.split(','):
+        path = tuple(part for part in item.strip().split('.') if part)
+        if path:
+            paths.add(path)
+    return paths
+
+
+def get_sparse_params(request):
+    """
+    The parsed ?fields= and ?expand= of a GET request, (None, None) otherwise.
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None, None
+    params = getattr(request, 'query_params', request.GET)
+    return parse_field_paths(params.get(FIELDS_PARAM)), parse_field_paths(params.get(EXPAND_PARAM))
+
+
+def get_sparse_cache_suffix(requested, expand):
+    """
+    Cache key suffix for a field selection, '' without ?fields= and ?expand= so the full response keeps the short key.
+    """
+    if requested is None and expand is None:
+        return ''
+    selection = ':'.join(','.join(sorted('.'.join(path) for path in paths or [])) for paths in (requested, expand))
+    return ':' + hashlib.md5(selection.encode()).hexdigest()
+
+
+def is_rendered(path, fields):
+    # Rendered when it, one of its parents or one of its children is requested.
+    if fields is None:
+        return True
+    return any(requested[:len(path)] == path or path[:len(requested)] == requested for requested in fields)
+
+
+def is_expanded(path, fields, expand):
+    """
+    Whether the nested serializer at path is rendered in full, without ?expand= every one is.
+    Asking for a child field in ?fields= expands its parent as well.
+    """
+    if expand is None:
+        return True
+    for depth in range(1, len(path) + 1):
+        prefix = path[:depth]
+        expanded = any(item[:depth] == prefix for item in expand)
+        if not expanded and fields is not None:
+            expanded = any(len(item) > depth and item[:depth] == prefix for item in fields)
+        if not expanded:
+            return False
+    return True
+
+
+def serializer_path(serializer):
+    names = []
+    while serializer.parent is not None:
+        if serializer.field_name:
+            names.append(serializer.field_name)
+        serializer = serializer.parent
+    return tuple(reversed(names))
+
+
+def collapse_to_pk(name, field):
+    """
+    Primary key field in place of a nested model serializer, None for anything else.
+    """
+    many = isinstance(field, ListSerializer)
+    child = field.child if many else field
+    if not isinstance(child, ModelSerializer) or field.source == '*':
+        return None
+    kwargs = {'read_only': True, 'many': many}
+    if field.source not in (None, name):
+        kwargs['source'] = field.source
+    return PrimaryKeyRelatedField(**kwargs)
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,name,city.city renders only the listed fields, dotted names select fields of nested serializers.
+    ?expand=owner,restaurant_images renders only the listed nested serializers, the others become primary keys.
+    Without the params the output is unchanged. Nested serializers need the mixin too for dotted names to reach them.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested, expand = get_sparse_params(self.context.get('request'))
+        if requested is None and expand is None:
+            return fields
+
+        path = serializer_path(self)
+        for name, field in list(fields.items()):
+            field_path = path + (name,)
+            if not is_rendered(field_path, requested):
+                del fields[name]
+            elif not is_expanded(field_path, requested, expand):
+                collapsed = collapse_to_pk(name, field)
+                if collapsed is not None:
+                    fields[name] = collapsed
+        return fields
+
+
+class SparseFieldsQuerysetMixin:
+    """
+    Joins and prefetches only for the fields the response renders. Both maps go from a (dotted) output
+    field to its lookups, e.g. {'restaurant_images': ['restaurant_images']}. A nested serializer collapsed
+    to primary keys skips its select_related and prefetches the bare relation.
+    """
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    def get_sparse_params(self):
+        return get_sparse_params(self.request)
+
+    def is_field_rendered(self, name):
+        requested, expand = self.get_sparse_params()
+        return is_rendered(tuple(name.split('.')), requested)
+
+    def apply_sparse_fields(self, queryset):
+        requested, expand = self.get_sparse_params()
+        for name, lookups in self.select_related_fields.items():
+            path = tuple(name.split('.'))
+            if is_rendered(path, requested) and is_expanded(path, requested, expand):
+                queryset = queryset.select_related(*lookups)
+        for name, lookups in self.prefetch_related_fields.items():
+            path = tuple(name.split('.'))
+            if not is_rendered(path, requested) or not is_expanded(path[:-1], requested, expand):
+                continue
+            if not is_expanded(path, requested, expand):
+                lookups = [lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup for lookup in lookups]
+            queryset = queryset.prefetch_related(*lookups)
+        return queryset
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from core.cache import bump_cache_version
+from core.models import Restaurant
+from core.search import update_search_documents
+
+
+@shared_task()
+def refresh_search_documents(restaurant_ids):
+    update_search_documents(restaurant_ids)
+    # Cached search results
+    bump_cache_version(Restaurant)
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Category, Cuisines, ModeOfPayment, Restaurant, RestaurantAcceptedPayment, RestaurantCategory, RestaurantCuisines, RestaurantService, Service
+
+
+def add_catalogue(start, count):
+    for i in range(start, start + count):
+        Category.objects.create(name=f'Category {i}', name_ru=f'Категория {i}')
+        Service.objects.create(service_name=f'Service {i}', service_name_ru=f'Услуга {i}')
+        Cuisines.objects.create(cuisines=f'Cuisine {i}', cuisines_ru=f'Кухня {i}')
+        ModeOfPayment.objects.create(payment_name=f'Payment {i}', payment_name_ru=f'Оплата {i}')
+
+
+class CatalogueDropdownTestMixin:
+    """
+    The catalogue dropdowns of a dashboard: three entries of each, one already added to the restaurant.
+    Set `namespace`, `dropdowns` (url name -> name of the "already added" flag) and create_user().
+    """
+    namespace = None
+    dropdowns = {}
+    # The user is the owner of the restaurant
+    owns_restaurant = False
+
+    @classmethod
+    def create_user(cls):
+        raise NotImplementedError
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls.create_user()
+        cls.restaurant = Restaurant.objects.create(name='Restaurant', owner=cls.user if cls.owns_restaurant else None, latitude=43.238, longitude=76.889)
+        add_catalogue(0, 3)
+        RestaurantCategory.objects.create(restaurant=cls.restaurant, category=Category.objects.get(name='Category 0'))
+        RestaurantService.objects.create(restaurant=cls.restaurant, service=Service.objects.get(service_name='Service 0'))
+        RestaurantCuisines.objects.create(restaurant=cls.restaurant, cuisine=Cuisines.objects.get(cuisines='Cuisine 0'))
+        RestaurantAcceptedPayment.objects.create(restaurant=cls.restaurant, payment=ModeOfPayment.objects.get(payment_name='Payment 0'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url_name):
+        # Nothing from the access or response caches
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'v1:{self.namespace}:{url_name}', kwargs={'restaurant_id': self.restaurant.id}))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_added_flags(self):
+        for url_name, flag in self.dropdowns.items():
+            with self.subTest(url_name):
+                response, query_count = self.get(url_name)
+                self.assertEqual(len(response.data), 3)
+                self.assertEqual(sum(row[flag] for row in response.data), 1)
+
+    def test_query_count_does_not_grow_with_the_catalogue(self):
+        query_counts = {url_name: self.get(url_name)[1] for url_name in self.dropdowns}
+        add_catalogue(3, 30)
+        for url_name, query_count in query_counts.items():
+            with self.subTest(url_name):
+                self.assertEqual(self.get(url_name)[1], query_count)
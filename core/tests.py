@@ -1,3 +1,363 @@
-from django.test import TestCase
+import json
+from datetime import datetime, time, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.autocomplete import CHANGE_CACHE_PREFIX, PrefixIndex, cuisine_entry, restaurant_entry
+from core.cache import normalize_query_params
+from core.geo import grid_cell
+from core.models import City, Cuisines, Favorite, Restaurant, RestaurantTimings, Review
+from core.opening_hours import DAY_SLOTS, WEEK_SLOTS, compute_open_slots, parse_open_at, restaurant_time_zone, week_slot
+from core.renderers import ORJSONRenderer
+from core.views import HomeApi
+from users.models import User
+
+
+def create_restaurant(name, **kwargs):
+    return Restaurant.objects.create(**{'name': name, 'is_approved': True, 'latitude': 43.238, 'longitude': 76.889, **kwargs})
+
+
+class RestaurantRatingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='visitor', email='visitor@example.com', is_visitor=True)
+        cls.other_user = User.objects.create(username='other', email='other@example.com', is_visitor=True)
+
+    def setUp(self):
+        self.restaurant = create_restaurant('Restaurant')
+        self.other_restaurant = create_restaurant('Other restaurant')
+
+    def assertRating(self, restaurant, histogram):
+        # histogram: star -> number of reviews
+        restaurant.refresh_from_db()
+        ratings = [star for star, count in histogram.items() for _ in range(count)]
+        self.assertEqual(restaurant.rating_sum, sum(ratings))
+        self.assertEqual(restaurant.rating_count, len(ratings))
+        self.assertAlmostEqual(restaurant.average_rating, sum(ratings) / len(ratings) if ratings else 0)
+        for star in range(1, 6):
+            self.assertEqual(getattr(restaurant, f'rating_{star}_count'), histogram.get(star, 0))
+
+    def test_create(self):
+        Review.objects.create(restaurant=self.restaurant, user=self.user, rating=5)
+        Review.objects.create(restaurant=self.restaurant, user=self.other_user, rating=2)
+        self.assertRating(self.restaurant, {5: 1, 2: 1})
+        self.assertRating(self.other_restaurant, {})
+
+    def test_rating_change(self):
+        review = Review.objects.create(restaurant=self.restaurant, user=self.user, rating=5)
+        review.rating = 3
+        review.save()
+        self.assertRating(self.restaurant, {3: 1})
+
+        # Saving without a change applies nothing
+        review.comment = 'Good'
+        review.save()
+        self.assertRating(self.restaurant, {3: 1})
+
+    def test_restaurant_move(self):
+        Review.objects.create(restaurant=self.restaurant, user=self.other_user, rating=4)
+        review = Review.objects.create(restaurant=self.restaurant, user=self.user, rating=5)
+        review.restaurant = self.other_restaurant
+        review.rating = 1
+        review.save()
+        self.assertRating(self.restaurant, {4: 1})
+        self.assertRating(self.other_restaurant, {1: 1})
+
+    def test_delete(self):
+        review = Review.objects.create(restaurant=self.restaurant, user=self.user, rating=5)
+        Review.objects.create(restaurant=self.restaurant, user=self.other_user, rating=3)
+        review.delete()
+        self.assertRating(self.restaurant, {3: 1})
+
+        # A cascade from the user goes through the delete signal as well
+        self.other_user.delete()
+        self.assertRating(self.restaurant, {})
+
+
+class ComputeOpenSlotsTest(SimpleTestCase):
+    def test_day(self):
+        # Monday 09:00 - 18:00 is quarter hours 36 to 71, Tuesday starts at DAY_SLOTS
+        self.assertEqual(compute_open_slots([('Monday', time(9), time(18))]), list(range(36, 72)))
+        self.assertEqual(compute_open_slots([('Tuesday', time(9), time(9, 30))]), [DAY_SLOTS + 36, DAY_SLOTS + 37])
+
+    def test_partial_quarter_hours_are_open(self):
+        self.assertEqual(compute_open_slots([('Monday', time(9, 10), time(9, 20))]), [36, 37])
+
+    def test_past_midnight_wraps_around_the_week(self):
+        # Sunday 22:00 - 02:00 continues into Monday
+        self.assertEqual(compute_open_slots([('Sunday', time(22), time(2))]), list(range(0, 8)) + list(range(6 * DAY_SLOTS + 88, WEEK_SLOTS)))
+
+    def test_equal_hours_are_open_all_day(self):
+        self.assertEqual(compute_open_slots([('Wednesday', time(0), time(0))]), list(range(2 * DAY_SLOTS, 3 * DAY_SLOTS)))
+
+    def test_closed_days_are_skipped(self):
+        self.assertEqual(compute_open_slots([('Monday', None, time(18)), ('Holiday', time(9), time(18))]), [])
+
+    def test_week_slot(self):
+        # 2024-01-01 is a Monday
+        moment = datetime(2024, 1, 1, 10, 20, tzinfo=restaurant_time_zone())
+        self.assertEqual(week_slot(moment), 41)
+        self.assertEqual(week_slot(moment.replace(day=7, hour=23, minute=59)), WEEK_SLOTS - 1)
+
+    def test_parse_open_at(self):
+        self.assertEqual(parse_open_at('2024-01-01T10:00:00'), datetime(2024, 1, 1, 10, tzinfo=restaurant_time_zone()))
+        self.assertIsNone(parse_open_at('tomorrow'))
+        self.assertIsNone(parse_open_at('2024-13-01T10:00:00'))
+
+
+class OpenSlotsTest(TestCase):
+    def setUp(self):
+        self.restaurant = create_restaurant('Restaurant')
+
+    def assertOpenSlots(self, slots):
+        self.restaurant.refresh_from_db()
+        self.assertEqual(self.restaurant.open_slots, list(slots))
+
+    def test_rebuilt_when_timings_change(self):
+        timing = RestaurantTimings.objects.create(restaurant=self.restaurant, weekday='Monday', from_hour=time(9), to_hour=time(18))
+        self.assertOpenSlots(range(36, 72))
+
+        timing.to_hour = time(12, 10)
+        timing.save()
+        self.assertOpenSlots(range(36, 49))
+
+        timing.delete()
+        self.assertOpenSlots([])
+
+    def test_open_at_filter(self):
+        RestaurantTimings.objects.create(restaurant=self.restaurant, weekday='Monday', from_hour=time(9), to_hour=time(18))
+        cache.clear()
+        url = reverse('v1:Core V1:Restaurants list and filters')
+        opened = APIClient().get(url, {'open_at': '2024-01-01T10:00:00'})
+        closed = APIClient().get(url, {'open_at': '2024-01-01T20:00:00'})
+        self.assertEqual([row['id'] for row in opened.data['results']], [self.restaurant.id])
+        self.assertEqual(closed.data['results'], [])
+
+
+class NormalizeQueryParamsTest(SimpleTestCase):
+    def test_sorted_by_name(self):
+        self.assertEqual(normalize_query_params(QueryDict('rating=4&city=1&category=2')).urlencode(), 'category=2&city=1&rating=4')
+
+    def test_keeps_every_value(self):
+        params = normalize_query_params(QueryDict('type=2&city=1&type=1'))
+        self.assertEqual(params.getlist('type'), ['2', '1'])
+        self.assertEqual(params.urlencode(), 'city=1&type=2&type=1')
+
+    def test_same_params_same_key(self):
+        self.assertEqual(normalize_query_params(QueryDict('a=1&b=2')), normalize_query_params(QueryDict('b=2&a=1')))
+
+
+class PublicRestaurantListCacheTest(TestCase):
+    url = reverse('v1:Core V1:Restaurants list and filters')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='visitor', email='visitor@example.com', is_visitor=True)
+        cls.other_user = User.objects.create(username='other', email='other@example.com', is_visitor=True)
+
+    def setUp(self):
+        cache.clear()
+        self.restaurant = create_restaurant('Restaurant')
+        Favorite.objects.create(user=self.user, restaurant=self.restaurant)
+
+    def get(self, user=None, **params):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(user)
+        response = client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row for row in response.data['results']}
+
+    def test_is_favorite_is_personalized(self):
+        # The first request fills the shared entry, the others are served from it
+        self.assertFalse(self.get()[self.restaurant.id]['is_favorite'])
+        self.assertTrue(self.get(self.user)[self.restaurant.id]['is_favorite'])
+        self.assertFalse(self.get(self.other_user)[self.restaurant.id]['is_favorite'])
+        self.assertFalse(self.get()[self.restaurant.id]['is_favorite'])
+
+    def test_is_favorite_with_sparse_fields(self):
+        self.assertEqual(self.get(self.user, fields='id,is_favorite')[self.restaurant.id], {'id': self.restaurant.id, 'is_favorite': True})
+
+    def test_restaurant_change_invalidates(self):
+        self.get()
+        self.restaurant.name = 'Renamed'
+        self.restaurant.save()
+        self.assertEqual(self.get()[self.restaurant.id]['name'], 'Renamed')
+
+        other_restaurant = create_restaurant('Other restaurant')
+        self.assertIn(other_restaurant.id, self.get())
+
+    def test_coordinates_are_not_snapped(self):
+        # From 43.2392: Near is 22 m away, Restaurant 133 m and Far 200 m, all in the same 500 m square
+        near = create_restaurant('Near', latitude=43.239)
+        far = create_restaurant('Far', latitude=43.241)
+        self.get(lat='43.238', long='76.889')
+        rows = self.get(lat='43.2392', long='76.889')
+        self.assertEqual(list(rows), [near.id, self.restaurant.id, far.id])
+        self.assertAlmostEqual(rows[near.id]['distance_m'], 22, delta=2)
+
+    def test_review_invalidates(self):
+        self.assertEqual(self.get()[self.restaurant.id]['rating_count'], 0)
+        review = Review.objects.create(restaurant=self.restaurant, user=self.other_user, rating=4)
+        row = self.get(self.user)[self.restaurant.id]
+        self.assertEqual((row['rating_count'], row['average_rating'], row['is_favorite']), (1, 4.0, True))
+
+        review.delete()
+        self.assertEqual(self.get()[self.restaurant.id]['rating_count'], 0)
+
+
+class SectionsApi(HomeApi):
+    sections = {
+        'echo': ('get_echo', ['city'], None, None),
+        'cached': ('get_echo', [], [City], 60),
+        'broken': ('get_broken', [], None, None),
+    }
+
+    def get_echo(self, query_params):
+        return query_params.dict()
+
+    def get_broken(self, query_params):
+        raise ValueError('broken')
+
+
+class HomeSectionsTest(SimpleTestCase):
+    def get(self, view_class, path='/home/'):
+        return view_class.as_view()(APIRequestFactory().get(path))
+
+    def test_sections_get_their_own_params(self):
+        with self.assertLogs('core.views', 'ERROR'):
+            response = self.get(SectionsApi, '/home/?city=1&lat=2')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['echo'], {'city': '1'})
+        self.assertEqual(response.data['cached'], {})
+
+    def test_failed_section_is_reported(self):
+        with self.assertLogs('core.views', 'ERROR') as logs:
+            response = self.get(SectionsApi)
+        self.assertIsNone(response.data['broken'])
+        self.assertEqual(response.data['errors'], {'broken': 'Could not be loaded'})
+        self.assertIn('broken', logs.output[0])
+
+    def test_api_errors_propagate(self):
+        class DeniedApi(HomeApi):
+            sections = {'denied': ('get_denied', [], None, None)}
+
+            def get_denied(self, query_params):
+                raise PermissionDenied()
+
+        self.assertEqual(self.get(DeniedApi).status_code, 403)
+
+
+class PrefixIndexTest(SimpleTestCase):
+    entries = [
+        restaurant_entry(Restaurant(id=1, name='Coffee House')),
+        restaurant_entry(Restaurant(id=2, name='House of Tea')),
+        cuisine_entry(Cuisines(id=1, cuisines='Coffee', cuisines_ru='Кофе')),
+    ]
+
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch('core.autocomplete.load_entries', side_effect=lambda: list(self.entries))
+        self.load_entries = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lookup(self, index, query):
+        return [(entry['type'], entry['id']) for entry in index.lookup(query)]
+
+    def test_prefix_of_any_word(self):
+        index = PrefixIndex()
+        # Names starting with the query first, then restaurants before cuisines
+        self.assertEqual(self.lookup(index, 'cof'), [('restaurant', 1), ('cuisine', 1)])
+        self.assertEqual(self.lookup(index, 'hou'), [('restaurant', 2), ('restaurant', 1)])
+        self.assertEqual(self.lookup(index, 'house of'), [('restaurant', 2)])
+        self.assertEqual(self.lookup(index, 'КОФ'), [('cuisine', 1)])
+        self.assertEqual(self.lookup(index, 'tea house'), [])
+        self.assertEqual(self.lookup(index, '  '), [])
+
+    def test_update_and_remove(self):
+        index = PrefixIndex()
+        index.build()
+        index.update('restaurant', 1, restaurant_entry(Restaurant(id=1, name='Tea Room')))
+        self.assertEqual(self.lookup(index, 'cof'), [('cuisine', 1)])
+        self.assertEqual(self.lookup(index, 'tea'), [('restaurant', 1), ('restaurant', 2)])
+
+        index.update('restaurant', 2)
+        self.assertEqual(self.lookup(index, 'tea'), [('restaurant', 1)])
+        self.assertEqual(index.version, 2)
+
+    def test_other_worker_replays_the_changes(self):
+        index, other_index = PrefixIndex(), PrefixIndex()
+        index.build()
+        other_index.build()
+        index.update('restaurant', 3, restaurant_entry(Restaurant(id=3, name='Coffee Point')))
+        index.update('restaurant', 1)
+
+        other_index.catch_up()
+        self.assertEqual(self.lookup(other_index, 'coffee'), [('restaurant', 3), ('cuisine', 1)])
+        self.assertEqual(other_index.version, 2)
+        self.assertEqual(self.load_entries.call_count, 2)
+
+    def test_rebuild_when_the_change_log_is_gone(self):
+        index, other_index = PrefixIndex(), PrefixIndex()
+        index.build()
+        other_index.build()
+        index.update('restaurant', 1)
+        cache.delete(f'{CHANGE_CACHE_PREFIX}1')
+
+        other_index.catch_up()
+        self.assertEqual(self.load_entries.call_count, 3)
+        self.assertEqual(other_index.version, 1)
+
+
+class GridCellTest(SimpleTestCase):
+    def test_sql(self):
+        cell_x, cell_y = grid_cell('location_point', 0.5)
+        sql = str(Restaurant.objects.annotate(cell_x=cell_x, cell_y=cell_y).values('cell_x', 'cell_y').query)
+        self.assertIn('ST_X(ST_SnapToGrid("core_restaurant"."location_point", 0.5)) AS "cell_x"', sql)
+        self.assertIn('ST_Y(ST_SnapToGrid("core_restaurant"."location_point", 0.5)) AS "cell_y"', sql)
+
+    def test_size_is_a_float(self):
+        cell_x, cell_y = grid_cell('location_point', 1)
+        self.assertIn('ST_SnapToGrid("core_restaurant"."location_point", 1.0)', str(Restaurant.objects.annotate(cell_x=cell_x).values('cell_x').query))
+
+    def test_map_requires_a_bbox(self):
+        url = reverse('v1:Core V1:Restaurants map clusters')
+        for params in ({}, {'bbox': '76.8,43.2,76.9'}, {'bbox': '76.9,43.2,76.8,43.3'}, {'bbox': '76.8,43.2,76.9,43.3', 'zoom': 'far'}):
+            with self.subTest(params):
+                self.assertEqual(APIClient().get(url, params).status_code, 400)
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def assertSameAsJSONRenderer(self, data):
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_same_bytes_as_json_renderer(self):
+        self.assertSameAsJSONRenderer({
+            'id': 1, 'name': 'Кофейня "Центр"', 'rating': 4.5, 'is_favorite': False, 'owner': None,
+            'price': Decimal('12.50'), 'created_at': datetime(2024, 1, 1, 10, 0, 0, 123456, tzinfo=timezone.utc), 'tags': ['a', 'b'],
+        })
+
+    def test_line_separators_are_escaped(self):
+        self.assertSameAsJSONRenderer({'comment': 'one\u2028two\u2029three'})
+        self.assertNotIn('\u2028'.encode(), ORJSONRenderer().render({'comment': 'one\u2028two'}))
+
+    def test_integers_beyond_64_bits_fall_back(self):
+        self.assertSameAsJSONRenderer({'count': 2 ** 70})
+
+    def test_non_string_keys(self):
+        self.assertEqual(json.loads(ORJSONRenderer().render({1: 'one'})), {'1': 'one'})
+
+    def test_geometry(self):
+        self.assertEqual(json.loads(ORJSONRenderer().render({'point': Point(76.889, 43.238, srid=4326)})), {'point': {'type': 'Point', 'coordinates': [76.889, 43.238]}})
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
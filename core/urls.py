@@ -2,19 +2,24 @@ from django.urls import path
 
 from core.views import HomeCategoryList, HomeRecentReviewApi, \
     RestaurantSearchApi, AdsBannerApi, NearByRestaurantApi, RestaurantListAPI, AddToFavorite, RemoveFavorite, RestaurantDetail, RestaurantMenu, ItemDetail, RestaurantReview, AddRestaurantReview, \
-    UpdateReview, FavoriteRestaurant, RestaurantQAList, AskPublicQuery, MenuTypeList, AddUserDispute, CityList, AllServices, AllCuisinesList
+    UpdateReview, FavoriteRestaurant, RestaurantQAList, AskPublicQuery, MenuTypeList, AddUserDispute, CityList, AllServices, AllCuisinesList, \
+    AutocompleteApi, RestaurantMapApi, RestaurantFacetsApi, DishSearchApi, RestaurantFullMenu, HomeApi
 
 app_name = 'core'
 core_api_v1_urlpatterns = [
+    path('home/', HomeApi.as_view(), name='Home screen sections'),
     path('all-city/', CityList.as_view(), name='city list'),
     path('all-category-list/', HomeCategoryList.as_view(), name='restaurant all category list'),
     path('all-service-list/', AllServices.as_view(), name='all service list'),
     path('all-cuisine-list/', AllCuisinesList.as_view(), name='all cuisine list'),
     path('home-review-list/', HomeRecentReviewApi.as_view(), name='home review listing'),
     path('home-restaurant-search/', RestaurantSearchApi.as_view(), name='Home Restaurant search'),
+    path('home-autocomplete/', AutocompleteApi.as_view(), name='Home search autocomplete'),
     path('home-ads-banners/', AdsBannerApi.as_view(), name='Home Ads banner list'),
     path('home-nearby_restaurant/', NearByRestaurantApi.as_view(), name='Home nearby restaurant list'),
     path('restaurants/', RestaurantListAPI.as_view(), name='Restaurants list and filters'),
+    path('restaurants-map/', RestaurantMapApi.as_view(), name='Restaurants map clusters'),
+    path('restaurants-facets/', RestaurantFacetsApi.as_view(), name='Restaurants filter counts'),
 
     path('add-to-favorite/<int:restaurant_id>/', AddToFavorite.as_view(), name='Add Restaurant to Favorite'),
     path('remove-favorite/<int:restaurant_id>/', RemoveFavorite.as_view(), name='Remove Restaurant from Favorite'),
@@ -22,6 +27,8 @@ core_api_v1_urlpatterns = [
     path('restaurant/<int:id>/', RestaurantDetail.as_view(), name='Restaurant Detail'),
     path('menu-types/', MenuTypeList.as_view(), name='Menu Type List'),
     path('menu/<int:restaurant_id>/', RestaurantMenu.as_view(), name='Restaurant Menu'),
+    path('menu/<int:restaurant_id>/full/', RestaurantFullMenu.as_view(), name='Restaurant full menu'),
+    path('dish-search/', DishSearchApi.as_view(), name='Dish search across restaurants'),
     path('menu-item/<int:id>/', ItemDetail.as_view(), name='Menu Item details'),
     path('reviews/<int:restaurant_id>/', RestaurantReview.as_view(), name='Restaurant reviews'),
     path('add-review/<int:restaurant_id>/', AddRestaurantReview.as_view(), name='Add Restaurant reviews'),
@@ -1,49 +1,136 @@
+import hashlib
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+
 import django_filters
-from django.contrib.gis.geos import Point
-from django.contrib.gis.measure import D
-from django.db.models import Q
+from django.conf import settings
+from django.contrib.gis.geos import Polygon
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import close_old_connections
+from django.db.models import Avg, Count, Exists, F, Max, Min, OuterRef, Prefetch, Q
+from django.http import QueryDict
+from django.urls import reverse
 from rest_framework.filters import OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
 from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, DestroyAPIView, RetrieveAPIView, UpdateAPIView
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from admin_dashboard.models import UserDisputeResolution
-from core.models import Restaurant, Category, Review, AdsBanner, RestaurantTimings, Favorite, MenuItem, QA, MenuType, City, Cuisines, Service
+from core.models import Restaurant, Category, Review, AdsBanner, RestaurantTimings, Favorite, MenuItem, QA, MenuType, City, Cuisines, Service, RestaurantCategory, SubCategory, \
+    RestaurantCuisines, RestaurantService, RestaurantAcceptedPayment, ModeOfPayment, State, BusinessType, RestaurantImages, ItemIngredient, ReviewReply
+from core.autocomplete import autocomplete_index
+from core.cache import CachedResponseMixin, ConditionalGetMixin, PublicResponseCacheMixin, child_validators, get_cache_version, get_object_cache_version, \
+    normalize_query_params
+from core.geo import KNNDistance, filter_within_radius, get_point, grid_cell, order_by_distance
+from core.opening_hours import filter_open, week_slot
+from core.search import search_menu_items, search_restaurants
+from core.sparse_fields import SparseFieldsQuerysetMixin, get_sparse_cache_suffix, get_sparse_params
 from core.serializers import HomeCategoriesSerializer, HomeRecentReviewSerializer, \
     RestaurantSearchSerializer, AdsBannerSerializer, NearByRestaurantSerializer, RestaurantListSerializer, FavoriteSerializer, RestaurantDetailSerializer, RestaurantMenuSerializer, \
     MenuItemDetailsSerializer, RestaurantReviewSerializer, FavoriteListSerializer, RestaurantQASerializer, PublicQuerySerializer, MenuTypeSerializer, UserDisputeResolutionSerializer, CitySerializer, \
-    AllServiceSerializer, AllCuisinesListSerializer
+    AllServiceSerializer, AllCuisinesListSerializer, ReviewPartialSerializer, DishSearchItemSerializer, FullMenuItemSerializer, SubCategorySerializer
 from owner_dashboard.models import PublicQuery
 from owner_dashboard.views import CustomPagination
 from users.permissions import IsVisitor
 
+logger = logging.getLogger(__name__)
+
 
 # Create your views here.
 
+# Models behind the public restaurant lists, see PublicResponseCacheMixin
+RESTAURANT_LIST_CACHE_MODELS = [Restaurant, Review, RestaurantCategory, RestaurantCuisines, RestaurantService, RestaurantTimings, City, State]
+
+
+def open_now_cache_parts(query_params):
+    # ?open_now= answers change with every opening hours slot.
+    if query_params.get('open_now') in ['true', 'True']:
+        return [week_slot()]
+    return []
+
+
+# Querysets of the home screen sections, shared by their endpoints and HomeApi
+
+def home_categories():
+    return Category.objects.prefetch_related('sub_categories').order_by('name')
+
+
+def recent_reviews(queryset=None):
+    return (Review.objects.all() if queryset is None else queryset).order_by('-id')[:9]
+
+
+def active_ads_banners():
+    return AdsBanner.objects.filter(is_active=True).order_by('priority')
+
+
+NEARBY_DEFAULT_LIMIT = 10
+NEARBY_MAX_LIMIT = 50
+
+
+def nearby_restaurants(query_params):
+    """
+    Restaurants around ?lat=&long= within ?radius=, nearest first, ?limit= of them. Pass distance_m and id
+    of the last result as ?after_distance=&after_id= to load more. Nothing without coordinates.
+    """
+    lat = query_params.get('lat', None)
+    long = query_params.get('long', None)
+    user_location = get_point(lat, long) if lat and long else None
+    if user_location is None:
+        return Restaurant.objects.none()
+    try:
+        limit = min(max(int(query_params.get('limit', NEARBY_DEFAULT_LIMIT)), 1), NEARBY_MAX_LIMIT)
+    except Exception as e:
+        print(e)
+        limit = NEARBY_DEFAULT_LIMIT
+    queryset = filter_within_radius(Restaurant.objects.filter(is_approved=True, is_disabled=False), user_location, query_params.get('radius'))
+    queryset = filter_open(queryset, query_params)
+    return order_by_distance(queryset, user_location, query_params.get('after_distance'), query_params.get('after_id'))[:limit]
 
-class HomeCategoryList(ListAPIView):
+
+def filter_cities(query_params):
+    queryset = City.objects.all().order_by('city')
+    city = query_params.get('city')
+    if city is not None:
+        queryset = queryset.filter(Q(city__icontains=city) | Q(city_ru__icontains=city))
+    return queryset
+
+
+class HomeCategoryList(CachedResponseMixin, ListAPIView):
     serializer_class = HomeCategoriesSerializer
     permission_classes = [AllowAny, ]
+    cache_models = [Category, SubCategory]
 
     def get_queryset(self):
-        return Category.objects.all().order_by('name')
+        return home_categories()
 
 
-class HomeRecentReviewApi(ListAPIView):
+class HomeRecentReviewApi(PublicResponseCacheMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = HomeRecentReviewSerializer
     permission_classes = [AllowAny, ]
+    cache_models = [Review, Restaurant]
+    select_related_fields = {'restaurant': ['restaurant'], 'user': ['user']}
 
     def get_queryset(self):
-        return Review.objects.all().order_by('-id')[:9]
+        return recent_reviews(self.apply_sparse_fields(Review.objects.all()))
 
 
-class RestaurantSearchApi(ListAPIView):
+class RestaurantSearchApi(PublicResponseCacheMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = RestaurantSearchSerializer
     permission_classes = [AllowAny, ]
+    select_related_fields = {'owner': ['owner'], 'manager': ['manager']}
+    # Renamed categories and cuisines reach the search documents through a background task, cache_timeout bounds the delay.
+    cache_models = RESTAURANT_LIST_CACHE_MODELS + [Category, Cuisines, BusinessType]
+
+    def get_cache_key_parts(self):
+        return open_now_cache_parts(self.request.query_params)
 
     def get_queryset(self):
-        queryset = Restaurant.objects.filter(is_approved=True, is_disabled=False)
+        queryset = self.apply_sparse_fields(Restaurant.objects.filter(is_approved=True, is_disabled=False))
 
         search = self.request.query_params.get('search')
         lat = self.request.query_params.get('lat', None)
@@ -58,43 +145,61 @@ class RestaurantSearchApi(ListAPIView):
                 print(e)
                 pass
 
-        if search is not None:
-            queryset = queryset.filter(Q(name__icontains=search) | Q(restaurant_categories__category__name__icontains=search) | Q(cuisines__cuisine__cuisines__icontains=search))
+        queryset = filter_open(queryset, self.request.query_params)
+
+        if search:
+            queryset = search_restaurants(queryset, search)
 
         if lat and long:
-            try:
-                user_location = Point(float(long), float(lat))
-                queryset = queryset.filter(location_point__distance_lte=(user_location, D(km=10)))
-            except Exception as e:
-                print(e)
+            user_location = get_point(lat, long)
+            if user_location is not None:
+                queryset = filter_within_radius(queryset, user_location, self.request.query_params.get('radius'))
+                if not search:
+                    return order_by_distance(queryset, user_location)[:10]
+                queryset = queryset.annotate(distance_m=KNNDistance('location_point', user_location))
+
+        if search:
+            return queryset.order_by('-rank', 'id')[:10]
+        return queryset[:10]
+
+
+class AutocompleteApi(GenericAPIView):
+    """
+    Typeahead over restaurant, category, sub category and cuisine names, served from an in-memory index.
+    Restaurant ids open RestaurantDetail, the others are the category/cuisine filters of RestaurantListAPI
+    (a sub category carries its category_id).
+    """
+    permission_classes = [AllowAny, ]
+    max_limit = 20
 
-        return queryset.distinct()[:10]
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), self.max_limit)
+        except Exception as e:
+            print(e)
+            limit = 10
+        return Response(autocomplete_index.lookup(request.query_params.get('q', ''), limit), status=status.HTTP_200_OK)
 
 
-class AdsBannerApi(ListAPIView):
+class AdsBannerApi(PublicResponseCacheMixin, ListAPIView):
     serializer_class = AdsBannerSerializer
     permission_classes = [AllowAny, ]
+    cache_models = [AdsBanner]
 
     def get_queryset(self):
-        return AdsBanner.objects.filter(is_active=True).order_by('priority')
+        return active_ads_banners()
 
 
-class NearByRestaurantApi(ListAPIView):
+class NearByRestaurantApi(PublicResponseCacheMixin, ListAPIView):
     serializer_class = NearByRestaurantSerializer
     permission_classes = [AllowAny, ]
+    cache_models = RESTAURANT_LIST_CACHE_MODELS
+
+    def get_cache_key_parts(self):
+        return open_now_cache_parts(self.request.query_params)
 
     def get_queryset(self):
-        lat = self.request.query_params.get('lat', None)
-        long = self.request.query_params.get('long', None)
-        if lat and long:
-            try:
-                user_location = Point(float(long), float(lat))
-            except Exception as e:
-                print(e)
-                return Restaurant.objects.none()
-            return Restaurant.objects.filter(is_approved=True, is_disabled=False, location_point__distance_lte=(user_location, D(km=10)))[:10]
-        else:
-            return Restaurant.objects.none()
+        return nearby_restaurants(self.request.query_params)
 
 
 class CafeFilterSet(django_filters.FilterSet):
@@ -112,68 +217,188 @@ class CafeFilterSet(django_filters.FilterSet):
         fields = ['average_bill_lt', 'average_bill_gt', ]
 
 
-class RestaurantListAPI(ListAPIView):
+def apply_restaurant_filters(queryset, query_params):
+    """
+    city, is_disabled, rating, type, category, cuisine, amenity and opening hour filters of the restaurant list,
+    shared with the map and facet endpoints.
+    """
+    category = query_params.get('category')
+    type = query_params.get('type')
+    cuisine = query_params.get('cuisine')
+    amenity = query_params.get('amenity')
+    rating = query_params.get('rating')
+    city = query_params.get('city', None)
+    is_disabled = query_params.get('is_disabled', None)
+
+    filter_conditions = Q()
+
+    if city is not None:
+        try:
+            city_id = int(city)
+            filter_conditions &= Q(city__id=city_id)
+        except Exception as e:
+            print(e)
+            pass
+
+    if is_disabled is not None and is_disabled in ['True', 'False']:
+        filter_conditions &= Q(is_disabled=is_disabled)
+
+    if rating:
+        try:
+            filter_conditions &= Q(average_rating__gte=float(rating))
+        except Exception as e:
+            print(e)
+
+    # Related filters use EXISTS instead of joins so rows are not duplicated and no DISTINCT is needed.
+    if type:
+        filter_conditions &= Q(type__id=type)
+    if category:
+        filter_conditions &= Q(Exists(RestaurantCategory.objects.filter(restaurant=OuterRef('pk'), category__id=category)))
+    # if sub_category:
+    #     filter_conditions &= Q(restaurant_categories__category__sub_categories__id=sub_category)
+    if cuisine:
+        filter_conditions &= Q(Exists(RestaurantCuisines.objects.filter(restaurant=OuterRef('pk'), cuisine__id=cuisine)))
+    if amenity:
+        filter_conditions &= Q(Exists(RestaurantService.objects.filter(restaurant=OuterRef('pk'), service__id=amenity)))
+
+    return filter_open(queryset.filter(filter_conditions), query_params)
+
+
+class RestaurantListAPI(PublicResponseCacheMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = RestaurantListSerializer
     permission_classes = [AllowAny, ]
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = CafeFilterSet
-    ordering_fields = ['name', ]
+    ordering_fields = ['name', 'rating', 'rating_count', ]
+    cursor_ordering = ('-id',)
+    select_related_fields = {'city': ['city'], 'state': ['state']}
+    cache_models = RESTAURANT_LIST_CACHE_MODELS
+
+    def get_cache_key_parts(self):
+        return open_now_cache_parts(self.request.query_params)
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        user = self.request.user if self.request.user.is_authenticated else None
-        context.update({"user": user, })
+        # The cached page is shared by all users, is_favorite is filled in by personalize_data().
+        context.update({"user": None, })
         return context
 
+    def personalize_data(self, data):
+        user = self.request.user
+        if not user.is_authenticated:
+            return data
+        # ?fields= may leave out is_favorite, it needs the id as well.
+        rows = [row for row in data['results'] if 'is_favorite' in row and 'id' in row]
+        if rows:
+            favorite_ids = set(Favorite.objects.filter(user=user, restaurant_id__in=[row['id'] for row in rows]).values_list('restaurant_id', flat=True))
+            for row in rows:
+                row['is_favorite'] = row['id'] in favorite_ids
+        return data
+
     def get_queryset(self):
-        queryset = Restaurant.objects.filter(is_approved=True).order_by('name')
-        category = self.request.query_params.get('category')
-        type = self.request.query_params.get('type')
-        cuisine = self.request.query_params.get('cuisine')
-        amenity = self.request.query_params.get('amenity')
-        rating = self.request.query_params.get('rating')
+        queryset = self.apply_sparse_fields(Restaurant.objects.filter(is_approved=True)).annotate(rating=F('average_rating')).order_by('name')
         lat = self.request.query_params.get('lat', None)
         long = self.request.query_params.get('long', None)
-        city = self.request.query_params.get('city', None)
-        is_disabled = self.request.query_params.get('is_disabled', None)
-
-        filter_conditions = Q()
-
-        if city is not None:
-            try:
-                city_id = int(city)
-                filter_conditions &= Q(city__id=city_id)
-            except Exception as e:
-                print(e)
-                pass
 
+        user_location = None
         if lat and long:
-            try:
-                user_location = Point(float(long), float(lat))
-                filter_conditions &= Q(location_point__distance_lte=(user_location, D(km=10)))
-            except Exception as e:
-                print(e)
+            user_location = get_point(lat, long)
+            if user_location is not None:
+                queryset = filter_within_radius(queryset, user_location, self.request.query_params.get('radius'))
+
+        queryset = apply_restaurant_filters(queryset, self.request.query_params)
+        if user_location is not None:
+            # Nearest first unless ?ordering= is given.
+            queryset = order_by_distance(queryset, user_location)
+        return queryset
 
-        if is_disabled is not None and is_disabled in ['True', 'False']:
-            filter_conditions &= Q(is_disabled=is_disabled)
 
-        if type:
-            filter_conditions &= Q(type__id=type)
-        if category:
-            filter_conditions &= Q(restaurant_categories__category__id=category)
-        # if sub_category:
-        #     filter_conditions &= Q(restaurant_categories__category__sub_categories__id=sub_category)
-        if cuisine:
-            filter_conditions &= Q(cuisines__cuisine__id=cuisine)
-        if amenity:
-            filter_conditions &= Q(restaurant_services__service__id=amenity)
+class RestaurantMapApi(GenericAPIView):
+    """
+    Map viewport: ?bbox=min_long,min_lat,max_long,max_lat&zoom=<0-22> plus the filters of RestaurantListAPI.
+    Restaurants are grouped into grid cells sized for the zoom level, a cell holding a single restaurant is returned as a pin.
+    """
+    permission_classes = [AllowAny, ]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CafeFilterSet
+    cells_per_tile = 4
+    max_cells = 400
 
-        queryset = queryset.filter(filter_conditions)
-        if rating:
-            return [q for q in queryset if q.average_rating >= float(rating)]
+    def get_queryset(self):
+        return apply_restaurant_filters(Restaurant.objects.filter(is_approved=True), self.request.query_params)
 
-        return queryset.distinct()
+    def get(self, request, *args, **kwargs):
+        try:
+            min_long, min_lat, max_long, max_lat = [float(value) for value in request.query_params.get('bbox', '').split(',')]
+            zoom = min(max(int(request.query_params.get('zoom', 12)), 0), 22)
+        except Exception as e:
+            print(e)
+            return Response({'details': 'bbox (min_long,min_lat,max_long,max_lat) and zoom are required'}, status=status.HTTP_400_BAD_REQUEST)
+        if min_long >= max_long or min_lat >= max_lat:
+            return Response({'details': 'bbox (min_long,min_lat,max_long,max_lat) and zoom are required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        bbox = Polygon.from_bbox((min_long, min_lat, max_long, max_lat))
+        bbox.srid = 4326
+        queryset = self.filter_queryset(self.get_queryset()).filter(location_point__contained=bbox)
+        # Grow the cells for a large viewport so the response never has more than max_cells entries. Each axis is bounded on its
+        # own: a side spanning n cell widths touches at most n + 1 grid columns, so at most isqrt(max_cells) per axis.
+        cells_per_axis = math.isqrt(self.max_cells) - 1
+        cell_size = max(360 / 2 ** zoom / self.cells_per_tile, max(max_long - min_long, max_lat - min_lat) / cells_per_axis)
+        cell_x, cell_y = grid_cell('location_point', cell_size)
+        cells = queryset.annotate(cell_x=cell_x, cell_y=cell_y).values('cell_x', 'cell_y').annotate(
+            count=Count('id'), latitude=Avg('latitude'), longitude=Avg('longitude'), restaurant_id=Min('id'), rating=Max('average_rating'),
+        ).order_by()
+
+        clusters = []
+        pins = []
+        for cell in cells:
+            if cell['count'] == 1:
+                pins.append({'id': cell['restaurant_id'], 'latitude': cell['latitude'], 'longitude': cell['longitude'], 'rating': cell['rating']})
+            else:
+                clusters.append({'latitude': cell['latitude'], 'longitude': cell['longitude'], 'count': cell['count']})
+        return Response({'cell_size': cell_size, 'clusters': clusters, 'pins': pins}, status=status.HTTP_200_OK)
+
+
+class RestaurantFacetsApi(GenericAPIView):
+    """
+    Number of restaurants per category, cuisine, amenity and type for the current RestaurantListAPI filters.
+    Each facet ignores its own filter, so the counts show what choosing another option would return.
+    One grouped query per facet.
+    """
+    permission_classes = [AllowAny, ]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CafeFilterSet
+    facets = {
+        'category': (RestaurantCategory, 'category_id'),
+        'cuisine': (RestaurantCuisines, 'cuisine_id'),
+        'amenity': (RestaurantService, 'service_id'),
+        'type': (None, 'type_id'),
+    }
+
+    def get_restaurants(self, exclude_param):
+        query_params = self.request.query_params.copy()
+        query_params.pop(exclude_param, None)
+        queryset = Restaurant.objects.filter(is_approved=True)
+        lat = query_params.get('lat', None)
+        long = query_params.get('long', None)
+        if lat and long:
+            user_location = get_point(lat, long)
+            if user_location is not None:
+                queryset = filter_within_radius(queryset, user_location, query_params.get('radius'))
+        return self.filter_queryset(apply_restaurant_filters(queryset, query_params))
+
+    def get(self, request, *args, **kwargs):
+        data = {}
+        for param, (model, field) in self.facets.items():
+            restaurants = self.get_restaurants(param)
+            if model is None:
+                rows = restaurants.exclude(**{f'{field}__isnull': True})
+            else:
+                rows = model.objects.filter(restaurant__in=restaurants.values('id'))
+            counts = rows.values(field).annotate(count=Count('id')).order_by('-count', field)
+            data[param] = [{'id': row[field], 'count': row['count']} for row in counts]
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class AddToFavorite(CreateAPIView):
@@ -213,24 +438,76 @@ class RemoveFavorite(GenericAPIView):
             return Response({'details': 'Favourite not fount'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RestaurantDetail(RetrieveAPIView):
+class RestaurantDetail(ConditionalGetMixin, SparseFieldsQuerysetMixin, RetrieveAPIView):
     serializer_class = RestaurantDetailSerializer
     lookup_field = 'id'
     queryset = Restaurant.objects.all()
+    select_related_fields = {name: [name] for name in ('owner', 'manager', 'city', 'state', 'type')}
+    prefetch_related_fields = {
+        'restaurant_images': ['restaurant_images'],
+        'restaurants_timings': ['restaurants_timings'],
+        'restaurant_services': [Prefetch('restaurant_services', queryset=RestaurantService.objects.select_related('service'))],
+        'cuisines': [Prefetch('cuisines', queryset=RestaurantCuisines.objects.select_related('cuisine'))],
+        'restaurant_payment_modes': [Prefetch('restaurant_payment_modes', queryset=RestaurantAcceptedPayment.objects.select_related('payment'))],
+    }
+    cache_timeout = 60 * 60 * 24
+    # Catalog rows shown on the page, a change to any of them invalidates every restaurant
+    cache_models = [Service, Cuisines, ModeOfPayment, City, State, BusinessType]
+    validator_models = cache_models
+
+    def get_validator_queryset(self):
+        restaurant = OuterRef('pk')
+        validators = {
+            'owner_modified': F('owner__modified_at'),
+            'manager_modified': F('manager__modified_at'),
+            **child_validators('images', RestaurantImages.objects.filter(restaurant=restaurant)),
+            **child_validators('timings', RestaurantTimings.objects.filter(restaurant=restaurant)),
+            **child_validators('services', RestaurantService.objects.filter(restaurant=restaurant)),
+            **child_validators('cuisines', RestaurantCuisines.objects.filter(restaurant=restaurant)),
+            **child_validators('payment_modes', RestaurantAcceptedPayment.objects.filter(restaurant=restaurant)),
+            # Rating histogram and your_review
+            **child_validators('reviews', Review.objects.filter(restaurant=restaurant)),
+        }
+        if self.request.user.is_authenticated:
+            validators['is_favorite'] = Exists(Favorite.objects.filter(user=self.request.user, restaurant=restaurant))
+        return Restaurant.objects.filter(id=self.kwargs.get('id')).annotate(**validators)
+
+    def get_cache_key(self):
+        restaurant_id = self.kwargs.get('id')
+        # One entry per field selection
+        return (
+            f'restaurant_detail:{restaurant_id}:{get_object_cache_version(Restaurant, restaurant_id)}:{get_cache_version(*self.cache_models)}'
+            f'{get_sparse_cache_suffix(*self.get_sparse_params())}'
+        )
 
-    def get_serializer_context(self):
-        context = super().get_serializer_context()
-        user = self.request.user if self.request.user.is_authenticated else None
-        try:
-            restaurant = Restaurant.objects.get(id=self.kwargs.get('id'))
-        except Exception as e:
-            restaurant = None
-        context.update({"user": user, 'restaurant': restaurant})
-        return context
-
+    def get_queryset(self):
+        return self.apply_sparse_fields(super().get_queryset())
 
-class MenuTypeList(ListAPIView):
+    def get_user_fields(self, restaurant_id):
+        user = self.request.user if self.request.user.is_authenticated else None
+        data = {}
+        if self.is_field_rendered('is_favorite'):
+            data['is_favorite'] = user is not None and Favorite.objects.filter(user=user, restaurant_id=restaurant_id).exists()
+        if self.is_field_rendered('your_review'):
+            review = Review.objects.filter(user=user, restaurant_id=restaurant_id).first() if user is not None else None
+            data['your_review'] = ReviewPartialSerializer(instance=review).data if review else None
+        return data
+
+    def retrieve(self, request, *args, **kwargs):
+        key = self.get_cache_key()
+        data = cache.get(key)
+        if data is None:
+            instance = self.get_object()
+            data = self.get_serializer(instance).data
+            cache.set(key, data, self.cache_timeout)
+        data = dict(data)
+        data.update(self.get_user_fields(self.kwargs.get('id')))
+        return Response(data)
+
+
+class MenuTypeList(CachedResponseMixin, ListAPIView):
     serializer_class = MenuTypeSerializer
+    cache_models = [MenuType]
     queryset = MenuType.objects.all().order_by('id')
 
 
@@ -254,12 +531,87 @@ class MenuFilterSet(django_filters.FilterSet):
         fields = ['search', 'price_lt', 'price_gt', 'menu_type']
 
 
-class RestaurantMenu(ListAPIView):
+class DishSearchFilterSet(django_filters.FilterSet):
+    price_lt = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+    price_gt = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    menu_type = django_filters.NumberFilter(field_name='menu_type')
+
+    class Meta:
+        model = MenuItem
+        fields = ['price_lt', 'price_gt', 'menu_type']
+
+
+class DishSearchApi(GenericAPIView):
+    """
+    Dishes across all restaurants: ?search= plus optional lat/long/radius, city, price_lt/price_gt and menu_type.
+    Matches are grouped by restaurant, the restaurant with the best match first.
+    """
+    permission_classes = [AllowAny, ]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = DishSearchFilterSet
+    max_items = 200
+    max_restaurants = 20
+
+    def get_user_location(self):
+        lat = self.request.query_params.get('lat', None)
+        long = self.request.query_params.get('long', None)
+        return get_point(lat, long) if lat and long else None
+
+    def get_queryset(self):
+        restaurants = Restaurant.objects.filter(is_approved=True, is_disabled=False)
+        city = self.request.query_params.get('city', None)
+        if city is not None:
+            try:
+                restaurants = restaurants.filter(city__id=int(city))
+            except Exception as e:
+                print(e)
+        user_location = self.get_user_location()
+        if user_location is not None:
+            restaurants = filter_within_radius(restaurants, user_location, self.request.query_params.get('radius'))
+        return MenuItem.objects.filter(restaurant__in=restaurants.values('id')).defer('search_document')
+
+    def get(self, request, *args, **kwargs):
+        search = request.query_params.get('search')
+        if not search:
+            return Response([], status=status.HTTP_200_OK)
+        items = search_menu_items(self.filter_queryset(self.get_queryset()), search).order_by('-rank', 'id')[:self.max_items]
+        items_by_restaurant = {}
+        for item in items:
+            items_by_restaurant.setdefault(item.restaurant_id, []).append(item)
+        restaurant_ids = list(items_by_restaurant)[:self.max_restaurants]
+
+        restaurants = Restaurant.objects.filter(id__in=restaurant_ids).only('id', 'name', 'profile_image', 'business_description', 'average_rating')
+        user_location = self.get_user_location()
+        if user_location is not None:
+            restaurants = restaurants.annotate(distance_m=KNNDistance('location_point', user_location))
+        restaurants = {restaurant.id: restaurant for restaurant in restaurants}
+
+        context = self.get_serializer_context()
+        data = [
+            {
+                'restaurant': NearByRestaurantSerializer(restaurants[restaurant_id], context=context).data,
+                'items': DishSearchItemSerializer(items_by_restaurant[restaurant_id], many=True, context=context).data,
+            }
+            for restaurant_id in restaurant_ids if restaurant_id in restaurants
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class RestaurantMenu(ConditionalGetMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = RestaurantMenuSerializer
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = MenuFilterSet
     ordering_fields = ['id', 'created_at', 'updated_at', 'Item_name', 'price']
+    cursor_ordering = ('id',)
+    prefetch_related_fields = {'item_ingredients': ['item_ingredients']}
+
+    def get_validator_queryset(self):
+        restaurant = OuterRef('pk')
+        return Restaurant.objects.filter(id=self.kwargs.get('restaurant_id')).annotate(
+            **child_validators('items', MenuItem.objects.filter(restaurant=restaurant)),
+            **child_validators('ingredients', ItemIngredient.objects.filter(item__restaurant=restaurant)),
+        )
 
     def get_queryset(self):
         restaurant_id = self.kwargs.get('restaurant_id')
@@ -267,7 +619,7 @@ class RestaurantMenu(ListAPIView):
             restaurant = Restaurant.objects.get(id=restaurant_id)
         except:
             return MenuItem.objects.none()
-        queryset = MenuItem.objects.filter(restaurant=restaurant).order_by('Item_name')
+        queryset = self.apply_sparse_fields(MenuItem.objects.filter(restaurant=restaurant)).defer('search_document').order_by('Item_name')
         is_veg = self.request.query_params.get('is_veg')
 
         if is_veg is not None and is_veg in ['True', 'False']:
@@ -276,15 +628,101 @@ class RestaurantMenu(ListAPIView):
         return queryset
 
 
-class ItemDetail(RetrieveAPIView):
+class RestaurantFullMenu(GenericAPIView):
+    """
+    The whole menu of a restaurant in one response, grouped by menu type and then sub category.
+    Cached per restaurant until one of its items, ingredients or item images changes.
+    """
+    permission_classes = [AllowAny, ]
+    serializer_class = FullMenuItemSerializer
+    cache_timeout = 60 * 60 * 24
+    cache_models = [MenuType, SubCategory]
+
+    def get_cache_key(self, restaurant_id):
+        # The MenuItem object version is kept per restaurant, see core.signals. FullMenuItemSerializer
+        # follows ?fields= and ?expand=, so each field selection gets its own entry.
+        return (
+            f'restaurant_full_menu:{restaurant_id}:{get_object_cache_version(MenuItem, restaurant_id)}:{get_cache_version(*self.cache_models)}'
+            f'{get_sparse_cache_suffix(*get_sparse_params(self.request))}'
+        )
+
+    def get_queryset(self):
+        return MenuItem.objects.filter(restaurant_id=self.kwargs.get('restaurant_id')).select_related('menu_type', 'sub_category').prefetch_related(
+            'item_ingredients', 'menu_item_images'
+        ).defer('search_document').order_by('menu_type__id', 'sub_category__name', 'Item_name', 'id')
+
+    def get_menu(self):
+        menu = []
+        menu_types = {}
+        for item in self.get_queryset():
+            menu_type_key = item.menu_type_id
+            if menu_type_key not in menu_types:
+                menu_types[menu_type_key] = {
+                    'menu_type': MenuTypeSerializer(item.menu_type).data if item.menu_type else None,
+                    'sub_categories': [],
+                    'sub_category_index': {},
+                }
+                menu.append(menu_types[menu_type_key])
+            group = menu_types[menu_type_key]
+            if item.sub_category_id not in group['sub_category_index']:
+                group['sub_category_index'][item.sub_category_id] = {
+                    'sub_category': SubCategorySerializer(item.sub_category).data if item.sub_category else None,
+                    'items': [],
+                }
+                group['sub_categories'].append(group['sub_category_index'][item.sub_category_id])
+            group['sub_category_index'][item.sub_category_id]['items'].append(item)
+
+        context = self.get_serializer_context()
+        for group in menu:
+            del group['sub_category_index']
+            for sub_category in group['sub_categories']:
+                sub_category['items'] = FullMenuItemSerializer(sub_category['items'], many=True, context=context).data
+        return menu
+
+    def get(self, request, *args, **kwargs):
+        restaurant_id = self.kwargs.get('restaurant_id')
+        key = self.get_cache_key(restaurant_id)
+        menu = cache.get(key)
+        if menu is None:
+            if not Restaurant.objects.filter(id=restaurant_id).exists():
+                return Response({'details': 'restaurant does not exist'}, status=status.HTTP_404_NOT_FOUND)
+            menu = self.get_menu()
+            cache.set(key, menu, self.cache_timeout)
+        return Response(menu, status=status.HTTP_200_OK)
+
+
+class ItemDetail(ConditionalGetMixin, SparseFieldsQuerysetMixin, RetrieveAPIView):
     serializer_class = MenuItemDetailsSerializer
     queryset = MenuItem.objects.all()
     lookup_field = 'id'
+    select_related_fields = {'sub_category': ['sub_category'], 'menu_type': ['menu_type']}
+    prefetch_related_fields = {'item_ingredients': ['item_ingredients']}
 
+    def get_queryset(self):
+        return self.apply_sparse_fields(super().get_queryset())
 
-class RestaurantReview(ListAPIView):
+    # Sub category and menu type names are on the page
+    validator_models = [SubCategory, MenuType]
+
+    def get_validator_queryset(self):
+        return MenuItem.objects.filter(id=self.kwargs.get('id')).annotate(**child_validators('ingredients', ItemIngredient.objects.filter(item=OuterRef('pk'))))
+
+
+class RestaurantReview(ConditionalGetMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = RestaurantReviewSerializer
     pagination_class = CustomPagination
+    cursor_ordering = ('-id',)
+    select_related_fields = {'user': ['user']}
+    prefetch_related_fields = {'review_replays': ['review_replays']}
+
+    def get_validator_queryset(self):
+        restaurant = OuterRef('pk')
+        reviews = Review.objects.filter(restaurant=restaurant)
+        return Restaurant.objects.filter(id=self.kwargs.get('restaurant_id')).annotate(
+            **child_validators('reviews', reviews),
+            **child_validators('review_users', reviews, field='user__modified_at', count=False),
+            **child_validators('replies', ReviewReply.objects.filter(review__restaurant=restaurant)),
+        )
 
     def get_queryset(self):
         restaurant_id = self.kwargs.get('restaurant_id')
@@ -292,7 +730,7 @@ class RestaurantReview(ListAPIView):
             restaurant = Restaurant.objects.get(id=restaurant_id)
         except:
             return Review.objects.none()
-        queryset = Review.objects.filter(restaurant=restaurant).order_by('-id')
+        queryset = self.apply_sparse_fields(Review.objects.filter(restaurant=restaurant)).order_by('-id')
 
         return queryset
 
@@ -339,10 +777,11 @@ class UpdateReview(UpdateAPIView):
         return Response(serializer.data)
 
 
-class FavoriteRestaurant(ListAPIView):
+class FavoriteRestaurant(SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = FavoriteListSerializer
     permission_classes = [IsVisitor]
     pagination_class = CustomPagination
+    select_related_fields = {'restaurant': ['restaurant'], 'restaurant.city': ['restaurant__city'], 'restaurant.state': ['restaurant__state']}
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -351,13 +790,18 @@ class FavoriteRestaurant(ListAPIView):
         return context
 
     def get_queryset(self):
-        queryset = Favorite.objects.filter(user=self.request.user).order_by('-id')
+        queryset = self.apply_sparse_fields(Favorite.objects.filter(user=self.request.user)).order_by('-id')
         return queryset
 
 
-class RestaurantQAList(ListAPIView):
+class RestaurantQAList(ConditionalGetMixin, ListAPIView):
     serializer_class = RestaurantQASerializer
 
+    def get_validator_queryset(self):
+        return Restaurant.objects.filter(id=self.kwargs.get('restaurant_id')).annotate(
+            **child_validators('questions', QA.objects.filter(restaurant=OuterRef('pk'))),
+        )
+
     def get_queryset(self):
         restaurant_id = self.kwargs.get('restaurant_id')
         try:
@@ -399,27 +843,116 @@ class AddUserDispute(CreateAPIView):
         return Response({'details': 'Query added successfully'}, status=status.HTTP_201_CREATED)
 
 
-class CityList(ListAPIView):
+class CityList(CachedResponseMixin, ListAPIView):
     serializer_class = CitySerializer
     permission_classes = [AllowAny]
     pagination_class = CustomPagination
+    cache_models = [City]
 
     def get_queryset(self):
-        queryset = City.objects.all().order_by('city')
-        city = self.request.query_params.get('city')
-        if city is not None:
-            queryset = queryset.filter(Q(city__icontains=city) | Q(city_ru__icontains=city))
-
-        return queryset
+        return filter_cities(self.request.query_params)
 
 
-class AllServices(ListAPIView):
+class AllServices(CachedResponseMixin, ListAPIView):
     serializer_class = AllServiceSerializer
     permission_classes = [AllowAny]
+    cache_models = [Service]
     queryset = Service.objects.all().order_by('service_name')
 
 
-class AllCuisinesList(ListAPIView):
+class AllCuisinesList(CachedResponseMixin, ListAPIView):
     serializer_class = AllCuisinesListSerializer
     permission_classes = [AllowAny]
+    cache_models = [Cuisines]
     queryset = Cuisines.objects.all().order_by('cuisines')
+
+
+home_executor = ThreadPoolExecutor(max_workers=settings.HOME_SECTION_WORKERS, thread_name_prefix='home-section')
+
+
+class HomeApi(GenericAPIView):
+    """
+    The home screen in one request, each section holds the data of its own endpoint:
+    categories, ads_banners, nearby_restaurants (with ?lat=&long=), recent_reviews and cities.
+    The sections are read concurrently and cached like their endpoints. A section that fails is null
+    and listed in `errors`.
+    """
+    permission_classes = [AllowAny, ]
+    # name -> (method building the data, query params it takes, models its cache entry depends on, cache timeout)
+    # nearby_restaurants is not cached, like requests with coordinates to its endpoint.
+    sections = {
+        'categories': ('get_categories', [], [Category, SubCategory], CachedResponseMixin.cache_timeout),
+        'ads_banners': ('get_ads_banners', [], [AdsBanner], settings.PUBLIC_CACHE_TIMEOUT),
+        'nearby_restaurants': ('get_nearby_restaurants', ['lat', 'long', 'radius', 'limit', 'open_now', 'open_at'], None, None),
+        'recent_reviews': ('get_recent_reviews', [], [Review, Restaurant], settings.PUBLIC_CACHE_TIMEOUT),
+        'cities': ('get_cities', ['city'], [City], CachedResponseMixin.cache_timeout),
+    }
+
+    def get_categories(self, query_params):
+        return HomeCategoriesSerializer(home_categories(), many=True, context=self.get_serializer_context()).data
+
+    def get_ads_banners(self, query_params):
+        return AdsBannerSerializer(active_ads_banners(), many=True, context=self.get_serializer_context()).data
+
+    def get_nearby_restaurants(self, query_params):
+        return NearByRestaurantSerializer(nearby_restaurants(query_params), many=True, context=self.get_serializer_context()).data
+
+    def get_recent_reviews(self, query_params):
+        reviews = recent_reviews(Review.objects.select_related('restaurant', 'user'))
+        return HomeRecentReviewSerializer(reviews, many=True, context=self.get_serializer_context()).data
+
+    def get_cities(self, query_params):
+        # The first page of the city list, with the link to the next one
+        page = Paginator(filter_cities(query_params), CustomPagination.page_size).page(1)
+        next_link = None
+        if page.has_next():
+            url = self.request.build_absolute_uri(reverse('v1:Core V1:city list'))
+            next_link = replace_query_param(f'{url}?{query_params.urlencode()}' if query_params else url, CustomPagination.page_query_param, 2)
+        return {
+            'count': page.paginator.count,
+            'next': next_link,
+            'previous': None,
+            'results': CitySerializer(page.object_list, many=True, context=self.get_serializer_context()).data,
+        }
+
+    def get_section_params(self, params):
+        query_params = QueryDict(mutable=True)
+        for param in params:
+            if param in self.request.query_params:
+                query_params.setlist(param, self.request.query_params.getlist(param))
+        return query_params
+
+    def get_section(self, name):
+        method, params, cache_models, cache_timeout = self.sections[name]
+        query_params = self.get_section_params(params)
+        try:
+            if cache_models is None:
+                return getattr(self, method)(query_params)
+            # Absolute links and image urls depend on the host
+            key = 'home_section:' + hashlib.md5(':'.join([
+                name, self.request.scheme, self.request.get_host(), normalize_query_params(query_params).urlencode(), get_cache_version(*cache_models),
+            ]).encode()).hexdigest()
+            data = cache.get(key)
+            if data is None:
+                data = getattr(self, method)(query_params)
+                cache.set(key, data, cache_timeout)
+            return data
+        finally:
+            # Every worker thread keeps its own connection, drop it only when it is broken or past CONN_MAX_AGE.
+            close_old_connections()
+
+    def get(self, request, *args, **kwargs):
+        futures = {name: home_executor.submit(self.get_section, name) for name in self.sections}
+        data = {}
+        errors = {}
+        for name, future in futures.items():
+            try:
+                data[name] = future.result()
+            except APIException:
+                raise
+            except Exception:
+                logger.exception('home/ section %s failed', name)
+                data[name] = None
+                errors[name] = 'Could not be loaded'
+        data['errors'] = errors
+        return Response(data, status=status.HTTP_200_OK)
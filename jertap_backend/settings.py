@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
 
     'django.contrib.gis',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
     "rest_auth",
@@ -66,6 +67,7 @@ SITE_ID = 1
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -156,6 +158,16 @@ REST_FRAMEWORK = {
     # "DATE_INPUT_FORMATS": ["%d/%m/%Y", "%Y-%m-%d"],
     # "DATETIME_INPUT_FORMATS": ["%Y-%m-%dT%H:%M:%S.%fZ", ],
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
 
@@ -200,6 +212,36 @@ SIMPLE_JWT = {
 PASS_REST_CONFIRM_EXPIRE_MINUTE = 5
 VERIFICATION_CODE_EXPIRE_MINUTE = 5
 
+# Cache, set CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and CACHE_LOCATION=redis://... to share it between workers
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Time zone the restaurant opening hours are entered in, used by the open_now/open_at filters
+RESTAURANT_TIME_ZONE = config('RESTAURANT_TIME_ZONE', default='Asia/Almaty')
+
+# Geo search radius in km, ?radius= is capped at NEARBY_MAX_RADIUS_KM
+NEARBY_RADIUS_KM = config('NEARBY_RADIUS_KM', default=10, cast=float)
+NEARBY_MAX_RADIUS_KM = config('NEARBY_MAX_RADIUS_KM', default=50, cast=float)
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are sent with brotli or gzip
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+BROTLI_QUALITY = config('BROTLI_QUALITY', default=5, cast=int)
+
+# Public list responses (core.cache.PublicResponseCacheMixin) are cached for PUBLIC_CACHE_TIMEOUT seconds at most,
+# requests with ?lat=&long= are not cached
+PUBLIC_CACHE_TIMEOUT = config('PUBLIC_CACHE_TIMEOUT', default=300, cast=int)
+
+# Restaurant ids a dashboard user owns or manages (owner_dashboard.access) are cached for RESTAURANT_ACCESS_CACHE_TIMEOUT seconds,
+# they are cleared as well when a restaurant's owner or manager changes
+RESTAURANT_ACCESS_CACHE_TIMEOUT = config('RESTAURANT_ACCESS_CACHE_TIMEOUT', default=300, cast=int)
+
+# Threads per process reading the home/ sections, five per home/ request the process serves at once
+HOME_SECTION_WORKERS = config('HOME_SECTION_WORKERS', default=20, cast=int)
+
 GOOGLE_CLIENT_ID = config('GOOGLE_CLIENT_ID')
 SOCIAL_SECRET = config('SOCIAL_SECRET')
 
@@ -221,6 +263,18 @@ else:
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = True
 
+# celery -A jertap_backend beat -l info
+# Owner analytics (owner_dashboard.analytics) are rolled up every ANALYTICS_ROLLUP_INTERVAL seconds, rows younger than
+# ANALYTICS_ROLLUP_LAG seconds are left for the next run so transactions still in flight are not skipped
+ANALYTICS_ROLLUP_INTERVAL = config('ANALYTICS_ROLLUP_INTERVAL', default=600, cast=int)
+ANALYTICS_ROLLUP_LAG = config('ANALYTICS_ROLLUP_LAG', default=300, cast=int)
+CELERY_BEAT_SCHEDULE = {
+    'rollup-restaurant-analytics': {
+        'task': 'owner_dashboard.tasks.rollup_restaurant_analytics',
+        'schedule': ANALYTICS_ROLLUP_INTERVAL,
+    },
+}
+
 # Email configuration
 EMAIL_BACKEND = 'django_ses.SESBackend'
 AWS_SES_REGION_NAME = config('AWS_SES_REGION_NAME')
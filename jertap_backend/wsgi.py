@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jertap_backend.settings')
 
 application = get_wsgi_application()
+
+# Build the in-memory autocomplete index when the worker starts instead of on the first request.
+try:
+    from core.autocomplete import autocomplete_index
+    autocomplete_index.build()
+except Exception as e:
+    print(e)
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.generics import get_object_or_404
+
+from core.models import Restaurant
+
+RESTAURANT_ACCESS_PREFIX = 'restaurant_access:'
+
+
+def _access_key(user_id):
+    return f'{RESTAURANT_ACCESS_PREFIX}{user_id}'
+
+
+def get_accessible_restaurant_ids(user):
+    """
+    Ids of the restaurants the user owns or manages. Kept on the user for the rest of the request
+    and in the cache for RESTAURANT_ACCESS_CACHE_TIMEOUT seconds.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+    if not hasattr(user, '_accessible_restaurant_ids'):
+        key = _access_key(user.pk)
+        restaurant_ids = cache.get(key)
+        if restaurant_ids is None:
+            restaurant_ids = frozenset(Restaurant.objects.filter(Q(owner=user) | Q(manager=user)).values_list('id', flat=True))
+            cache.set(key, restaurant_ids, settings.RESTAURANT_ACCESS_CACHE_TIMEOUT)
+        user._accessible_restaurant_ids = restaurant_ids
+    return user._accessible_restaurant_ids
+
+
+def clear_accessible_restaurant_ids(*user_ids):
+    cache.delete_many([_access_key(user_id) for user_id in user_ids if user_id is not None])
+
+
+class RestaurantAccessMixin:
+    """
+    Resolves the restaurant in the url once per request. Together with users.permissions.HasRestaurantAccess
+    an unknown restaurant is a 404 and one the user neither owns nor manages a 403, so querysets can filter
+    by get_restaurant_id() without loading the restaurant. get_restaurant() loads it when it is needed.
+    """
+    restaurant_url_kwarg = 'restaurant_id'
+
+    def get_restaurant_id(self):
+        return self.kwargs.get(self.restaurant_url_kwarg)
+
+    def has_restaurant_access(self):
+        if not hasattr(self, '_has_restaurant_access'):
+            self._has_restaurant_access = self.check_restaurant_access()
+        return self._has_restaurant_access
+
+    def check_restaurant_access(self):
+        user = self.request.user
+        restaurant_id = self.get_restaurant_id()
+        if restaurant_id in get_accessible_restaurant_ids(user):
+            return True
+        staff_ids = Restaurant.objects.filter(id=restaurant_id).values_list('owner_id', 'manager_id').first()
+        if staff_ids is None:
+            raise NotFound({'details': 'Restaurant not found!'})
+        if user.pk in staff_ids:
+            # Assigned after the ids were cached
+            clear_accessible_restaurant_ids(user.pk)
+            return True
+        return False
+
+    def get_restaurant(self):
+        if not hasattr(self, '_restaurant'):
+            self._restaurant = get_object_or_404(Restaurant, id=self.get_restaurant_id())
+        return self._restaurant
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate
+
+from core.models import Favorite, Review
+from core.opening_hours import restaurant_time_zone
+from owner_dashboard.models import AnalyticsWatermark, PublicQuery, RestaurantDailyStats
+from social.models import Participant, Post
+
+# Source -> (model, lookup of its restaurant id, {RestaurantDailyStats field: aggregate})
+ANALYTICS_SOURCES = {
+    'reviews': (Review, 'restaurant_id', {'reviews': Count('id'), 'rating_sum': Sum('rating')}),
+    'favorites': (Favorite, 'restaurant_id', {'favorites': Count('id')}),
+    'public_queries': (PublicQuery, 'restaurant_id', {'public_queries': Count('id')}),
+    'posts': (Post, 'restaurant_id', {'posts': Count('id')}),
+    'event_participants': (Participant, 'event__restaurant_id', {'event_participants': Count('id')}),
+}
+ANALYTICS_CHUNK = timedelta(days=7)
+# Counters of RestaurantDailyStats, filled by the sources above
+DAILY_STATS_FIELDS = [field for model, restaurant_lookup, aggregates in ANALYTICS_SOURCES.values() for field in aggregates]
+# (restaurant, day) rows per upsert statement
+ROLLUP_BATCH_SIZE = 1000
+
+
+def rollup_window(source, start, end):
+    """
+    Add the source rows created in (start, end] to RestaurantDailyStats, returns the number of (restaurant, day) rows touched.
+    """
+    model, restaurant_lookup, aggregates = ANALYTICS_SOURCES[source]
+    rows = list(
+        model.objects.filter(created_at__gt=start, created_at__lte=end, **{f'{restaurant_lookup}__isnull': False})
+        .annotate(stats_restaurant_id=F(restaurant_lookup), day=TruncDate('created_at', tzinfo=restaurant_time_zone()))
+        .values('stats_restaurant_id', 'day').annotate(**aggregates).order_by('stats_restaurant_id', 'day')
+    )
+    for batch_start in range(0, len(rows), ROLLUP_BATCH_SIZE):
+        add_daily_stats(rows[batch_start:batch_start + ROLLUP_BATCH_SIZE], list(aggregates))
+    return len(rows)
+
+
+def add_daily_stats(rows, fields):
+    """
+    Add the `fields` of each row to its (restaurant, day) stats in one upsert. Other sources may add to the
+    same rows at the same time, so the addition happens in the database, and the rows come sorted so
+    every run locks them in the same order.
+    """
+    quote = connection.ops.quote_name
+    table = quote(RestaurantDailyStats._meta.db_table)
+    columns = ['restaurant_id', 'day'] + DAILY_STATS_FIELDS
+    placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    params = []
+    for row in rows:
+        params += [row['stats_restaurant_id'], row['day']] + [(row[field] or 0) if field in fields else 0 for field in DAILY_STATS_FIELDS]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(quote(column) for column in columns)}) VALUES {", ".join([placeholders] * len(rows))} '
+            f'ON CONFLICT ({quote("restaurant_id")}, {quote("day")}) DO UPDATE SET '
+            + ', '.join(f'{quote(field)} = {table}.{quote(field)} + EXCLUDED.{quote(field)}' for field in fields),
+            params,
+        )
+
+
+def process_source(source, until, chunk=ANALYTICS_CHUNK):
+    """
+    Roll up the source rows created after its watermark and up to until, one transaction per chunk.
+    The watermark row is locked while a chunk is processed, so concurrent runs do not count rows twice.
+    """
+    model = ANALYTICS_SOURCES[source][0]
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark, created = AnalyticsWatermark.objects.select_for_update().get_or_create(source=source)
+            start = watermark.processed_until
+            if start is None:
+                first_created_at = model.objects.aggregate(first=Min('created_at'))['first']
+                start = first_created_at - timedelta(microseconds=1) if first_created_at else until
+            if start >= until:
+                if watermark.processed_until is None:
+                    watermark.processed_until = until
+                    watermark.save()
+                return processed
+            end = min(start + chunk, until)
+            processed += rollup_window(source, start, end)
+            watermark.processed_until = end
+            watermark.save()
+
+
+def reset_source(source):
+    """
+    Forget what was rolled up from the source, the next run counts its rows from the beginning.
+    """
+    fields = ANALYTICS_SOURCES[source][2]
+    with transaction.atomic():
+        watermark, created = AnalyticsWatermark.objects.select_for_update().get_or_create(source=source)
+        RestaurantDailyStats.objects.update(**{field: 0 for field in fields})
+        watermark.processed_until = None
+        watermark.save()
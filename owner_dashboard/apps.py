@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OwnerDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'owner_dashboard'
+
+    def ready(self):
+        import owner_dashboard.signals  # noqa: F401
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from owner_dashboard.analytics import ANALYTICS_SOURCES, process_source, reset_source
+
+
+class Command(BaseCommand):
+    help = 'Roll up the owner analytics history into RestaurantDailyStats, a bounded window per transaction.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='*', help=f"Any of {', '.join(ANALYTICS_SOURCES)}, defaults to all of them.")
+        parser.add_argument('--chunk-days', type=int, default=7, help='Days of rows rolled up per transaction.')
+        parser.add_argument('--reset', action='store_true', help='Start over from the oldest rows instead of the watermark.')
+
+    def handle(self, *args, **options):
+        chunk = timedelta(days=options['chunk_days'])
+        until = timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)
+        unknown = set(options['sources']) - set(ANALYTICS_SOURCES)
+        if unknown:
+            raise CommandError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+        for source in options['sources'] or ANALYTICS_SOURCES:
+            if options['reset']:
+                reset_source(source)
+            processed = process_source(source, until, chunk)
+            self.stdout.write(self.style.SUCCESS(f'{source}: {processed} daily row(s) updated.'))
@@ -26,6 +26,7 @@ class PublicQuery(TimeStampedModel):
     class Meta:
         indexes = [
             models.Index(fields=['restaurant']),
+            models.Index(fields=['created_at']),
         ]
 
 
@@ -70,3 +71,30 @@ class PromotionOnItem(TimeStampedModel):
             models.Index(fields=['promotion']),
         ]
         unique_together = (('promotion', 'item'),)
+
+
+class RestaurantDailyStats(models.Model):
+    """
+    Rows created per restaurant and day (restaurant local time), filled by owner_dashboard.analytics.
+    """
+    restaurant = models.ForeignKey(Restaurant, related_name='daily_stats', on_delete=models.CASCADE)
+    day = models.DateField()
+    reviews = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    favorites = models.PositiveIntegerField(default=0)
+    public_queries = models.PositiveIntegerField(default=0)
+    posts = models.PositiveIntegerField(default=0)
+    event_participants = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['restaurant', 'day'], name='unique_restaurant_daily_stats'),
+        ]
+
+
+class AnalyticsWatermark(TimeStampedModel):
+    """
+    Rows of the source created up to processed_until are counted in RestaurantDailyStats.
+    """
+    source = models.CharField(max_length=50, unique=True)
+    processed_until = models.DateTimeField(blank=True, null=True)
@@ -4,29 +4,33 @@ from rest_framework.serializers import ModelSerializer, Serializer
 from rest_framework import serializers
 from core.models import Restaurant, Category, RestaurantCategory, MenuItem, Review, ReviewReply, QA, RestaurantTimings, RestaurantImages, SubCategory, ItemIngredient, MenuItemImages, ClamRequest, \
     Service, RestaurantService, RequestDetailsUpdate, Cuisines, MenuType, RestaurantCuisines, BusinessType, City, State, RestaurantAcceptedPayment, ModeOfPayment, AdsBanner
+from core.sparse_fields import SparseFieldsMixin
 from owner_dashboard.models import RestaurantNotification, PublicQuery, Promotion, PromotionWeekDay, PromotionOnItem
 from users.models import User, Collaborator
 from social.models import Event
 
 
-class CategoryCountSerializer(ModelSerializer):
+class RestaurantSummaryFieldsMixin(serializers.Serializer):
+    # Annotated by owner_dashboard.views.annotate_restaurant_summary
+    category_count = serializers.IntegerField(read_only=True)
+    menu_item_count = serializers.IntegerField(read_only=True)
+    pending_query_count = serializers.IntegerField(read_only=True)
+    unread_notification_count = serializers.IntegerField(read_only=True)
+    active_promotion_count = serializers.IntegerField(read_only=True)
+
+
+class CategoryCountSerializer(SparseFieldsMixin, RestaurantSummaryFieldsMixin, ModelSerializer):
     class Meta:
         model = Restaurant
-        fields = ['category_count', 'menu_item_count', 'average_rating', 'is_disabled']
+        fields = ['category_count', 'menu_item_count', 'average_rating', 'is_disabled', 'pending_query_count', 'unread_notification_count', 'active_promotion_count']
 
 
 class AllCategoryListSerializer(ModelSerializer):
     is_added = SerializerMethodField('get_is_added', read_only=True)
 
     def get_is_added(self, data):
-        restaurant = self.context['restaurant']
-        if restaurant:
-            try:
-                RestaurantCategory.objects.get(category=data, restaurant=restaurant)
-                return True
-            except:
-                return False
-        return False
+        # Ids the restaurant already has, fetched once by the view
+        return data.id in self.context['added_ids']
 
     class Meta:
         model = Category
@@ -37,33 +41,27 @@ class AllCuisinesListSerializer(serializers.ModelSerializer):
     is_added = SerializerMethodField('get_is_added', read_only=True)
 
     def get_is_added(self, data):
-        restaurant = self.context['restaurant']
-        if restaurant:
-            try:
-                RestaurantCuisines.objects.get(cuisine=data, restaurant=restaurant)
-                return True
-            except:
-                return False
-        return False
+        # Ids the restaurant already has, fetched once by the view
+        return data.id in self.context['added_ids']
 
     class Meta:
         model = Cuisines
         fields = '__all__'
 
 
-class AllBusinessTypesSerializer(serializers.ModelSerializer):
+class AllBusinessTypesSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = BusinessType
         fields = '__all__'
 
 
-class CitySerializer(serializers.ModelSerializer):
+class CitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = City
         fields = '__all__'
 
 
-class StateSerializer(serializers.ModelSerializer):
+class StateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = State
         fields = '__all__'
@@ -73,14 +71,8 @@ class PaymentModeSerializer(ModelSerializer):
     is_added = SerializerMethodField('get_is_added', read_only=True)
 
     def get_is_added(self, data):
-        restaurant = self.context['restaurant']
-        if restaurant:
-            try:
-                RestaurantAcceptedPayment.objects.get(payment=data, restaurant=restaurant)
-                return True
-            except:
-                return False
-        return False
+        # Ids the restaurant already has, fetched once by the view
+        return data.id in self.context['added_ids']
 
     class Meta:
         model = ModeOfPayment
@@ -93,13 +85,13 @@ class AddRestaurantCategorySerializer(ModelSerializer):
         fields = ['category', 'restaurant', ]
 
 
-class RatingUserSerializer(ModelSerializer):
+class RatingUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'email', 'profile_image']
 
 
-class UserReviewListSerializer(ModelSerializer):
+class UserReviewListSerializer(SparseFieldsMixin, ModelSerializer):
     user = RatingUserSerializer()
 
     class Meta:
@@ -109,13 +101,13 @@ class UserReviewListSerializer(ModelSerializer):
         ]
 
 
-class ReplayReviewSerializer(ModelSerializer):
+class ReplayReviewSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ReviewReply
         fields = '__all__'
 
 
-class ReviewDetailSerializer(ModelSerializer):
+class ReviewDetailSerializer(SparseFieldsMixin, ModelSerializer):
     user = RatingUserSerializer()
     review_replays = ReplayReviewSerializer(many=True)
 
@@ -136,26 +128,26 @@ class AddReviewReplaySerializer(ModelSerializer):
         ]
 
 
-class RestaurantNotificationSerializer(ModelSerializer):
+class RestaurantNotificationSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = RestaurantNotification
         fields = '__all__'
 
 
-class CollaboratorListSerializer(ModelSerializer):
+class CollaboratorListSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Collaborator
         fields = '__all__'
 
 
-class QASerializer(ModelSerializer):
+class QASerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = QA
         fields = '__all__'
         read_only_fields = ['restaurant', ]
 
 
-class CuisinesSerializer(ModelSerializer):
+class CuisinesSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Cuisines
         fields = '__all__'
@@ -186,7 +178,7 @@ class RestaurantTimeSerializer(ModelSerializer):
         read_only_fields = ['id', 'weekday']
 
 
-class RestaurantImagesSerializer(ModelSerializer):
+class RestaurantImagesSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = RestaurantImages
         fields = ['image', 'id']
@@ -255,7 +247,7 @@ class RestaurantBasicDetailUpdateSerializer(ModelSerializer):
     #     return instance
 
 
-class ItemSubCategorySerializer(ModelSerializer):
+class ItemSubCategorySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = SubCategory
         fields = [
@@ -263,7 +255,7 @@ class ItemSubCategorySerializer(ModelSerializer):
         ]
 
 
-class IngredientSerializer(ModelSerializer):
+class IngredientSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ItemIngredient
         fields = [
@@ -271,13 +263,13 @@ class IngredientSerializer(ModelSerializer):
         ]
 
 
-class MenuTypeSerializer(serializers.ModelSerializer):
+class MenuTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MenuType
         fields = '__all__'
 
 
-class ItemImageSerializer(ModelSerializer):
+class ItemImageSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = MenuItemImages
         fields = [
@@ -285,7 +277,7 @@ class ItemImageSerializer(ModelSerializer):
         ]
 
 
-class MenuItemDetailSerializer(ModelSerializer):
+class MenuItemDetailSerializer(SparseFieldsMixin, ModelSerializer):
     item_ingredients = IngredientSerializer(many=True, required=False, read_only=True)
     ingredients = ListField(child=serializers.CharField(), write_only=True, required=False)
 
@@ -363,18 +355,18 @@ class MenuItemDetailSerializer(ModelSerializer):
         """
 
 
-class MenuItemListSerializer(ModelSerializer):
+class MenuItemListSerializer(SparseFieldsMixin, ModelSerializer):
     sub_category = ItemSubCategorySerializer(read_only=True)
     item_ingredients = IngredientSerializer(many=True, required=False)
     menu_type = MenuTypeSerializer(read_only=True)
 
     class Meta:
         model = MenuItem
-        fields = '__all__'
+        exclude = ['search_document']
         read_only_fields = ['restaurant', ]
 
 
-class RestaurantSubCategorySerializer(ModelSerializer):
+class RestaurantSubCategorySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = SubCategory
         fields = ['id', 'name', 'icon']
@@ -393,7 +385,7 @@ class MenuUploadCsvSerializer(Serializer):
     data_file = serializers.FileField(validators=[validate_file_extension], required=True)
 
 
-class UnclaimedRestaurantSerializer(ModelSerializer):
+class UnclaimedRestaurantSerializer(SparseFieldsMixin, ModelSerializer):
     city = CitySerializer(read_only=True)
     state = StateSerializer(read_only=True)
 
@@ -416,7 +408,7 @@ class MakeClaimRequestSerializer(ModelSerializer):
         return menu_instance
 
 
-class OwnerRestaurantListSerializer(ModelSerializer):
+class OwnerRestaurantListSerializer(SparseFieldsMixin, RestaurantSummaryFieldsMixin, ModelSerializer):
     city = CitySerializer(read_only=True)
     state = StateSerializer(read_only=True)
     type = AllBusinessTypesSerializer(read_only=True)
@@ -425,7 +417,8 @@ class OwnerRestaurantListSerializer(ModelSerializer):
         model = Restaurant
         fields = [
             'id', 'name', 'phone_number', 'phone_number_2', 'address', 'address_ru', 'location', 'latitude', 'longitude', 'city', 'state', 'zipcode',
-            'profile_image', 'business_description', 'is_disabled', 'is_approved', 'type',
+            'profile_image', 'business_description', 'is_disabled', 'is_approved', 'type', 'average_rating', 'rating_count', 'category_count', 'menu_item_count',
+            'pending_query_count', 'unread_notification_count', 'active_promotion_count',
         ]
 
 
@@ -438,13 +431,13 @@ class RestaurantCreateSerializer(ModelSerializer):
         ]
 
 
-class RaiseBySerializer(ModelSerializer):
+class RaiseBySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email', 'mobile_number', 'profile_image']
 
 
-class PublicQuerySerializer(ModelSerializer):
+class PublicQuerySerializer(SparseFieldsMixin, ModelSerializer):
     raise_by = RaiseBySerializer(read_only=True)
 
     class Meta:
@@ -455,13 +448,13 @@ class PublicQuerySerializer(ModelSerializer):
         ]
 
 
-class ManagerUserSerializer(ModelSerializer):
+class ManagerUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'email', 'username', 'first_name', 'last_name', 'profile_image', 'mobile_number']
 
 
-class RestaurantManagerSerializer(ModelSerializer):
+class RestaurantManagerSerializer(SparseFieldsMixin, ModelSerializer):
     manager = ManagerUserSerializer(read_only=True)
 
     class Meta:
@@ -486,14 +479,8 @@ class AllServiceSerializer(ModelSerializer):
     is_already_added = SerializerMethodField('get_is_already_added', read_only=True)
 
     def get_is_already_added(self, data):
-        restaurant = self.context['restaurant']
-        if restaurant:
-            try:
-                RestaurantService.objects.get(service=data, restaurant=restaurant)
-                return True
-            except RestaurantService.DoesNotExist:
-                return False
-        return False
+        # Ids the restaurant already has, fetched once by the view
+        return data.id in self.context['added_ids']
 
     class Meta:
         model = Service
@@ -540,13 +527,13 @@ class AddPaymentModeSerializer(ModelSerializer):
         fields = ['payment', ]
 
 
-class PaymentModeDetailSerializer(ModelSerializer):
+class PaymentModeDetailSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = ModeOfPayment
         fields = '__all__'
 
 
-class RestaurantPaymentMethodSerializer(ModelSerializer):
+class RestaurantPaymentMethodSerializer(SparseFieldsMixin, ModelSerializer):
     payment = PaymentModeDetailSerializer()
 
     class Meta:
@@ -554,7 +541,7 @@ class RestaurantPaymentMethodSerializer(ModelSerializer):
         fields = ['payment', 'id']
 
 
-class PromotionListSerializer(ModelSerializer):
+class PromotionListSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Promotion
         fields = [
@@ -562,7 +549,7 @@ class PromotionListSerializer(ModelSerializer):
         ]
 
 
-class PromotionWeekDaySerializer(ModelSerializer):
+class PromotionWeekDaySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = PromotionWeekDay
         fields = [
@@ -570,13 +557,13 @@ class PromotionWeekDaySerializer(ModelSerializer):
         ]
 
 
-class MenuItemDropdownSerializer(ModelSerializer):
+class MenuItemDropdownSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = MenuItem
         fields = ('id', 'Item_name')
 
 
-class PromotionOnItemSerializer(ModelSerializer):
+class PromotionOnItemSerializer(SparseFieldsMixin, ModelSerializer):
     item = MenuItemDropdownSerializer(read_only=True)
 
     class Meta:
@@ -586,7 +573,7 @@ class PromotionOnItemSerializer(ModelSerializer):
         ]
 
 
-class PromotionDetailSerializer(ModelSerializer):
+class PromotionDetailSerializer(SparseFieldsMixin, ModelSerializer):
     week_days = PromotionWeekDaySerializer(read_only=True, many=True)
     applicable_on = PromotionOnItemSerializer(read_only=True, many=True)
     days = ListField(child=serializers.CharField(), write_only=True, required=False)
@@ -650,13 +637,13 @@ class PromotionDetailSerializer(ModelSerializer):
         return instance
 
 
-class CreatedBySerializer(ModelSerializer):
+class CreatedBySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'mobile_number', 'profile_image']
 
 
-class EventSerializer(ModelSerializer):
+class EventSerializer(SparseFieldsMixin, ModelSerializer):
     created_by = CreatedBySerializer()
 
     class Meta:
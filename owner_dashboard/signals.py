@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from core.models import Restaurant
+from owner_dashboard.access import clear_accessible_restaurant_ids
+
+
+def _staff_ids(instance):
+    # Read from __dict__ so a deferred owner or manager is not loaded.
+    return instance.__dict__.get('owner_id'), instance.__dict__.get('manager_id')
+
+
+@receiver(post_init, sender=Restaurant)
+def remember_restaurant_staff(sender, instance, **kwargs):
+    instance._original_staff_ids = _staff_ids(instance)
+
+
+@receiver(post_save, sender=Restaurant)
+@receiver(post_delete, sender=Restaurant)
+def clear_staff_restaurant_access(sender, instance, created=False, **kwargs):
+    original_ids, staff_ids = instance._original_staff_ids, _staff_ids(instance)
+    if original_ids == staff_ids and not created and kwargs['signal'] is post_save:
+        return
+    user_ids = set(original_ids) | set(staff_ids)
+    instance._original_staff_ids = staff_ids
+    transaction.on_commit(lambda: clear_accessible_restaurant_ids(*user_ids))
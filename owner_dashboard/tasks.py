@@ -1,6 +1,11 @@
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
 import pandas as pd
 from core.models import Restaurant, MenuItem, SubCategory, ItemIngredient, MenuType
+from owner_dashboard.analytics import ANALYTICS_SOURCES, process_source
 
 
 @shared_task()
@@ -38,3 +43,10 @@ def create_menu_items(restaurant_id, df_json):
 
         except Exception as e:
             print(e)
+
+
+@shared_task()
+def rollup_restaurant_analytics():
+    until = timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_LAG)
+    for source in ANALYTICS_SOURCES:
+        process_source(source, until)
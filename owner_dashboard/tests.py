@@ -1,3 +1,95 @@
+from datetime import datetime, timedelta
+
 from django.test import TestCase
 
-# Create your tests here.
+from core.models import Favorite, Restaurant, Review
+from core.opening_hours import restaurant_time_zone
+from core.testing import CatalogueDropdownTestMixin
+from owner_dashboard.analytics import process_source, reset_source
+from owner_dashboard.models import AnalyticsWatermark, RestaurantDailyStats
+from users.models import User
+
+
+class CatalogueDropdownTest(CatalogueDropdownTestMixin, TestCase):
+    namespace = 'Owner V1'
+    dropdowns = {
+        'all category': 'is_added',
+        'All services': 'is_already_added',
+        'all cuisines': 'is_added',
+        'all payment modes': 'is_added',
+    }
+
+    owns_restaurant = True
+
+    @classmethod
+    def create_user(cls):
+        return User.objects.create(username='owner', email='owner@example.com', is_cafe_owner=True)
+
+
+class AnalyticsRollupTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.restaurant = Restaurant.objects.create(name='Restaurant', latitude=43.238, longitude=76.889)
+        cls.users = [User.objects.create(username=f'visitor{i}', email=f'visitor{i}@example.com', is_visitor=True) for i in range(3)]
+
+    def at(self, day, hour=12):
+        # Restaurant local time, 2024-01-01 is the first day
+        return datetime(2024, 1, day, hour, tzinfo=restaurant_time_zone())
+
+    def add_review(self, user, rating, created_at):
+        review = Review.objects.create(restaurant=self.restaurant, user=user, rating=rating)
+        Review.objects.filter(id=review.id).update(created_at=created_at)
+
+    def add_favorite(self, user, created_at):
+        favorite = Favorite.objects.create(restaurant=self.restaurant, user=user)
+        Favorite.objects.filter(id=favorite.id).update(created_at=created_at)
+
+    def stats(self):
+        return {
+            stats.day.day: (stats.reviews, stats.rating_sum, stats.favorites)
+            for stats in RestaurantDailyStats.objects.filter(restaurant=self.restaurant)
+        }
+
+    def test_rollup_by_local_day(self):
+        self.add_review(self.users[0], 5, self.at(1))
+        self.add_review(self.users[1], 3, self.at(1, 23))
+        # 00:30 local time is still the previous day in UTC
+        self.add_review(self.users[2], 4, self.at(2, 0) + timedelta(minutes=30))
+        self.assertEqual(process_source('reviews', self.at(10), chunk=timedelta(days=1)), 2)
+        self.assertEqual(self.stats(), {1: (2, 8, 0), 2: (1, 4, 0)})
+
+    def test_watermark(self):
+        self.add_review(self.users[0], 5, self.at(1))
+        process_source('reviews', self.at(3))
+        self.assertEqual(AnalyticsWatermark.objects.get(source='reviews').processed_until, self.at(3))
+
+        # A second run only counts what was created after the watermark
+        self.add_review(self.users[1], 2, self.at(4))
+        self.add_review(self.users[2], 1, self.at(2))
+        process_source('reviews', self.at(5))
+        self.assertEqual(self.stats(), {1: (1, 5, 0), 4: (1, 2, 0)})
+        self.assertEqual(AnalyticsWatermark.objects.get(source='reviews').processed_until, self.at(5))
+
+        # Nothing new, nothing counted twice
+        self.assertEqual(process_source('reviews', self.at(5)), 0)
+        self.assertEqual(self.stats(), {1: (1, 5, 0), 4: (1, 2, 0)})
+
+    def test_sources_share_the_daily_row(self):
+        self.add_review(self.users[0], 4, self.at(1))
+        self.add_favorite(self.users[0], self.at(1, 9))
+        self.add_favorite(self.users[1], self.at(1, 18))
+        process_source('favorites', self.at(3))
+        process_source('reviews', self.at(3))
+        self.assertEqual(self.stats(), {1: (1, 4, 2)})
+
+    def test_reset(self):
+        self.add_review(self.users[0], 4, self.at(1))
+        self.add_favorite(self.users[0], self.at(1))
+        process_source('reviews', self.at(3))
+        process_source('favorites', self.at(3))
+        reset_source('reviews')
+        self.assertEqual(self.stats(), {1: (0, 0, 1)})
+        self.assertIsNone(AnalyticsWatermark.objects.get(source='reviews').processed_until)
+
+        process_source('reviews', self.at(3))
+        self.assertEqual(self.stats(), {1: (1, 4, 1)})
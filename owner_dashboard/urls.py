@@ -1,7 +1,7 @@
 from django.urls import path
 
 from owner_dashboard.views import CategoryCount, AllCategoryList, AddRestaurantCategory, RestaurantMenuItemList, RemoveMenuItem, RestaurantReviewList, ReviewDetails, AddReviewReplay, \
-    RestaurantNotificationList, MarkAsReadNotification, AvgMonthlyRating, CollaboratorList, QAList, CreateQA, UpdateQA, DeleteQA, RestaurantAddress, RestaurantTimeList, UpdateRestaurantTime, \
+    RestaurantNotificationList, MarkAsReadNotification, AvgMonthlyRating, RestaurantAnalytics, CollaboratorList, QAList, CreateQA, UpdateQA, DeleteQA, RestaurantAddress, RestaurantTimeList, UpdateRestaurantTime, \
     RestaurantBasicDetails, RestaurantImageUpload, DeleteRestaurantImage, MenuItemDetail, CreateMenuItem, UpdateMenuItem, DeleteIngredients, DeleteItemImages, RestaurantSubCategoryList, \
     UploadMenuCsvApi, UnclaimedRestaurantList, MakeClaimRequest, OwnerRestaurantList, CreateRestaurantApi, PublicQueryList, ReplayPublicQuery, RestaurantManager, ExistingManagerList, SetManager, \
     CreateManager, AllServices, RestaurantServiceList, RemoveRestaurantService, AddRestaurantService, CuisinesList, MenuTypeList, AllCuisinesList, AllBusinessTypes, AllCitys, AllStates, \
@@ -25,6 +25,7 @@ owner_dashboard_api_v1_urlpatterns = [
     path('restaurant-menu/<int:restaurant_id>/', RestaurantMenuItemList.as_view(), name='menu item list for restaurant'),
     path('restaurant-upload-menu-csv/<int:restaurant_id>/', UploadMenuCsvApi.as_view(), name='Bulk upload menu items'),
     path('monthly-rating/<int:restaurant_id>/', AvgMonthlyRating.as_view(), name='Avg Monthly Rating and count for past 12 months'),
+    path('analytics/<int:restaurant_id>/', RestaurantAnalytics.as_view(), name='Restaurant analytics time series and deltas'),
     path('menu-types/', MenuTypeList.as_view(), name='Menu types'),
     path('restaurant-menu-item/<int:restaurant_id>/<int:id>/', MenuItemDetail.as_view(), name='Restaurant menu item details'),
     path('restaurant-add-menu-item/<int:restaurant_id>/', CreateMenuItem.as_view(), name='Restaurant menu item create'),
@@ -1,20 +1,25 @@
 import django_filters
-from django.db.models import Avg, Q
-from django.utils.timezone import make_aware
+from django.db.models import Count, IntegerField, Min, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncWeek, TruncYear
+from django.utils.timezone import localdate, make_aware
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet, DateTimeFilter
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import RetrieveAPIView, ListAPIView, GenericAPIView, DestroyAPIView, CreateAPIView, UpdateAPIView, RetrieveUpdateAPIView, get_object_or_404
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
 from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST, HTTP_200_OK, HTTP_405_METHOD_NOT_ALLOWED
 from rest_framework.views import APIView
-from rest_framework.exceptions import NotFound
-from datetime import datetime, timedelta
+from rest_framework.exceptions import NotFound, ValidationError
+from datetime import date, datetime, time, timedelta
 from core.models import Restaurant, Category, RestaurantCategory, MenuItem, Review, QA, RestaurantTimings, RestaurantImages, ItemIngredient, MenuItemImages, SubCategory, Service, RestaurantService, \
-    ClamRequest, RequestDetailsUpdate, Cuisines, MenuType, BusinessType, City, State, ModeOfPayment, RestaurantCuisines, RestaurantAcceptedPayment
+    ClamRequest, RequestDetailsUpdate, Cuisines, MenuType, BusinessType, City, State, ModeOfPayment, RestaurantCuisines, RestaurantAcceptedPayment, ReviewMonthlyStats
+from core.cache import CachedResponseMixin
+from core.opening_hours import restaurant_time_zone
+from core.sparse_fields import SparseFieldsQuerysetMixin
+from owner_dashboard.access import RestaurantAccessMixin
 from jertap_backend.settings import SOCIAL_SECRET
-from owner_dashboard.models import RestaurantNotification, PublicQuery, Promotion, PromotionWeekDay, PromotionOnItem
+from owner_dashboard.models import RestaurantNotification, PublicQuery, Promotion, PromotionWeekDay, PromotionOnItem, RestaurantDailyStats, AnalyticsWatermark
 from owner_dashboard.serializers import CategoryCountSerializer, AllCategoryListSerializer, AddRestaurantCategorySerializer, MenuItemListSerializer, UserReviewListSerializer, ReviewDetailSerializer, \
     AddReviewReplaySerializer, RestaurantNotificationSerializer, CollaboratorListSerializer, QASerializer, RestaurantAddressSerializer, RestaurantTimeSerializer, RestaurantBasicDetailSerializer, \
     RestaurantImagesSerializer, MenuItemDetailSerializer, RestaurantSubCategorySerializer, MenuUploadCsvSerializer, UnclaimedRestaurantSerializer, MakeClaimRequestSerializer, \
@@ -24,7 +29,7 @@ from owner_dashboard.serializers import CategoryCountSerializer, AllCategoryList
     RestaurantPaymentMethodSerializer, PromotionListSerializer, PromotionDetailSerializer, MenuItemDropdownSerializer, EventSerializer, AddEventSerializer, CreateAdsSerializer
 from users.email_and_sms import send_email
 from users.models import Collaborator, User
-from users.permissions import IsRestaurantOwner, IsOwnerOrManager
+from users.permissions import IsRestaurantOwner, IsOwnerOrManager, HasRestaurantAccess
 from social.models import Event
 import pandas as pd
 
@@ -33,33 +38,93 @@ from .tasks import create_menu_items
 
 
 # Create your views here.
+class CustomCursorPagination(CursorPagination):
+    """
+    The cursor position is taken from the first ordering field only, so `cursor_ordering` is a single
+    unique, non-null field. Rows with a NULL in it would never match the position and be skipped.
+    """
+    page_size = 15
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get(OrderingFilter.ordering_param):
+            raise ValidationError({'details': f'{OrderingFilter.ordering_param} is not supported with cursor pagination'})
+        return view.cursor_ordering
+
+
 class CustomPagination(PageNumberPagination):
+    """
+    Page numbers by default. Views that set `cursor_ordering` are paged by cursor instead with
+    ?pagination=cursor (and the `cursor` of the next/previous links), which skips the COUNT(*)
+    and the growing OFFSET of deep pages. Cursor pages always follow `cursor_ordering`: ?ordering=
+    is rejected and the view's own order, e.g. nearest first, is replaced.
+    """
     page_size = 15
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if getattr(view, 'cursor_ordering', None) and (request.query_params.get('pagination') == 'cursor' or 'cursor' in request.query_params):
+            self.cursor_paginator = CustomCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+# Dashboard counts of a restaurant: the model counted and its filter
+RESTAURANT_SUMMARY_COUNTS = {
+    'category_count': (RestaurantCategory, {}),
+    'menu_item_count': (MenuItem, {}),
+    'pending_query_count': (PublicQuery, {'is_answered': False}),
+    'unread_notification_count': (RestaurantNotification, {'is_read': False}),
+    'active_promotion_count': (Promotion, {'is_active': True}),
+}
+
 
+def annotate_restaurant_summary(queryset, names=None):
+    """
+    Annotate the RESTAURANT_SUMMARY_COUNTS given by name (all by default) as correlated subqueries,
+    so a whole list of restaurants is counted in the same statement.
+    """
+    annotations = {}
+    for name, (model, filters) in RESTAURANT_SUMMARY_COUNTS.items():
+        if names is None or name in names:
+            rows = model.objects.filter(restaurant=OuterRef('pk'), **filters).order_by().values('restaurant').annotate(value=Count('id')).values('value')
+            annotations[name] = Coalesce(Subquery(rows, output_field=IntegerField()), Value(0))
+    return queryset.annotate(**annotations)
 
-class CategoryCount(RetrieveAPIView):
+
+class RestaurantSummaryQuerysetMixin(SparseFieldsQuerysetMixin):
+    def annotate_summary(self, queryset):
+        return annotate_restaurant_summary(queryset, [name for name in RESTAURANT_SUMMARY_COUNTS if self.is_field_rendered(name)])
+
+
+class CategoryCount(RestaurantSummaryQuerysetMixin, RetrieveAPIView):
     serializer_class = CategoryCountSerializer
     lookup_field = 'id'
     permission_classes = [IsOwnerOrManager]
 
     def get_queryset(self):
-        return Restaurant.objects.filter(Q(owner=self.request.user) | Q(manager=self.request.user))
+        return self.annotate_summary(Restaurant.objects.filter(Q(owner=self.request.user) | Q(manager=self.request.user)))
 
 
-class AllCategoryList(ListAPIView):
+def get_added_ids(model, field, restaurant_id):
+    """
+    Ids in `field` of the restaurant's `model` rows, e.g. the categories it has, for the "already added" flags of a catalogue.
+    """
+    return frozenset(model.objects.filter(restaurant_id=restaurant_id).values_list(field, flat=True))
+
+
+class AllCategoryList(RestaurantAccessMixin, ListAPIView):
     serializer_class = AllCategoryListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     queryset = Category.objects.all().order_by('name')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        # context.update({"request": self.request})
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantCategory, 'category_id', self.get_restaurant_id())})
         return context
 
 
@@ -70,18 +135,11 @@ class AddRestaurantCategory(GenericAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        try:
-            category = Category.objects.get(id=serializer.data['category'])
-        except Category.DoesNotExist:
-            return Response({'details': 'Category does not exists'}, status=HTTP_400_BAD_REQUEST)
-        try:
-            restaurant_obj = Restaurant.objects.get(id=serializer.data['restaurant'])
-            if self.request.user == restaurant_obj.owner or self.request.user == restaurant_obj.manager:
-                restaurant = restaurant_obj
-            else:
-                return Response({'details': "You can't add category to other's restaurant"}, status=HTTP_400_BAD_REQUEST)
-        except Restaurant.DoesNotExist:
-            return Response({'details': 'Restaurant does not exists'}, status=HTTP_400_BAD_REQUEST)
+        # Both are loaded by the serializer's validation already
+        category = serializer.validated_data['category']
+        restaurant = serializer.validated_data['restaurant']
+        if self.request.user.pk not in (restaurant.owner_id, restaurant.manager_id):
+            return Response({'details': "You can't add category to other's restaurant"}, status=HTTP_400_BAD_REQUEST)
 
         if RestaurantCategory.objects.filter(restaurant=restaurant, category=category).exists():
             return Response({'details': 'Category already exists'}, status=HTTP_400_BAD_REQUEST)
@@ -102,33 +160,25 @@ class MenuFilter(django_filters.FilterSet):
         fields = ['search', ]
 
 
-class RestaurantMenuItemList(ListAPIView):
+class RestaurantMenuItemList(RestaurantAccessMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = MenuItemListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     pagination_class = CustomPagination
     filter_backends = [DjangoFilterBackend, ]
     filterset_class = MenuFilter
+    select_related_fields = {'sub_category': ['sub_category'], 'menu_type': ['menu_type']}
+    prefetch_related_fields = {'item_ingredients': ['item_ingredients']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return MenuItem.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return MenuItem.objects.none()
+        return self.apply_sparse_fields(MenuItem.objects.filter(restaurant_id=self.get_restaurant_id())).order_by('-id')
 
 
-class RemoveMenuItem(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemoveMenuItem(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return MenuItem.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return MenuItem.objects.none()
+        return MenuItem.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -136,33 +186,26 @@ class RemoveMenuItem(DestroyAPIView):
         return Response({'details': 'Menu Item deleted successfully'}, status=HTTP_200_OK)
 
 
-class RestaurantReviewList(ListAPIView):
+class RestaurantReviewList(RestaurantAccessMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = UserReviewListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
+    select_related_fields = {'user': ['user']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            data = Review.objects.filter(restaurant=restaurant).order_by('modified_at')
-            return data
-        except:
-            return Review.objects.none()
+        data = self.apply_sparse_fields(Review.objects.filter(restaurant_id=self.get_restaurant_id())).order_by('modified_at')
+        return data
 
 
-class ReviewDetails(RetrieveUpdateAPIView):
+class ReviewDetails(RestaurantAccessMixin, SparseFieldsQuerysetMixin, RetrieveUpdateAPIView):
     serializer_class = ReviewDetailSerializer
     lookup_field = 'id'
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
+    select_related_fields = {'user': ['user']}
+    prefetch_related_fields = {'review_replays': ['review_replays']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            data = Review.objects.filter(restaurant=restaurant).order_by('-id')
-            return data
-        except:
-            return Review.objects.none()
+        data = self.apply_sparse_fields(Review.objects.filter(restaurant_id=self.get_restaurant_id())).order_by('-id')
+        return data
 
     def put(self, request, *args, **kwargs):
         return Response({'details': 'Method not allowed'}, status=HTTP_405_METHOD_NOT_ALLOWED)
@@ -179,31 +222,21 @@ class AddReviewReplay(CreateAPIView):
     permission_classes = [IsOwnerOrManager]
 
 
-class RestaurantNotificationList(ListAPIView):
+class RestaurantNotificationList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantNotificationSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return RestaurantNotification.objects.none()
-        return RestaurantNotification.objects.filter(restaurant=restaurant, is_read=False).order_by('-id')[:20]
+        return RestaurantNotification.objects.filter(restaurant_id=self.get_restaurant_id(), is_read=False).order_by('-id')[:20]
 
 
-class MarkAsReadNotification(UpdateAPIView):
+class MarkAsReadNotification(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = RestaurantNotificationSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return RestaurantNotification.objects.none()
-        return RestaurantNotification.objects.filter(restaurant=restaurant).order_by('-id')
+        return RestaurantNotification.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
     def put(self, request, *args, **kwargs):
         return Response({'details': 'Method not allowed'}, status=HTTP_405_METHOD_NOT_ALLOWED)
@@ -233,34 +266,164 @@ def get_month_name(data):
     return choices.get(data, '')
 
 
-class AvgMonthlyRating(APIView):
-    permission_classes = [IsOwnerOrManager, ]
+RATING_PERIODS = ['week', 'month', 'year']
+MAX_RATING_PERIODS = 120
 
-    def get(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'Restaurant does not exist'}, status=HTTP_400_BAD_REQUEST)
 
-        current_month = datetime.now().month
-        current_year = datetime.now().year
+def get_period_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def get_previous_period_start(start, period):
+    if period == 'week':
+        return start - timedelta(weeks=1)
+    if period == 'month':
+        return (start - timedelta(days=1)).replace(day=1)
+    return start.replace(year=start.year - 1)
+
 
+def get_period_label(start, period):
+    if period == 'month':
+        return get_month_name(str(start.month)) + '/' + str(start.year)
+    if period == 'year':
+        return str(start.year)
+    return start.isoformat()
+
+
+def get_rating_stats(restaurant_id, period, first, last):
+    """
+    {period start: (rating sum, rating count)} of the periods from first to last, in one query.
+    """
+    if period == 'week':
+        # Weeks do not fit the monthly rollup, group the reviews on the (restaurant, created_at) index instead.
+        start = make_aware(datetime.combine(first, time.min))
+        end = make_aware(datetime.combine(last + timedelta(weeks=1), time.min))
+        rows = Review.objects.filter(restaurant_id=restaurant_id, created_at__gte=start, created_at__lt=end).annotate(week=TruncWeek('created_at')) \
+            .values('week').annotate(rating_sum=Sum('rating'), rating_count=Count('id')).order_by()
+        return {row['week'].date(): (row['rating_sum'], row['rating_count']) for row in rows}
+
+    rows = ReviewMonthlyStats.objects.filter(restaurant_id=restaurant_id, month__gte=first, month__lte=last)
+    if period == 'year':
+        rows = rows.annotate(year=TruncYear('month')).values('year').annotate(rating_sum=Sum('rating_sum'), rating_count=Sum('rating_count')).order_by()
+        return {row['year']: (row['rating_sum'], row['rating_count']) for row in rows}
+    return {month: (rating_sum, rating_count) for month, rating_sum, rating_count in rows.values_list('month', 'rating_sum', 'rating_count')}
+
+
+class AvgMonthlyRating(RestaurantAccessMixin, APIView):
+    """
+    Average rating and count for the past 12 months, latest first.
+    ?period=week|month|year groups by another period, ?start= and ?end= (YYYY-MM-DD) pick the window,
+    rounded to whole periods.
+    """
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
+
+    def get(self, request, *args, **kwargs):
+        period = request.query_params.get('period', 'month')
+        if period not in RATING_PERIODS:
+            return Response({'details': 'period must be one of ' + ', '.join(RATING_PERIODS)}, status=HTTP_400_BAD_REQUEST)
+        try:
+            start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else None
+            end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else localdate()
+        except ValueError:
+            return Response({'details': 'Invalid date, use YYYY-MM-DD'}, status=HTTP_400_BAD_REQUEST)
+
+        periods = [get_period_start(end, period)]
+        if start is None:
+            for i in range(11):
+                periods.append(get_previous_period_start(periods[-1], period))
+        else:
+            first = get_period_start(start, period)
+            if first > periods[0]:
+                return Response({'details': 'start must be before end'}, status=HTTP_400_BAD_REQUEST)
+            while periods[-1] > first:
+                if len(periods) == MAX_RATING_PERIODS:
+                    return Response({'details': f'At most {MAX_RATING_PERIODS} periods at once'}, status=HTTP_400_BAD_REQUEST)
+                periods.append(get_previous_period_start(periods[-1], period))
+
+        stats = get_rating_stats(self.get_restaurant_id(), period, periods[-1], periods[0])
         data = []
-        for i in range(12):
-            # Calculate the month and year for each iteration
-            month = (current_month - i - 1) % 12 + 1
-            if month == 12 and i > 0:
-                current_year = current_year - 1
-            year = current_year
-            rating_count = Review.objects.filter(restaurant=restaurant, created_at__month=month, created_at__year=year).count()
-            average = Review.objects.filter(restaurant=restaurant, created_at__month=month, created_at__year=year).aggregate(avg_rating=Avg('rating'))['avg_rating']
-            avg_rating = average if average else 0
-            data.append({'month': get_month_name(str(month)) + '/' + str(year), 'avg_rating': avg_rating, 'rating_count': rating_count})
+        for period_start in periods:
+            rating_sum, rating_count = stats.get(period_start, (0, 0))
+            avg_rating = rating_sum / rating_count if rating_count else 0
+            data.append({period: get_period_label(period_start, period), 'avg_rating': avg_rating, 'rating_count': rating_count})
 
         return Response(data, status=HTTP_200_OK)
 
 
+ANALYTICS_PERIODS = ['day', 'week', 'month']
+ANALYTICS_FIELDS = ['reviews', 'rating_sum', 'favorites', 'public_queries', 'posts', 'event_participants']
+MAX_ANALYTICS_DAYS = 366
+
+
+def get_analytics_metrics(values):
+    metrics = {field: values[field] for field in ANALYTICS_FIELDS if field != 'rating_sum'}
+    metrics['avg_rating'] = values['rating_sum'] / values['reviews'] if values['reviews'] else 0
+    return metrics
+
+
+def get_analytics_delta(current, previous):
+    change = current - previous
+    return {'change': change, 'percent': round(change / previous * 100, 1) if previous else None}
+
+
+class RestaurantAnalytics(RestaurantAccessMixin, APIView):
+    """
+    Daily reviews, favorites, public queries, posts and event participants from RestaurantDailyStats.
+    ?start= and ?end= (YYYY-MM-DD, the last 30 days by default) pick the window, ?period=day|week|month groups
+    the series. The deltas compare the totals with the window of the same length right before it.
+    """
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
+
+    def get(self, request, *args, **kwargs):
+        period = request.query_params.get('period', 'day')
+        if period not in ANALYTICS_PERIODS:
+            return Response({'details': 'period must be one of ' + ', '.join(ANALYTICS_PERIODS)}, status=HTTP_400_BAD_REQUEST)
+        try:
+            end = date.fromisoformat(request.query_params['end']) if request.query_params.get('end') else localdate(timezone=restaurant_time_zone())
+            start = date.fromisoformat(request.query_params['start']) if request.query_params.get('start') else end - timedelta(days=29)
+        except ValueError:
+            return Response({'details': 'Invalid date, use YYYY-MM-DD'}, status=HTTP_400_BAD_REQUEST)
+        if start > end:
+            return Response({'details': 'start must be before end'}, status=HTTP_400_BAD_REQUEST)
+        days = (end - start).days + 1
+        if days > MAX_ANALYTICS_DAYS:
+            return Response({'details': f'At most {MAX_ANALYTICS_DAYS} days at once'}, status=HTTP_400_BAD_REQUEST)
+        previous_start = start - timedelta(days=days)
+
+        rows = RestaurantDailyStats.objects.filter(restaurant_id=self.get_restaurant_id(), day__gte=previous_start, day__lte=end).values_list('day', *ANALYTICS_FIELDS)
+        series = {}
+        totals = dict.fromkeys(ANALYTICS_FIELDS, 0)
+        previous_totals = dict.fromkeys(ANALYTICS_FIELDS, 0)
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            series.setdefault(day if period == 'day' else get_period_start(day, period), dict.fromkeys(ANALYTICS_FIELDS, 0))
+        for day, *values in rows:
+            if day < start:
+                buckets = [previous_totals]
+            else:
+                buckets = [totals, series[day if period == 'day' else get_period_start(day, period)]]
+            for bucket in buckets:
+                for field, value in zip(ANALYTICS_FIELDS, values):
+                    bucket[field] += value
+
+        totals, previous_totals = get_analytics_metrics(totals), get_analytics_metrics(previous_totals)
+        updated_until = AnalyticsWatermark.objects.aggregate(updated_until=Min('processed_until'))['updated_until']
+        return Response({
+            'period': period,
+            'start': start,
+            'end': end,
+            'updated_until': updated_until,
+            'series': [{period: period_start, **get_analytics_metrics(values)} for period_start, values in series.items()],
+            'totals': totals,
+            'previous_totals': previous_totals,
+            'deltas': {field: get_analytics_delta(totals[field], previous_totals[field]) for field in totals},
+        }, status=HTTP_200_OK)
+
+
 class CollaboratorFilter(django_filters.FilterSet):
     search = django_filters.CharFilter(method='custom_search')
 
@@ -290,49 +453,35 @@ class CollaboratorList(ListAPIView):
         return data
 
 
-class QAList(ListAPIView):
+class QAList(RestaurantAccessMixin, ListAPIView):
     serializer_class = QASerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return QA.objects.none()
-        data = QA.objects.filter(restaurant=restaurant).order_by('-id')
+        data = QA.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
         return data
 
 
-class CreateQA(GenericAPIView):
+class CreateQA(RestaurantAccessMixin, GenericAPIView):
     serializer_class = QASerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'Restaurant not found!'}, status=HTTP_400_BAD_REQUEST)
+        restaurant_id = self.get_restaurant_id()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        QA(restaurant=restaurant, question=serializer.data['question'], answer=serializer.data['answer']).save()
+        QA(restaurant_id=restaurant_id, question=serializer.data['question'], answer=serializer.data['answer']).save()
         return Response({'details': 'Q&A created successfully!'}, status=HTTP_201_CREATED)
 
 
-class UpdateQA(UpdateAPIView):
+class UpdateQA(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = QASerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return QA.objects.none()
-        data = QA.objects.filter(restaurant=restaurant).order_by('-id')
+        data = QA.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
         return data
 
     def put(self, request, *args, **kwargs):
@@ -346,17 +495,12 @@ class UpdateQA(UpdateAPIView):
         return Response({'details': 'Q&A updated successfully'}, status=HTTP_200_OK)
 
 
-class DeleteQA(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class DeleteQA(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return QA.objects.none()
-        data = QA.objects.filter(restaurant=restaurant).order_by('-id')
+        data = QA.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
         return data
 
     def delete(self, request, *args, **kwargs):
@@ -395,33 +539,21 @@ class RestaurantAddress(RetrieveUpdateAPIView):
         return Response({'details': 'Address details update requested'}, status=HTTP_200_OK)
 
 
-class RestaurantTimeList(ListAPIView):
+class RestaurantTimeList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantTimeSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return RestaurantTimings.objects.none()
-
-        return RestaurantTimings.objects.filter(restaurant=restaurant).order_by('id')
+        return RestaurantTimings.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('id')
 
 
-class UpdateRestaurantTime(UpdateAPIView):
+class UpdateRestaurantTime(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = RestaurantTimeSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return RestaurantTimings.objects.none()
-
-        return RestaurantTimings.objects.filter(restaurant=restaurant).order_by('id')
+        return RestaurantTimings.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('id')
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -469,36 +601,27 @@ class RestaurantBasicDetails(RetrieveUpdateAPIView):
         return Response(serializer.data)
 
 
-class RestaurantImageUpload(CreateAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RestaurantImageUpload(RestaurantAccessMixin, CreateAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     serializer_class = RestaurantImagesSerializer
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'restaurant not found'}, status=HTTP_400_BAD_REQUEST)
+        restaurant_id = self.get_restaurant_id()
         serializer = RestaurantImagesSerializer(data=request.data)
 
         if serializer.is_valid():
-            RestaurantImages(image=request.data.get('image'), restaurant=restaurant).save()
+            RestaurantImages(image=request.data.get('image'), restaurant_id=restaurant_id).save()
             return Response({'details': 'image uploaded successfully'}, status=HTTP_201_CREATED)
 
         return Response(serializer.errors, status=HTTP_400_BAD_REQUEST)
 
 
-class DeleteRestaurantImage(DestroyAPIView):
-    permission_class = [IsOwnerOrManager]
+class DeleteRestaurantImage(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return RestaurantImages.objects.none()
-        data = RestaurantImages.objects.filter(restaurant=restaurant)
+        data = RestaurantImages.objects.filter(restaurant_id=self.get_restaurant_id())
         return data
 
     def delete(self, request, *args, **kwargs):
@@ -507,32 +630,24 @@ class DeleteRestaurantImage(DestroyAPIView):
         return Response({'details': 'Image deleted successfully'}, status=HTTP_200_OK)
 
 
-class MenuItemDetail(RetrieveAPIView):
+class MenuItemDetail(RestaurantAccessMixin, SparseFieldsQuerysetMixin, RetrieveAPIView):
     serializer_class = MenuItemListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
+    select_related_fields = {'sub_category': ['sub_category'], 'menu_type': ['menu_type']}
+    prefetch_related_fields = {'item_ingredients': ['item_ingredients']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return MenuItem.objects.none()
-        return MenuItem.objects.filter(restaurant=restaurant)
+        return self.apply_sparse_fields(MenuItem.objects.filter(restaurant_id=self.get_restaurant_id()))
 
 
-class CreateMenuItem(CreateAPIView):
+class CreateMenuItem(RestaurantAccessMixin, CreateAPIView):
     serializer_class = MenuItemDetailSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"restaurant": self.get_restaurant()})
         return context
 
     def create(self, request, *args, **kwargs):
@@ -543,27 +658,17 @@ class CreateMenuItem(CreateAPIView):
         return Response({'details': 'Item created'}, status=HTTP_201_CREATED, headers=headers)
 
 
-class UpdateMenuItem(UpdateAPIView):
+class UpdateMenuItem(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = MenuItemDetailSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return MenuItem.objects.none()
-        return MenuItem.objects.filter(restaurant=restaurant)
+        return MenuItem.objects.filter(restaurant_id=self.get_restaurant_id())
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"restaurant": self.get_restaurant()})
         return context
 
     def put(self, request, *args, **kwargs):
@@ -582,18 +687,12 @@ class UpdateMenuItem(UpdateAPIView):
     #     return Response({'details': 'Item updated'}, status=HTTP_200_OK)
 
 
-class DeleteIngredients(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class DeleteIngredients(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return ItemIngredient.objects.none()
-
-        return ItemIngredient.objects.filter(item__restaurant=restaurant)
+        return ItemIngredient.objects.filter(item__restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -601,18 +700,12 @@ class DeleteIngredients(DestroyAPIView):
         return Response({'details': 'Ingredient deleted '}, status=HTTP_200_OK)
 
 
-class DeleteItemImages(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class DeleteItemImages(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return MenuItemImages.objects.none()
-
-        return MenuItemImages.objects.filter(menu_item__restaurant=restaurant)
+        return MenuItemImages.objects.filter(menu_item__restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -620,28 +713,21 @@ class DeleteItemImages(DestroyAPIView):
         return Response({'details': 'Image deleted '}, status=HTTP_200_OK)
 
 
-class RestaurantSubCategoryList(ListAPIView):
+class RestaurantSubCategoryList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantSubCategorySerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return SubCategory.objects.none()
-
-        restaurant_category_ids = RestaurantCategory.objects.filter(restaurant=restaurant).values_list('category__id', flat=True).distinct()
+        restaurant_category_ids = RestaurantCategory.objects.filter(restaurant_id=self.get_restaurant_id()).values_list('category__id', flat=True).distinct()
         data = SubCategory.objects.filter(category__id__in=restaurant_category_ids).order_by('category')
         return data
 
 
-class UploadMenuCsvApi(GenericAPIView):
+class UploadMenuCsvApi(RestaurantAccessMixin, GenericAPIView):
     serializer_class = MenuUploadCsvSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         data_file = serializer.validated_data["data_file"]
@@ -650,12 +736,8 @@ class UploadMenuCsvApi(GenericAPIView):
             # print(df.keys())
             if all(key in df.keys() for key in ["Item_name", "description", "cover_image", "sub_category", "price", "is_veg", 'item_ingredients', 'menu_type']):
                 df_json = df.to_json()
-                try:
-                    restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-                except:
-                    return Response({'details': "You don't have a restaurant"}, status=HTTP_200_OK)
                 # call celery function
-                create_menu_items.delay(restaurant.id, df_json)
+                create_menu_items.delay(self.get_restaurant_id(), df_json)
                 return Response({'details': 'Data uploading started'}, status=HTTP_200_OK)
             else:
                 return Response({'details': 'Invalid CSV file formate'}, status=HTTP_400_BAD_REQUEST)
@@ -703,12 +785,14 @@ class MakeClaimRequest(CreateAPIView):
         return Response({'details': 'Claim request created'}, status=HTTP_201_CREATED, headers=headers)
 
 
-class OwnerRestaurantList(ListAPIView):
+class OwnerRestaurantList(RestaurantSummaryQuerysetMixin, ListAPIView):
     serializer_class = OwnerRestaurantListSerializer
     permission_classes = [IsOwnerOrManager]
+    select_related_fields = {'city': ['city'], 'state': ['state'], 'type': ['type']}
 
     def get_queryset(self):
-        return Restaurant.objects.filter(Q(Q(owner=self.request.user) | Q(manager=self.request.user))).order_by('-id')
+        queryset = self.apply_sparse_fields(Restaurant.objects.filter(Q(Q(owner=self.request.user) | Q(manager=self.request.user))))
+        return self.annotate_summary(queryset).order_by('-id')
 
 
 def create_restaurant_times(restaurant):
@@ -736,34 +820,23 @@ class CreateRestaurantApi(CreateAPIView):
         return Response({'details': 'restaurant created!'}, status=HTTP_201_CREATED)
 
 
-class PublicQueryList(ListAPIView):
+class PublicQueryList(RestaurantAccessMixin, SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = PublicQuerySerializer
     pagination_class = CustomPagination
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
+    select_related_fields = {'raise_by': ['raise_by']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return PublicQuery.objects.none()
-
-        return PublicQuery.objects.filter(restaurant=restaurant, is_answered=False).order_by('id')
+        return self.apply_sparse_fields(PublicQuery.objects.filter(restaurant_id=self.get_restaurant_id(), is_answered=False)).order_by('id')
 
 
-class ReplayPublicQuery(UpdateAPIView):
+class ReplayPublicQuery(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = PublicQuerySerializer
     lookup_field = 'id'
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return PublicQuery.objects.none()
-
-        return PublicQuery.objects.filter(restaurant=restaurant, is_answered=False).order_by('id')
+        return PublicQuery.objects.filter(restaurant_id=self.get_restaurant_id(), is_answered=False).order_by('id')
 
     def put(self, request, *args, **kwargs):
         return Response({'details': 'Method not allowed'}, status=HTTP_405_METHOD_NOT_ALLOWED)
@@ -891,79 +964,57 @@ class CreateManager(CreateAPIView):
         return Response({'details': 'Manager created successfully!'}, status=HTTP_201_CREATED)
 
 
-class AllServices(ListAPIView):
+class AllServices(RestaurantAccessMixin, ListAPIView):
     serializer_class = AllServiceSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     queryset = Service.objects.all()
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantService, 'service_id', self.get_restaurant_id())})
         return context
 
 
-class AllCuisinesList(ListAPIView):
+class AllCuisinesList(RestaurantAccessMixin, ListAPIView):
     serializer_class = AllCuisinesListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     queryset = Cuisines.objects.all().order_by('id')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        # context.update({"request": self.request})
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantCuisines, 'cuisine_id', self.get_restaurant_id())})
         return context
 
 
-class AllPaymentModes(ListAPIView):
+class AllPaymentModes(RestaurantAccessMixin, CachedResponseMixin, ListAPIView):
     serializer_class = PaymentModeSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     queryset = ModeOfPayment.objects.all().order_by('id')
+    cache_models = [ModeOfPayment, RestaurantAcceptedPayment]
+
+    def get_cache_key_parts(self):
+        return [self.get_restaurant_id()]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        # context.update({"request": self.request})
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"added_ids": get_added_ids(RestaurantAcceptedPayment, 'payment_id', self.get_restaurant_id())})
         return context
 
 
-class RestaurantPaymentMethodList(ListAPIView):
+class RestaurantPaymentMethodList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantPaymentMethodSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantAcceptedPayment.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return RestaurantAcceptedPayment.objects.none()
+        return RestaurantAcceptedPayment.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
 
-class AddRestaurantAcceptedPaymentMethod(CreateAPIView):
+class AddRestaurantAcceptedPaymentMethod(RestaurantAccessMixin, CreateAPIView):
     serializer_class = AddPaymentModeSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'Restaurant not found!'}, status=HTTP_400_BAD_REQUEST)
+        restaurant_id = self.get_restaurant_id()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         try:
@@ -971,24 +1022,19 @@ class AddRestaurantAcceptedPaymentMethod(CreateAPIView):
         except:
             return Response({'details': 'Payment method not found!'}, status=HTTP_400_BAD_REQUEST)
         try:
-            RestaurantAcceptedPayment.objects.get(restaurant=restaurant, payment=payment)
+            RestaurantAcceptedPayment.objects.get(restaurant_id=restaurant_id, payment=payment)
             return Response({'details': 'Payment method already added!'}, status=HTTP_400_BAD_REQUEST)
         except:
-            RestaurantAcceptedPayment(restaurant=restaurant, payment=payment).save()
+            RestaurantAcceptedPayment(restaurant_id=restaurant_id, payment=payment).save()
             return Response({'details': 'Payment method added successfully!'}, status=HTTP_201_CREATED)
 
 
-class RemovePaymentMethod(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemovePaymentMethod(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantAcceptedPayment.objects.filter(restaurant=restaurant)
-        except:
-            return RestaurantAcceptedPayment.objects.none()
+        return RestaurantAcceptedPayment.objects.filter(restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -996,48 +1042,41 @@ class RemovePaymentMethod(DestroyAPIView):
         return Response({'details': 'Payment method removed'}, status=HTTP_200_OK)
 
 
-class AllBusinessTypes(ListAPIView):
+class AllBusinessTypes(CachedResponseMixin, ListAPIView):
     serializer_class = AllBusinessTypesSerializer
     # permission_classes = [IsOwnerOrManager]
+    cache_models = [BusinessType]
     queryset = BusinessType.objects.all().order_by('id')
 
 
-class AllCitys(ListAPIView):
+class AllCitys(CachedResponseMixin, ListAPIView):
     serializer_class = CitySerializer
     # permission_classes = [IsOwnerOrManager]
+    cache_models = [City]
     queryset = City.objects.all().order_by('id')
 
 
-class AllStates(ListAPIView):
+class AllStates(CachedResponseMixin, ListAPIView):
     serializer_class = StateSerializer
     # permission_classes = [IsOwnerOrManager]
+    cache_models = [State]
     queryset = State.objects.all().order_by('id')
 
 
-class RestaurantServiceList(ListAPIView):
+class RestaurantServiceList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantServiceSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantService.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return RestaurantService.objects.none()
+        return RestaurantService.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
 
-class RemoveRestaurantService(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemoveRestaurantService(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantService.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return RestaurantService.objects.none()
+        return RestaurantService.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1045,16 +1084,12 @@ class RemoveRestaurantService(DestroyAPIView):
         return Response({'details': 'Service removed'}, status=HTTP_200_OK)
 
 
-class AddRestaurantService(GenericAPIView):
+class AddRestaurantService(RestaurantAccessMixin, GenericAPIView):
     serializer_class = AddServiceSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'Restaurant not found!'}, status=HTTP_400_BAD_REQUEST)
+        restaurant_id = self.get_restaurant_id()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         try:
@@ -1062,36 +1097,27 @@ class AddRestaurantService(GenericAPIView):
         except:
             return Response({'details': 'Service not found!'}, status=HTTP_400_BAD_REQUEST)
         try:
-            RestaurantService.objects.get(restaurant=restaurant, service=service)
+            RestaurantService.objects.get(restaurant_id=restaurant_id, service=service)
             return Response({'details': 'Service already added!'}, status=HTTP_400_BAD_REQUEST)
         except:
-            RestaurantService(restaurant=restaurant, service=service).save()
+            RestaurantService(restaurant_id=restaurant_id, service=service).save()
             return Response({'details': 'Service added successfully!'}, status=HTTP_201_CREATED)
 
 
-class RestaurantCuisineList(ListAPIView):
+class RestaurantCuisineList(RestaurantAccessMixin, ListAPIView):
     serializer_class = RestaurantCuisineSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantCuisines.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return RestaurantCuisines.objects.none()
+        return RestaurantCuisines.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
 
-class AddRestaurantCuisines(GenericAPIView):
+class AddRestaurantCuisines(RestaurantAccessMixin, GenericAPIView):
     serializer_class = AddCuisinesSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def post(self, request, *args, **kwargs):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Response({'details': 'Restaurant not found!'}, status=HTTP_400_BAD_REQUEST)
+        restaurant_id = self.get_restaurant_id()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         try:
@@ -1099,24 +1125,19 @@ class AddRestaurantCuisines(GenericAPIView):
         except:
             return Response({'details': 'Cuisines not found!'}, status=HTTP_400_BAD_REQUEST)
         try:
-            RestaurantCuisines.objects.get(restaurant=restaurant, cuisine=cuisine)
+            RestaurantCuisines.objects.get(restaurant_id=restaurant_id, cuisine=cuisine)
             return Response({'details': 'Cuisine already added!'}, status=HTTP_400_BAD_REQUEST)
         except:
-            RestaurantCuisines(restaurant=restaurant, cuisine=cuisine).save()
+            RestaurantCuisines(restaurant_id=restaurant_id, cuisine=cuisine).save()
             return Response({'details': 'Cuisine added successfully!'}, status=HTTP_201_CREATED)
 
 
-class RemoveRestaurantCuisine(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemoveRestaurantCuisine(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return RestaurantCuisines.objects.filter(restaurant=restaurant)
-        except:
-            return RestaurantService.objects.none()
+        return RestaurantCuisines.objects.filter(restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1132,55 +1153,45 @@ class CuisinesList(ListAPIView):
     ordering_fields = ['cuisines', 'cuisines_ru']
 
 
-class MenuTypeList(ListAPIView):
+class MenuTypeList(CachedResponseMixin, ListAPIView):
     serializer_class = MenuTypeSerializer
     permission_classes = [IsOwnerOrManager, ]
+    cache_models = [MenuType]
     queryset = MenuType.objects.all().order_by('id')
 
 
-class PromotionList(ListAPIView):
+class PromotionList(RestaurantAccessMixin, ListAPIView):
     serializer_class = PromotionListSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     pagination_class = CustomPagination
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            queryset = Promotion.objects.filter(restaurant=restaurant).order_by('-id')
-            is_active = self.request.query_params.get('is_active')
-            if is_active is not None and is_active in ['True', 'False']:
-                queryset = queryset.filter(is_active=is_active)
-            return queryset
-        except:
-            return Promotion.objects.none()
+        queryset = Promotion.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
+        is_active = self.request.query_params.get('is_active')
+        if is_active is not None and is_active in ['True', 'False']:
+            queryset = queryset.filter(is_active=is_active)
+        return queryset
 
 
-class PromotionDetail(RetrieveAPIView):
+class PromotionDetail(RestaurantAccessMixin, SparseFieldsQuerysetMixin, RetrieveAPIView):
     serializer_class = PromotionDetailSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
+    prefetch_related_fields = {
+        'week_days': ['week_days'],
+        'applicable_on': [Prefetch('applicable_on', queryset=PromotionOnItem.objects.select_related('item'))],
+    }
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return Promotion.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return Promotion.objects.none()
+        return self.apply_sparse_fields(Promotion.objects.filter(restaurant_id=self.get_restaurant_id())).order_by('-id')
 
 
-class DeletePromotion(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class DeletePromotion(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return Promotion.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return Promotion.objects.none()
+        return Promotion.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1188,18 +1199,13 @@ class DeletePromotion(DestroyAPIView):
         return Response({'details': 'Promotion Deleted'}, status=HTTP_200_OK)
 
 
-class CreatePromotion(CreateAPIView):
+class CreatePromotion(RestaurantAccessMixin, CreateAPIView):
     serializer_class = PromotionDetailSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"restaurant": self.get_restaurant()})
         return context
 
     def create(self, request, *args, **kwargs):
@@ -1210,34 +1216,24 @@ class CreatePromotion(CreateAPIView):
         return Response({'details': 'Promotion created'}, status=HTTP_201_CREATED, headers=headers)
 
 
-class UpdatePromotion(UpdateAPIView):
+class UpdatePromotion(RestaurantAccessMixin, UpdateAPIView):
     serializer_class = PromotionDetailSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return Promotion.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return Promotion.objects.none()
+        return Promotion.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
     def put(self, request, *args, **kwargs):
         return Response({'details': 'Method not allowed'}, status=HTTP_405_METHOD_NOT_ALLOWED)
 
 
-class RemovePromotionWeekDay(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemovePromotionWeekDay(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return PromotionWeekDay.objects.none()
-        return PromotionWeekDay.objects.filter(promotion__restaurant=restaurant)
+        return PromotionWeekDay.objects.filter(promotion__restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1245,17 +1241,12 @@ class RemovePromotionWeekDay(DestroyAPIView):
         return Response({'details': 'Day removed from promotion'}, status=HTTP_200_OK)
 
 
-class RemoveItemFromPromotion(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class RemoveItemFromPromotion(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return PromotionOnItem.objects.none()
-        return PromotionOnItem.objects.filter(promotion__restaurant=restaurant)
+        return PromotionOnItem.objects.filter(promotion__restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1263,31 +1254,21 @@ class RemoveItemFromPromotion(DestroyAPIView):
         return Response({'details': 'Item removed from promotion'}, status=HTTP_200_OK)
 
 
-class MenuItemDropdown(ListAPIView):
+class MenuItemDropdown(RestaurantAccessMixin, ListAPIView):
     serializer_class = MenuItemDropdownSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-            return MenuItem.objects.filter(restaurant=restaurant).order_by('-id')
-        except:
-            return MenuItem.objects.none()
+        return MenuItem.objects.filter(restaurant_id=self.get_restaurant_id()).order_by('-id')
 
 
-class CreateEvent(CreateAPIView):
+class CreateEvent(RestaurantAccessMixin, CreateAPIView):
     serializer_class = AddEventSerializer
-    permission_classes = [IsOwnerOrManager]
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        context.update({"restaurant": self.get_restaurant()})
         return context
 
     def create(self, request, *args, **kwargs):
@@ -1298,17 +1279,12 @@ class CreateEvent(CreateAPIView):
         return Response({'details': 'Event created'}, status=HTTP_201_CREATED)
 
 
-class DeleteEvent(DestroyAPIView):
-    permission_classes = [IsOwnerOrManager]
+class DeleteEvent(RestaurantAccessMixin, DestroyAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Event.objects.none()
-        return Event.objects.filter(restaurant=restaurant)
+        return Event.objects.filter(restaurant_id=self.get_restaurant_id())
 
     def delete(self, request, *args, **kwargs):
         obj = self.get_object()
@@ -1316,18 +1292,13 @@ class DeleteEvent(DestroyAPIView):
         return Response({'details': 'Event deleted successfully.'}, status=HTTP_200_OK)
 
 
-class UpdateEvent(UpdateAPIView):
-    permission_classes = [IsOwnerOrManager]
+class UpdateEvent(RestaurantAccessMixin, UpdateAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     serializer_class = EventSerializer
     lookup_field = 'id'
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Event.objects.none()
-        return Event.objects.filter(restaurant=restaurant)
+        return Event.objects.filter(restaurant_id=self.get_restaurant_id())
 
     def put(self, request, *args, **kwargs):
         return Response({'details': 'Method not allowed'}, status=HTTP_405_METHOD_NOT_ALLOWED)
@@ -1359,22 +1330,17 @@ class EventFilter(FilterSet):
         fields = ['start', 'end', 'search']
 
 
-class AllEvents(ListAPIView):
-    permission_classes = [IsOwnerOrManager]
+class AllEvents(RestaurantAccessMixin, SparseFieldsQuerysetMixin, ListAPIView):
+    permission_classes = [IsOwnerOrManager, HasRestaurantAccess]
     serializer_class = EventSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = EventFilter
     ordering_fields = ['date_time']
     pagination_class = CustomPagination
+    select_related_fields = {'created_by': ['created_by']}
 
     def get_queryset(self):
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            return Event.objects.none()
-
-        queryset = Event.objects.filter(restaurant=restaurant).order_by('-id')
+        queryset = self.apply_sparse_fields(Event.objects.filter(restaurant_id=self.get_restaurant_id())).order_by('-id')
         return queryset
 
 
@@ -1384,12 +1350,8 @@ class CreateAdsBanner(CreateAPIView):
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
-        restaurant_id = self.kwargs.get('restaurant_id')
-        try:
-            restaurant = Restaurant.objects.get(Q(id=restaurant_id) & Q(Q(owner=self.request.user) | Q(manager=self.request.user)))
-        except:
-            restaurant = None
-        context.update({"restaurant": restaurant})
+        # The url has no restaurant id, requests are created without a restaurant.
+        context.update({"restaurant": None})
         return context
 
     def create(self, request, *args, **kwargs):
@@ -18,6 +18,12 @@ class Post(TimeStampedModel):
     longitude = models.FloatField(blank=True, null=True)
     location_point = models.PointField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['created_at']),
+        ]
+
     def save(self, *args, **kwargs):
         self.location_point = Point(self.longitude, self.latitude)
         super(Post, self).save(*args, **kwargs)
@@ -91,4 +97,5 @@ class Participant(TimeStampedModel):
         unique_together = (('event', 'participated_by'),)
         indexes = [
             models.Index(fields=['event']),
+            models.Index(fields=['created_at']),
         ]
@@ -3,12 +3,13 @@ from rest_framework.serializers import ModelSerializer
 from rest_framework import serializers
 from django.db import IntegrityError
 from core.serializers import ReviewRestaurantSerializer
+from core.sparse_fields import SparseFieldsMixin
 from users.models import User
 from core.models import Restaurant, Review
 from social.models import FollowRequest, Post, Comment, Like, Event
 
 
-class UserSocialDataSerializer(serializers.ModelSerializer):
+class UserSocialDataSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     following_count = serializers.ReadOnlyField()
     follower_count = serializers.ReadOnlyField()
     request_count = serializers.ReadOnlyField()
@@ -18,7 +19,7 @@ class UserSocialDataSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'profile_image', 'bio', 'following_count', 'follower_count', 'request_count']
 
 
-class FollowerDataSerializer(serializers.ModelSerializer):
+class FollowerDataSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_data = UserSocialDataSerializer(source='follower', read_only=True)
     request_id = serializers.ReadOnlyField(source='id')
 
@@ -28,7 +29,7 @@ class FollowerDataSerializer(serializers.ModelSerializer):
         read_only_fields = ['follower', 'following']
 
 
-class FollowingDataSerializer(serializers.ModelSerializer):
+class FollowingDataSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user_data = UserSocialDataSerializer(source='following', read_only=True)
     request_id = serializers.ReadOnlyField(source='id')
 
@@ -38,7 +39,7 @@ class FollowingDataSerializer(serializers.ModelSerializer):
         read_only_fields = ['follower', 'following']
 
 
-class SearchUserSerializer(ModelSerializer):
+class SearchUserSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'profile_image', 'bio']
@@ -81,7 +82,7 @@ class SendFollowRequestSerializer(ModelSerializer):
         return follow_request
 
 
-class PendingFollowRequestsSerializer(ModelSerializer):
+class PendingFollowRequestsSerializer(SparseFieldsMixin, ModelSerializer):
     follower = UserSocialDataSerializer(read_only=True)
     request_id = serializers.ReadOnlyField(source='id')
 
@@ -90,7 +91,7 @@ class PendingFollowRequestsSerializer(ModelSerializer):
         fields = ['request_id', 'follower', 'created_at']
 
 
-class CommentDataSerializer(ModelSerializer):
+class CommentDataSerializer(SparseFieldsMixin, ModelSerializer):
     comment_id = serializers.ReadOnlyField(source='id')
     comment_by = serializers.StringRelatedField()
 
@@ -99,13 +100,13 @@ class CommentDataSerializer(ModelSerializer):
         fields = ['comment_id', 'content', 'comment_by', 'comment_by_id']
 
 
-class CreatedBySerializer(ModelSerializer):
+class CreatedBySerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'profile_image']
 
 
-class LikeDataSerializer(ModelSerializer):
+class LikeDataSerializer(SparseFieldsMixin, ModelSerializer):
     like_id = serializers.ReadOnlyField(source='id')
     liked_by = CreatedBySerializer()
 
@@ -114,7 +115,7 @@ class LikeDataSerializer(ModelSerializer):
         fields = ['like_id', 'liked_by']
 
 
-class PostDataSerializer(ModelSerializer):
+class PostDataSerializer(SparseFieldsMixin, ModelSerializer):
     post_id = serializers.ReadOnlyField(source='id')
     comments = CommentDataSerializer(many=True, read_only=True)
     likes = LikeDataSerializer(many=True, read_only=True)
@@ -189,13 +190,13 @@ class AddEventSerializer(ModelSerializer):
         return data
 
 
-class EventRestaurantSerializer(ModelSerializer):
+class EventRestaurantSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = Restaurant
         fields = ['name', 'location']
 
 
-class EventDataSerializer(ModelSerializer):
+class EventDataSerializer(SparseFieldsMixin, ModelSerializer):
     event_id = serializers.ReadOnlyField(source='id')
     participant_counts = serializers.ReadOnlyField(source='participants_counts')
     restaurant = EventRestaurantSerializer()
@@ -208,7 +209,7 @@ class EventDataSerializer(ModelSerializer):
 
 
 # ----------- User Profile -----------
-class UserSocialMediaProfileSerializer(ModelSerializer):
+class UserSocialMediaProfileSerializer(SparseFieldsMixin, ModelSerializer):
     following_count = serializers.ReadOnlyField()
     follower_count = serializers.ReadOnlyField()
     request_count = serializers.ReadOnlyField()
@@ -255,13 +256,13 @@ class AddCommentSerializer(ModelSerializer):
         return comment
 
 
-class UserSocialDetailsSerializer(ModelSerializer):
+class UserSocialDetailsSerializer(SparseFieldsMixin, ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'first_name', 'last_name', 'email', 'profile_image', 'following_count', 'follower_count', 'bio']
 
 
-class UserReviewListSerializer(ModelSerializer):
+class UserReviewListSerializer(SparseFieldsMixin, ModelSerializer):
     restaurant = ReviewRestaurantSerializer(read_only=True)
 
     class Meta:
@@ -4,10 +4,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import NotFound
-from django.db.models import Q
+from django.db.models import OuterRef, Prefetch, Q
 from django.utils import timezone
 
+from core.cache import ConditionalGetMixin, child_validators
 from core.models import Review
+from core.sparse_fields import SparseFieldsQuerysetMixin
 from social.models import FollowRequest, Post, Comment, Like, Event, Participant
 from social.serializers import (UserSocialMediaProfileSerializer, PendingFollowRequestsSerializer, AddPostSerializer,
                                 SendFollowRequestSerializer, EditUserSocialProfileSerializer, SearchUserSerializer,
@@ -19,6 +21,21 @@ from users.permissions import IsVisitor
 from owner_dashboard.views import CustomPagination
 
 
+class PostQuerysetMixin(SparseFieldsQuerysetMixin):
+    select_related_fields = {'user': ['user']}
+    prefetch_related_fields = {
+        'comments': [Prefetch('comments', queryset=Comment.objects.select_related('comment_by'))],
+        'likes': [Prefetch('likes', queryset=Like.objects.select_related('liked_by'))],
+    }
+
+    def apply_sparse_fields(self, queryset):
+        queryset = super().apply_sparse_fields(queryset)
+        if self.is_field_rendered('restaurant'):
+            # Rendered as the restaurant name
+            queryset = queryset.select_related('restaurant')
+        return queryset
+
+
 class SearchUserView(ListAPIView):
     permission_classes = [IsVisitor, ]
     serializer_class = SearchUserSerializer
@@ -49,14 +66,38 @@ class EditUserSocialProfileView(UpdateAPIView):
         return Response({"detail": "User profile updated successfully."}, status=status.HTTP_200_OK)
 
 
-class UserSocialMediaProfileView(RetrieveAPIView):
+class UserSocialMediaProfileView(ConditionalGetMixin, SparseFieldsQuerysetMixin, RetrieveAPIView):
     serializer_class = UserSocialMediaProfileSerializer
     permission_classes = [IsVisitor, ]
     lookup_field = 'id'
+    prefetch_related_fields = {
+        'posts': [Prefetch('posts', queryset=Post.objects.select_related('user', 'restaurant'))],
+        'posts.comments': [Prefetch('posts__comments', queryset=Comment.objects.select_related('comment_by'))],
+        'posts.likes': [Prefetch('posts__likes', queryset=Like.objects.select_related('liked_by'))],
+    }
+
+    def get_validator_queryset(self):
+        # One modified_at and count per table the profile shows, for the fields it renders. Renames of
+        # the other users and restaurants on the page are not tracked.
+        user = OuterRef('pk')
+        validators = {}
+        if any(self.is_field_rendered(name) for name in ('following_count', 'follower_count', 'request_count', 'followings', 'followers')):
+            validators.update(child_validators('follows', FollowRequest.objects.filter(Q(following=user) | Q(follower=user))))
+        if self.is_field_rendered('posts'):
+            validators.update(child_validators('posts', Post.objects.filter(user=user)))
+        if self.is_field_rendered('posts.comments') or self.is_field_rendered('posts.comment_count'):
+            validators.update(child_validators('comments', Comment.objects.filter(post__user=user)))
+        if self.is_field_rendered('posts.likes') or self.is_field_rendered('posts.like_count'):
+            validators.update(child_validators('likes', Like.objects.filter(post__user=user)))
+        if self.is_field_rendered('events_created') or self.is_field_rendered('events_participated'):
+            validators.update(child_validators('events', Event.objects.filter(Q(created_by=user) | Q(participants__participated_by=user))))
+            # participant_counts of those events
+            validators.update(child_validators('participants', Participant.objects.filter(Q(event__created_by=user) | Q(event__participants__participated_by=user))))
+        return User.objects.filter(id=self.kwargs.get('id')).annotate(**validators)
 
     def get_object(self):
         try:
-            return User.objects.get(id=self.kwargs.get('id'))
+            return self.apply_sparse_fields(User.objects.all()).get(id=self.kwargs.get('id'))
         except User.DoesNotExist:
             raise NotFound(f"User does not exists.")
 
@@ -72,13 +113,14 @@ class SendFollowRequestView(CreateAPIView):
         return Response({"detail": f"Follow Request sent successfully."}, status=status.HTTP_201_CREATED)
 
 
-class PendingFollowRequestsView(ListAPIView):
+class PendingFollowRequestsView(SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = PendingFollowRequestsSerializer
     permission_classes = [IsVisitor, ]
     pagination_class = CustomPagination
+    select_related_fields = {'follower': ['follower']}
 
     def get_queryset(self):
-        return FollowRequest.objects.filter(following=self.request.user, is_approved=False).order_by('-created_at')
+        return self.apply_sparse_fields(FollowRequest.objects.all()).filter(following=self.request.user, is_approved=False).order_by('-created_at')
 
 
 class AcceptFollowRequestView(APIView):
@@ -154,14 +196,15 @@ class DeletePostView(DestroyAPIView):
         return Response({"detail": "Post deleted successfully."}, status=status.HTTP_200_OK)
 
 
-class AllUpdatesView(ListAPIView):
+class AllUpdatesView(PostQuerysetMixin, ListAPIView):
     permission_classes = [IsVisitor, ]
     serializer_class = PostDataSerializer
     pagination_class = CustomPagination
+    cursor_ordering = ('-id',)
 
     def get_queryset(self):
         following = User.objects.filter(user_following__follower=self.request.user)
-        return Post.objects.filter(user__in=following).order_by('-created_at')
+        return self.apply_sparse_fields(Post.objects.filter(user__in=following)).order_by('-created_at', '-id')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -265,52 +308,58 @@ class EventParticipateView(APIView):
             return Response({'detail': 'Event not found.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UpcomingEventsView(ListAPIView):
+class UpcomingEventsView(SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = EventDataSerializer
     permission_classes = [IsVisitor, ]
     pagination_class = CustomPagination
+    select_related_fields = {'restaurant': ['restaurant'], 'created_by': ['created_by']}
 
     def get_queryset(self):
         now = timezone.now()
-        return Event.objects.filter(date_time__gt=now, is_approved_by_restaurant=True)
+        return self.apply_sparse_fields(Event.objects.filter(date_time__gt=now, is_approved_by_restaurant=True))
 
 
-class AllEventsView(ListAPIView):
+class AllEventsView(SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = EventDataSerializer
     permission_classes = [IsVisitor, ]
     pagination_class = CustomPagination
+    select_related_fields = {'restaurant': ['restaurant'], 'created_by': ['created_by']}
 
     def get_queryset(self):
-        return Event.objects.filter(is_approved_by_restaurant=True)
+        return self.apply_sparse_fields(Event.objects.filter(is_approved_by_restaurant=True))
 
 
-class UserSocialDetails(RetrieveAPIView):
+class UserSocialDetails(ConditionalGetMixin, RetrieveAPIView):
     serializer_class = UserSocialDetailsSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
 
+    def get_validator_queryset(self):
+        return super().get_validator_queryset().annotate(**child_validators('follows', FollowRequest.objects.filter(Q(following=OuterRef('pk')) | Q(follower=OuterRef('pk')))))
+
     def get_queryset(self):
         return User.objects.filter(is_visitor=True)
 
 
-class UserReviewList(ListAPIView):
+class UserReviewList(SparseFieldsQuerysetMixin, ListAPIView):
     serializer_class = UserReviewListSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
+    select_related_fields = {'restaurant': ['restaurant']}
 
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return Review.objects.filter(user__id=user_id).order_by('-id')
+        return self.apply_sparse_fields(Review.objects.filter(user__id=user_id)).order_by('-id')
 
 
-class UserPostList(ListAPIView):
+class UserPostList(PostQuerysetMixin, ListAPIView):
     serializer_class = PostDataSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = CustomPagination
 
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return Post.objects.filter(user__id=user_id).order_by('-id')
+        return self.apply_sparse_fields(Post.objects.filter(user__id=user_id)).order_by('-id')
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
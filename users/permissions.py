@@ -25,3 +25,13 @@ class IsRestaurantManager(permissions.BasePermission):
 
     # def has_object_permission(self, request, view, obj):
     #     return request.user == obj.manager
+
+
+class HasRestaurantAccess(permissions.BasePermission):
+    """
+    The restaurant in the url is owned or managed by the user, for views with owner_dashboard.access.RestaurantAccessMixin.
+    """
+    message = {'details': "You don't have access to this restaurant"}
+
+    def has_permission(self, request, view):
+        return request.user and request.user.is_authenticated and view.has_restaurant_access()